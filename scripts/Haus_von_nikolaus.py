@@ -75,4 +75,6 @@ if __name__ == "__main__":
         kuka.lin(p2)
         kuka.lin(p1)
 
-        kuka.disconnect()
\ No newline at end of file
+        kuka.disconnect()
+        # Zeiten pro Befehl: Warteschlange (send -> Id) und Ausfuehrung (Id -> Finished_Id)
+        print(kuka.tracer.report())
\ No newline at end of file
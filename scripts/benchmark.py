@@ -0,0 +1,218 @@
+"""Throughput and latency benchmark for the Robot client against the KRC simulator.
+
+    python scripts/benchmark.py --output results.json
+    python scripts/benchmark.py --baseline results.json --tolerance 0.15
+
+The simulator runs in its own process, so the CPU numbers only contain the
+client. With --baseline every metric is compared to the stored run and the
+script exits with 1 if one of them got worse by more than the tolerance.
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+src_dir = project_root / "src"
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+from eki_encoder import encode_move, move_encoder
+from framing import RobotStateFramer
+from krc_simulator import KrcSimulator
+from point import Point6D
+from reactor import IoReactor
+from robot import Robot
+from robot_state import decode_robot_state
+
+STATE_RATES = (50, 100, 150, 200, 250)
+# longest wait for the RobotState that acknowledges one command
+ACK_TIMEOUT = 5.0
+
+
+def _run_simulator(ports, stop, state_rate, time_scale):
+    with KrcSimulator(state_rate=state_rate, motion_time_scale=time_scale) as krc:
+        ports.put((krc.meta_port, krc.motion_port))
+        stop.wait()
+
+
+@contextlib.contextmanager
+def simulated_robot(state_rate: float, time_scale: float = 0.0, use_reactor: bool = False):
+    """Start a simulator process and a connected, headless Robot."""
+    ctx = multiprocessing.get_context("spawn")
+    ports, stop = ctx.Queue(), ctx.Event()
+    process = ctx.Process(target=_run_simulator, args=(ports, stop, state_rate, time_scale), daemon=True)
+    process.start()
+    meta_port, motion_port = ports.get(timeout=10)
+
+    reactor = IoReactor() if use_reactor else None
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        robot = Robot("127.0.0.1", meta_port, motion_port, gui=False, visualization="none")
+        robot.connect()
+        robot.start_receive_threads(reactor)
+    try:
+        yield robot
+    finally:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            robot.disconnect()
+        if reactor is not None:
+            reactor.close()
+        stop.set()
+        process.join(5)
+
+
+def _points(count: int) -> list[Point6D]:
+    return [Point6D(f"P{i}", 300.0 + i % 100, 0.0, 200.0, 0.0, 90.0, 0.0) for i in range(count)]
+
+
+def _per_call_us(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def bench_codec(number: int) -> dict:
+    point = Point6D("P", 412.5, -12.25, 230.0, 0.0, 90.0, 180.0)
+    points = _points(100)
+    encoder = move_encoder(1, 3, 0.2, 0.2, 0, 15, 0.0)
+
+    krc = KrcSimulator()
+    krc.current_id, krc.finished_id = 12, 11
+    krc.cartesian = [412.5, -12.25, 230.0, 0.0, 90.0, 180.0]
+    state = krc.state_message()
+    krc.stop()
+    stream = state * 50
+    framer = RobotStateFramer()
+
+    return {
+        "encode_move_us": (_per_call_us(lambda: encode_move(1, point, 1, 3, 0.2, 0.2, 0, 15, 0.0), number), "lower"),
+        "encode_batch_us_per_msg": (_per_call_us(lambda: encoder.encode_batch(1, points), number // 100) / 100, "lower"),
+        "decode_state_us": (_per_call_us(lambda: decode_robot_state(state), number), "lower"),
+        "frame_and_decode_us_per_state": (_per_call_us(lambda: _frame_all(framer, stream), number // 50) / 50, "lower"),
+    }
+
+
+def _frame_all(framer: RobotStateFramer, stream: bytes):
+    for frame in framer.feed(stream):
+        decode_robot_state(frame)
+
+
+def bench_throughput(count: int, use_reactor: bool) -> dict:
+    points = _points(count)
+    results = {}
+
+    with simulated_robot(250, use_reactor=use_reactor) as robot, \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        handle = robot.move_sequence(points, mode=3, timeout=10)
+        handle.wait(timeout=30)
+        results["move_sequence_cmds_per_s"] = (count / (time.perf_counter() - start), "higher")
+
+        start = time.perf_counter()
+        for point in points[:min(count, robot.stream_window)]:
+            robot.lin(point)
+        robot.wait_all(timeout=30)
+        sent = min(count, robot.stream_window)
+        results["lin_cmds_per_s"] = (sent / (time.perf_counter() - start), "higher")
+
+        latencies = [_ack_latency(robot, point) for point in points[:50]]
+        latencies.sort()
+        results["ack_latency_ms_p50"] = (statistics.median(latencies) * 1e3, "lower")
+        results["ack_latency_ms_p95"] = (latencies[int(len(latencies) * 0.95) - 1] * 1e3, "lower")
+    return results
+
+
+def _ack_latency(robot: Robot, point: Point6D, timeout: float = ACK_TIMEOUT) -> float:
+    """Time from send until the first RobotState that carries the new id."""
+    start = time.perf_counter()
+    deadline = start + timeout
+    seq, state = robot.state_slot.latest()
+    cmd_id = robot.lin(point).cmd_id
+    while state is None or (state.cmd_id != cmd_id and (state.finished_id or 0) < cmd_id):
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutError(f"No RobotState acknowledged command {cmd_id} within {timeout} s")
+        seq, state = robot.state_slot.wait_newer(seq, min(remaining, 1.0)) or (seq, state)
+    return time.perf_counter() - start
+
+
+def bench_state_rate_cpu(duration: float, use_reactor: bool) -> dict:
+    results = {}
+    for rate in STATE_RATES:
+        with simulated_robot(rate, use_reactor=use_reactor):
+            time.sleep(0.5)  # connection settled
+            cpu, wall = time.process_time(), time.perf_counter()
+            time.sleep(duration)
+            cpu_percent = (time.process_time() - cpu) / (time.perf_counter() - wall) * 100
+        results[f"cpu_percent_at_{rate}hz"] = (cpu_percent, "lower")
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return the metrics that regressed by more than tolerance against baseline."""
+    regressions = []
+    for name, entry in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None or old["value"] == 0:
+            continue
+        change = (entry["value"] - old["value"]) / old["value"]
+        worse = change < -tolerance if entry["better"] == "higher" else change > tolerance
+        entry["baseline"] = old["value"]
+        entry["change"] = round(change, 4)
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression (default 0.10)")
+    parser.add_argument("--commands", type=int, default=1000, help="moves per throughput run")
+    parser.add_argument("--cpu-seconds", type=float, default=3.0, help="measuring time per state rate")
+    parser.add_argument("--reactor", action="store_true", help="receive through IoReactor instead of the thread loop")
+    parser.add_argument("--skip", nargs="*", default=[], choices=["codec", "throughput", "cpu"])
+    args = parser.parse_args()
+
+    raw = {}
+    if "codec" not in args.skip:
+        raw.update(bench_codec(number=20000))
+    if "throughput" not in args.skip:
+        raw.update(bench_throughput(args.commands, args.reactor))
+    if "cpu" not in args.skip:
+        raw.update(bench_state_rate_cpu(args.cpu_seconds, args.reactor))
+
+    results = {name: {"value": round(value, 4), "better": better} for name, (value, better) in raw.items()}
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "reactor": args.reactor,
+        "results": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+    if regressions:
+        print("Regressions:", ", ".join(regressions), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
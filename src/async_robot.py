@@ -0,0 +1,355 @@
+import asyncio
+import socket
+import time
+
+from eki_encoder import move_encoder, encode_move_joint, encode_grip, encode_suction, encode_io
+from framing import RobotStateFramer
+from meta_controller import MetaController
+from motion_controller import MotionDefaults, window_room, EKI_BUFFER_LIMIT, EKI_BUFFSIZE
+from point import Point6D, JointState
+from robot_state import RobotState, decode_robot_state
+
+
+class AsyncTcpTransport:
+    """asyncio counterpart of TcpTransport, driven by the running event loop."""
+
+    def __init__(self, ip: str, port: int, timeout: float = 2.0):
+        self.ip = ip
+        self.port = port
+        self.timeout = timeout
+        self.socket = None
+        self.connected = False
+
+    async def connect(self):
+        if self.connected:
+            return
+        loop = asyncio.get_running_loop()
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setblocking(False)
+        try:
+            await asyncio.wait_for(loop.sock_connect(self.socket, (self.ip, self.port)), self.timeout)
+        except BaseException:
+            self.socket.close()
+            raise
+        self.connected = True
+        print(f"Connected to {self.ip}:{self.port}")
+
+    def disconnect(self):
+        try:
+            if self.socket:
+                try:
+                    self.socket.shutdown(socket.SHUT_RDWR)  # sendet FIN an KRC
+                except Exception:
+                    pass  # kann schon tot sein
+
+                self.socket.close()
+
+        finally:
+            self.connected = False
+            print("Socket cleanly disconnected")
+
+    async def send(self, data: bytes):
+        if not self.connected:
+            raise RuntimeError("Not connected")
+        await asyncio.get_running_loop().sock_sendall(self.socket, data)
+
+    async def receive_into(self, buffer) -> int:
+        if not self.connected:
+            raise RuntimeError("Not connected")
+        return await asyncio.get_running_loop().sock_recv_into(self.socket, buffer)
+
+
+class AsyncCommandHandle:
+    """Awaitable handle of a sent command, finished once Finished_Id reaches its id."""
+
+    def __init__(self, controller, cmd_id: int, first_id: int | None = None):
+        self.controller = controller
+        self.cmd_id = cmd_id
+        self.first_id = first_id if first_id is not None else cmd_id
+
+    @property
+    def empty(self) -> bool:
+        """A sequence of which no move was sent; it counts as finished right away."""
+        return self.first_id > self.cmd_id
+
+    def done(self) -> bool:
+        return self.empty or self.controller.last_finished_id >= self.cmd_id
+
+    async def wait(self, timeout: float | None = None) -> bool:
+        """Wait until the command finished. Returns False on timeout, stop or disconnect."""
+        if self.empty:
+            return True
+        return await self.controller.wait_for_finished(self.cmd_id, timeout)
+
+    def __await__(self):
+        return self.wait().__await__()
+
+    def __repr__(self):
+        if self.empty:
+            return "AsyncCommandHandle(empty)"
+        ids = str(self.cmd_id) if self.first_id == self.cmd_id else f"{self.first_id}..{self.cmd_id}"
+        return f"AsyncCommandHandle(id={ids}, done={self.done()})"
+
+
+class AsyncMotionController(MotionDefaults):
+    """Motion channel on asyncio: awaitable commands and an async stream of RobotState frames."""
+
+    def __init__(self, motionTransport: AsyncTcpTransport):
+        MotionDefaults.__init__(self)
+        self.motionTransport = motionTransport
+        self.cmd_counter = 1
+        self.last_finished_id = 0
+        self.currentState: RobotState | None = None
+
+        self.stream_window = EKI_BUFFER_LIMIT // 2
+        self.stream_max_bytes = EKI_BUFFSIZE
+
+        self.stateFramer = RobotStateFramer()
+        # replaced by a fresh event on every published state, see _publish_states
+        self._state_event = asyncio.Event()
+        self._subscribers: list[asyncio.Queue] = []
+        # keeps ids in send order when several tasks send at the same time
+        self._send_lock = asyncio.Lock()
+
+    # ==================== RECEIVE ====================
+
+    async def receive_loop(self):
+        self.stateFramer.reset()
+        try:
+            while self.motionTransport.connected:
+                count = await self.motionTransport.receive_into(self.stateFramer.free_space())
+                states = self.stateFramer.commit(count, decode_robot_state)
+                if states is None:
+                    print("Motion connection lost")
+                    break
+                if states:
+                    self._publish_states(states)
+        except (OSError, RuntimeError) as e:
+            print("Motion receive error:", e)
+        finally:
+            self.motionTransport.connected = False
+            self._close_subscribers()
+
+    def _publish_states(self, states: list[RobotState]):
+        for state in states:
+            self.currentState = state
+            if state.finished_id is not None:
+                self.last_finished_id = state.finished_id
+            for queue in self._subscribers:
+                if queue.full():
+                    queue.get_nowait()  # slow reader: drop its oldest state
+                queue.put_nowait(state)
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        event, self._state_event = self._state_event, asyncio.Event()
+        event.set()
+
+    def _close_subscribers(self):
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        self._wake_waiters()
+
+    async def states(self, latest_only: bool = False, maxsize: int = 256):
+        """Async iterator over received RobotState frames, ends when the connection closes.
+
+        latest_only skips states that queued up while the consumer was busy.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._subscribers.append(queue)
+        try:
+            while True:
+                state = await queue.get()
+                while latest_only and state is not None and not queue.empty():
+                    state = queue.get_nowait()
+                if state is None:
+                    return
+                yield state
+        finally:
+            self._subscribers.remove(queue)
+
+    async def wait_for_finished(self, cmd_id: int, timeout: float | None = None) -> bool:
+        """Wait until Finished_Id reached cmd_id. Returns False on timeout, stop or disconnect."""
+        try:
+            return await asyncio.wait_for(self._wait_finished(cmd_id), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+    async def _wait_finished(self, cmd_id: int) -> bool:
+        state = self.currentState
+        was_stopped = state is not None and bool(state.stopped)
+
+        while self.last_finished_id < cmd_id:
+            state = self.currentState
+            if not was_stopped and state is not None and state.stopped:
+                return False
+            if not self.motionTransport.connected:
+                return False
+            await self._state_event.wait()
+        return True
+
+    async def wait_all(self, timeout: float | None = None) -> bool:
+        """Wait until every command sent so far has finished."""
+        return await self.wait_for_finished(self.cmd_counter - 1, timeout)
+
+    # ==================== COMMANDS ====================
+
+    async def _send_command(self, encode) -> AsyncCommandHandle:
+        async with self._send_lock:
+            cmd_id = self.cmd_counter
+            await self.motionTransport.send(encode(cmd_id))
+            self.cmd_counter += 1
+        return AsyncCommandHandle(self, cmd_id)
+
+    async def _send_move(self, point: Point6D, mode: int, vel, acc, base, tool, blending,
+                         aux_point: Point6D | None = None) -> AsyncCommandHandle:
+        vel, acc, base, tool, blending = self._resolve_motion_params(vel=vel, acc=acc, base=base, tool=tool, blending=blending)
+        encoder = move_encoder(1, mode, vel, acc, base, tool, blending)
+        return await self._send_command(lambda cmd_id: encoder.encode(cmd_id, point, aux_point))
+
+    async def ptp(self, point: Point6D, vel=None, acc=None, base=None, tool=None, blending=None) -> AsyncCommandHandle:
+        return await self._send_move(point, 2, vel, acc, base, tool, blending)
+
+    async def lin(self, point: Point6D, vel=None, acc=None, base=None, tool=None, blending=None) -> AsyncCommandHandle:
+        return await self._send_move(point, 3, vel, acc, base, tool, blending)
+
+    async def circ(self, end: Point6D, aux: Point6D, vel=None, acc=None, base=None, tool=None, blending=None) -> AsyncCommandHandle:
+        return await self._send_move(end, 6, vel, acc, base, tool, blending, aux_point=aux)
+
+    async def ptp_joint(self, joints: JointState, vel=None, acc=None, base=None, tool=None, blending=None) -> AsyncCommandHandle:
+        vel, acc, base, tool, blending = self._resolve_motion_params(vel=vel, acc=acc, base=base, tool=tool, blending=blending)
+        return await self._send_command(
+            lambda cmd_id: encode_move_joint(cmd_id, joints, 1, 1, vel, acc, base, tool, blending)
+        )
+
+    async def jaw_open(self) -> AsyncCommandHandle:
+        return await self._send_command(lambda cmd_id: encode_grip(cmd_id, 0))
+
+    async def jaw_close(self) -> AsyncCommandHandle:
+        return await self._send_command(lambda cmd_id: encode_grip(cmd_id, 1))
+
+    async def suction_on(self) -> AsyncCommandHandle:
+        return await self._send_command(lambda cmd_id: encode_suction(cmd_id, 1))
+
+    async def suction_off(self) -> AsyncCommandHandle:
+        return await self._send_command(lambda cmd_id: encode_suction(cmd_id, 0))
+
+    async def set_user_out(self, user_out: int, user_outstate: bool) -> AsyncCommandHandle:
+        return await self._send_command(lambda cmd_id: encode_io(cmd_id, user_out, user_outstate))
+
+    async def move_sequence(self, points: list[Point6D], mode: int, vel=None, acc=None, base=None, tool=None,
+                            blending=None, window: int | None = None,
+                            timeout: float | None = None) -> AsyncCommandHandle | None:
+        """Stream a move sequence with the same flow control as MotionController.move_sequence."""
+        vel, acc, base, tool, blending = self._resolve_motion_params(vel=vel, acc=acc, base=base, tool=tool, blending=blending)
+
+        if not points:
+            print("No points provided for sequence.")
+            return None
+
+        window = window or self.stream_window
+        encoder = move_encoder(1, mode, vel, acc, base, tool, blending)
+
+        async with self._send_lock:
+            first_id = self.cmd_counter
+            messages = encoder.encode_each(first_id, points)
+            offsets = [0]
+            for message in messages:
+                offsets.append(offsets[-1] + len(message))
+
+            state = self.currentState
+            was_stopped = state is not None and bool(state.stopped)
+
+            sent = 0
+            last_progress = time.monotonic()
+            while sent < len(messages):
+                finished = self.last_finished_id
+                count = window_room(first_id, sent, finished, offsets, window, self.stream_max_bytes)
+                if count:
+                    await self.motionTransport.send(b"".join(messages[sent:sent + count]))
+                    sent += count
+                    self.cmd_counter = first_id + sent
+                    continue
+
+                state = self.currentState
+                if not was_stopped and state is not None and state.stopped:
+                    print(f"Sequence stopped by controller after {sent} of {len(messages)} moves.")
+                    break
+                if not self.motionTransport.connected:
+                    raise RuntimeError("Not connected")
+
+                wait_time = None
+                if timeout is not None:
+                    wait_time = timeout - (time.monotonic() - last_progress)
+                    if wait_time <= 0:
+                        raise TimeoutError(f"No move finished within {timeout} s (Finished_Id {finished})")
+                try:
+                    await asyncio.wait_for(self._state_event.wait(), wait_time)
+                except asyncio.TimeoutError:
+                    pass
+                if self.last_finished_id != finished:
+                    last_progress = time.monotonic()
+
+        return AsyncCommandHandle(self, self.cmd_counter - 1, first_id=first_id)
+
+
+class AsyncMetaController:
+    """Meta channel (override, abort) on asyncio."""
+
+    _build_xml = MetaController._build_xml
+
+    def __init__(self, metaTransport: AsyncTcpTransport):
+        self.metaTransport = metaTransport
+
+    async def set_override(self, value: int):
+        value = max(0, min(100, value))
+        await self.metaTransport.send(self._build_xml(value, abort=0))
+        print(f" OVERRIDE: {value}%")
+
+    async def abort(self):
+        await self.metaTransport.send(self._build_xml(0, abort=1))
+        print(" ABORT sent")
+
+
+class AsyncRobot(AsyncMotionController, AsyncMetaController):
+    """asyncio version of Robot: one event loop drives the motion and the meta connection."""
+
+    def __init__(self, ip: str, port_meta: int, port_motion: int):
+        self.meta_transport = AsyncTcpTransport(ip, port_meta)
+        self.motion_transport = AsyncTcpTransport(ip, port_motion)
+
+        AsyncMotionController.__init__(self, motionTransport=self.motion_transport)
+        AsyncMetaController.__init__(self, metaTransport=self.meta_transport)
+
+        self._receive_task: asyncio.Task | None = None
+
+    async def connect(self):
+        await self.motion_transport.connect()
+        await self.meta_transport.connect()
+        self._receive_task = asyncio.create_task(self.receive_loop())
+
+    async def disconnect(self, timeout: float | None = None):
+        state = self.currentState
+        if self.motion_transport.connected and not (state is not None and state.stopped):
+            # nach einem Abort meldet die KRC keine Finished_Id mehr
+            await self.wait_all(timeout)
+
+        if self._receive_task is not None:
+            self._receive_task.cancel()
+            try:
+                await self._receive_task
+            except asyncio.CancelledError:
+                pass
+            self._receive_task = None
+
+        self.motion_transport.disconnect()
+        self.meta_transport.disconnect()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
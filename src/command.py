@@ -171,6 +171,7 @@ class Command:
         value = max(0, min(100, value))
         self.override = value
         self.robot.set_override(value)
+        print(f" OVERRIDE: {value}%")
 # -----------------------------------------------------------------------------------------------------------
 
 # --------------------------------------------- functions ---------------------------------------------------
@@ -0,0 +1,42 @@
+class CommandHandle:
+    """Handle for a sent motion command.
+
+    The command counts as finished once the controller reports a Finished_Id
+    greater than or equal to its id. For a move sequence the handle covers the
+    ids first_id..cmd_id and finishes with the last move.
+    """
+
+    def __init__(self, controller, cmd_id: int, first_id: int | None = None):
+        self.controller = controller
+        self.cmd_id = cmd_id
+        self.first_id = first_id if first_id is not None else cmd_id
+
+    @property
+    def empty(self) -> bool:
+        """A sequence of which no move was sent; it counts as finished right away."""
+        return self.first_id > self.cmd_id
+
+    def done(self) -> bool:
+        return self.empty or self.controller.last_finished_id >= self.cmd_id
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the command finished. Returns False on timeout, stop or disconnect."""
+        if self.empty:
+            return True
+        return self.controller.wait_for_finished(self.cmd_id, timeout)
+
+    def __repr__(self):
+        if self.empty:
+            return "CommandHandle(empty)"
+        ids = str(self.cmd_id) if self.first_id == self.cmd_id else f"{self.first_id}..{self.cmd_id}"
+        return f"CommandHandle(id={ids}, done={self.done()})"
+
+
+def wait_all(handles: list[CommandHandle], timeout: float | None = None) -> bool:
+    """Wait until all handles finished; the timeout applies to the whole group."""
+    handles = [handle for handle in handles if not handle.empty]
+    if not handles:
+        return True
+    # Finished_Id only grows, so waiting for the highest id covers all others
+    last = max(handles, key=lambda handle: handle.cmd_id)
+    return last.wait(timeout)
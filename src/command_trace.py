@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from robot_state import RobotState
+
+# RobotCommand/Move/@Mode of motion_eki.xml
+MOVE_MODES = {1: "joint", 2: "ptp", 3: "lin", 6: "circ"}
+
+COMMAND_TYPES = ("move", "grip", "suction", "io")
+
+PERCENTILES = (50, 95, 99)
+
+
+class CommandTrace:
+    """Timestamps of one command id (time.monotonic(), None until it happened)."""
+    __slots__ = ("cmd_id", "cmd_type", "mode", "sent", "acked", "finished")
+
+    def __init__(self, cmd_id: int, cmd_type: str, mode: str | None, sent: float):
+        self.cmd_id = cmd_id
+        self.cmd_type = cmd_type
+        self.mode = mode
+        self.sent = sent
+        self.acked = None
+        self.finished = None
+
+    @property
+    def queue_delay(self) -> float | None:
+        """sent -> first RobotState with Command/@Id == cmd_id."""
+        return None if self.acked is None else self.acked - self.sent
+
+    @property
+    def execution_time(self) -> float | None:
+        """first Command/@Id -> Finished_Id reached cmd_id."""
+        if self.acked is None or self.finished is None:
+            return None
+        return self.finished - self.acked
+
+    @property
+    def total_time(self) -> float | None:
+        return None if self.finished is None else self.finished - self.sent
+
+
+class CommandTracer:
+    """Traces every command id from send over ack to finish.
+
+    The sender calls sent(), the receiver calls observe() for each RobotState.
+    A command is acked when Command/@Id first shows its id and finished when
+    Finished_Id reaches it; ids the controller finishes without ever reporting
+    them as current (e.g. gripper commands between two states) have no queue
+    delay or execution time, only a total time. Completed traces go into
+    rolling windows per move mode and per command type for percentiles.
+    """
+
+    def __init__(self, window: int = 1000, max_pending: int = 4096):
+        self.window = window
+        self.max_pending = max_pending
+        self.completed: deque[CommandTrace] = deque(maxlen=window)
+
+        self._pending: dict[int, CommandTrace] = {}
+        self._finished_id = 0
+        self._samples: dict[tuple[str, str], dict[str, deque]] = {}
+        self._lock = threading.Lock()
+
+    def sent(self, cmd_id: int, cmd_type: str, mode: int | None = None, timestamp: float | None = None):
+        self.sent_range(cmd_id, cmd_id, cmd_type, mode, timestamp)
+
+    def sent_range(self, first_id: int, last_id: int, cmd_type: str, mode: int | None = None,
+                   timestamp: float | None = None):
+        """Register ids first_id..last_id sent together in one payload."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        mode_name = MOVE_MODES.get(mode) if cmd_type == "move" else None
+
+        with self._lock:
+            for cmd_id in range(first_id, last_id + 1):
+                self._pending[cmd_id] = CommandTrace(cmd_id, cmd_type, mode_name, timestamp)
+            # commands that never finish (stop, reconnect) must not accumulate
+            while len(self._pending) > self.max_pending:
+                del self._pending[next(iter(self._pending))]
+
+    def observe(self, state: RobotState, timestamp: float | None = None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        with self._lock:
+            if not self._pending:
+                if state.finished_id is not None:
+                    self._finished_id = max(self._finished_id, state.finished_id)
+                return
+
+            trace = self._pending.get(state.cmd_id) if state.cmd_id else None
+            if trace is not None and trace.acked is None:
+                trace.acked = timestamp
+
+            finished_id = state.finished_id
+            if finished_id is None or finished_id <= self._finished_id:
+                return
+            # only pending ids can finish; skip the range if nothing of it is pending
+            first = max(self._finished_id + 1, min(self._pending))
+            for cmd_id in range(first, finished_id + 1):
+                trace = self._pending.pop(cmd_id, None)
+                if trace is not None:
+                    trace.finished = timestamp
+                    self._complete(trace)
+            self._finished_id = finished_id
+
+    def observe_all(self, states: list[RobotState], timestamp: float | None = None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        for state in states:
+            self.observe(state, timestamp)
+
+    def _complete(self, trace: CommandTrace):
+        self.completed.append(trace)
+        for group in (("type", trace.cmd_type), ("mode", trace.mode)):
+            if group[1] is None:
+                continue
+            samples = self._samples.get(group)
+            if samples is None:
+                samples = self._samples[group] = {
+                    name: deque(maxlen=self.window) for name in ("queue", "execution", "total")
+                }
+            for name, value in (("queue", trace.queue_delay), ("execution", trace.execution_time),
+                                ("total", trace.total_time)):
+                if value is not None:
+                    samples[name].append(value)
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def percentiles(self) -> dict:
+        """p50/p95/p99 in seconds per group, e.g. result["mode"]["lin"]["execution"]["p95"]."""
+        with self._lock:
+            snapshot = {group: {name: list(values) for name, values in samples.items()}
+                        for group, samples in self._samples.items()}
+
+        result = {"type": {}, "mode": {}}
+        for (kind, key), samples in snapshot.items():
+            entry = result[kind][key] = {}
+            for name, values in samples.items():
+                if not values:
+                    continue
+                stats = dict(zip((f"p{p}" for p in PERCENTILES), np.percentile(values, PERCENTILES).tolist()))
+                stats["count"] = len(values)
+                entry[name] = stats
+        return result
+
+    def report(self) -> str:
+        """Human-readable table of percentiles in milliseconds."""
+        lines = [f"{'group':<14}{'metric':<11}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}"]
+        for kind, groups in self.percentiles().items():
+            for key, metrics in sorted(groups.items()):
+                for name, stats in metrics.items():
+                    lines.append(
+                        f"{kind + ':' + key:<14}{name:<11}{stats['count']:>7}"
+                        + "".join(f"{stats[f'p{p}'] * 1e3:>10.1f}" for p in PERCENTILES)
+                    )
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._samples.clear()
+            self.completed.clear()
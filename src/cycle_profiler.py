@@ -0,0 +1,250 @@
+import argparse
+import html
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from recorder import open_recording, list_recordings
+
+# timeline categories, in the order they are drawn
+MOTION = "motion"
+STATIONARY = "stationary"
+GRIPPER_DWELL = "gripper_dwell"
+HOST_GAP = "host_gap"
+CATEGORIES = (MOTION, STATIONARY, GRIPPER_DWELL, HOST_GAP)
+
+_COLORS = {MOTION: "#4caf50", STATIONARY: "#ffb300", GRIPPER_DWELL: "#42a5f5", HOST_GAP: "#e53935"}
+
+_NON_MOVE_KINDS = ("grip", "suction", "io")
+
+
+def command_kinds(tracer) -> dict[int, str]:
+    """Map command id -> "lin"/"ptp"/.../"grip" from the traces a CommandTracer kept."""
+    kinds = {}
+    for trace in list(tracer.completed):
+        kinds[trace.cmd_id] = trace.mode or trace.cmd_type
+    return kinds
+
+
+def build_timeline(samples: np.ndarray, kinds: dict[int, str] | None = None,
+                   velocity_threshold: float = 0.1, joint_epsilon: float = 0.01,
+                   cartesian_epsilon: float = 0.05) -> dict:
+    """Rebuild a per-command timeline from TELEMETRY_DTYPE samples.
+
+    Every interval between two samples is classified: the robot moves if a
+    joint velocity exceeds velocity_threshold or the pose changed; while it
+    stands still the interval counts as gripper dwell for grip/suction/IO
+    commands, as stationary time inside moves (blending gaps, accelerating)
+    and as host gap when Command/@Id is 0, i.e. the controller had nothing
+    queued. Returns a dict with segments, commands and a summary in seconds.
+    """
+    kinds = kinds or {}
+    if len(samples) < 2:
+        return {"start": None, "duration": 0.0, "segments": [], "commands": [], "summary": _summary({}, 0.0)}
+
+    t = np.asarray(samples["timestamp"], dtype=float)
+    cmd = np.asarray(samples["cmd_id"])
+    start, end = t[:-1], t[1:]
+
+    with np.errstate(invalid="ignore"):
+        velocity = np.nan_to_num(np.abs(samples["velocity"][:-1])).max(axis=1)
+        joint_delta = np.nan_to_num(np.abs(np.diff(samples["joints"], axis=0))).max(axis=1)
+        cart_delta = np.nan_to_num(np.abs(np.diff(samples["cartesian"][:, :3], axis=0))).max(axis=1)
+    moving = (velocity > velocity_threshold) | (joint_delta > joint_epsilon) | (cart_delta > cartesian_epsilon)
+
+    ids = cmd[:-1]
+    categories = np.where(moving, MOTION, np.where(ids <= 0, HOST_GAP, STATIONARY)).astype(object)
+    for cmd_id in np.unique(ids[~moving & (ids > 0)]):
+        if kinds.get(int(cmd_id)) in _NON_MOVE_KINDS:
+            categories[(ids == cmd_id) & ~moving] = GRIPPER_DWELL
+
+    # merge consecutive intervals with the same command and category
+    change = np.flatnonzero((ids[1:] != ids[:-1]) | (categories[1:] != categories[:-1])) + 1
+    lows = np.concatenate(([0], change))
+    highs = np.concatenate((change, [len(ids)]))
+
+    origin = float(t[0])
+    segments = []
+    totals = dict.fromkeys(CATEGORIES, 0.0)
+    commands: dict[int, dict] = {}
+    for lo, hi in zip(lows, highs):
+        category = categories[lo]
+        cmd_id = int(ids[lo])
+        seg_start, seg_end = float(start[lo]) - origin, float(end[hi - 1]) - origin
+        duration = seg_end - seg_start
+        segments.append({"category": category, "cmd_id": cmd_id, "start": seg_start, "duration": duration})
+        totals[category] += duration
+
+        if cmd_id > 0:
+            entry = commands.get(cmd_id)
+            if entry is None:
+                entry = commands[cmd_id] = {"cmd_id": cmd_id, "kind": kinds.get(cmd_id, "unknown"),
+                                            "start": seg_start, **dict.fromkeys(CATEGORIES, 0.0)}
+            entry["end"] = seg_end
+            entry[category] += duration
+
+    total = float(t[-1] - t[0])
+    return {
+        "start": origin,
+        "duration": total,
+        "segments": segments,
+        "commands": list(commands.values()),
+        "summary": _summary(totals, total),
+    }
+
+
+def _summary(totals: dict, total: float) -> dict:
+    summary = {category: round(totals.get(category, 0.0), 6) for category in CATEGORIES}
+    robot = total - summary[HOST_GAP]
+    summary["total"] = round(total, 6)
+    summary["host_share"] = round(summary[HOST_GAP] / total, 4) if total else 0.0
+    if not total:
+        summary["limited_by"] = "no data"
+    else:
+        summary["limited_by"] = "host" if summary[HOST_GAP] > robot * 0.1 else "robot"
+    return summary
+
+
+def to_chrome_trace(timeline: dict) -> dict:
+    """Chrome trace event format (chrome://tracing, Perfetto) as flame chart."""
+    events = [
+        {"ph": "M", "pid": 1, "tid": 1, "name": "thread_name", "args": {"name": "commands"}},
+        {"ph": "M", "pid": 1, "tid": 2, "name": "thread_name", "args": {"name": "robot"}},
+    ]
+    for command in timeline["commands"]:
+        events.append({
+            "ph": "X", "pid": 1, "tid": 1, "cat": "command",
+            "name": f"{command['kind']} #{command['cmd_id']}",
+            "ts": command["start"] * 1e6, "dur": (command["end"] - command["start"]) * 1e6,
+            "args": {c: round(command[c], 4) for c in CATEGORIES},
+        })
+    for segment in timeline["segments"]:
+        events.append({
+            "ph": "X", "pid": 1, "tid": 2, "cat": segment["category"], "name": segment["category"],
+            "ts": segment["start"] * 1e6, "dur": segment["duration"] * 1e6,
+            "args": {"cmd_id": segment["cmd_id"]},
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": timeline["summary"]}
+
+
+def to_html(timeline: dict, title: str = "Cycle time profile") -> str:
+    total = timeline["duration"] or 1.0
+    summary = timeline["summary"]
+
+    def bar(items, label_of):
+        parts = []
+        for item, category in items:
+            left = item["start"] / total * 100
+            width = max((item["duration"] if "duration" in item else item["end"] - item["start"]) / total * 100, 0.05)
+            parts.append(
+                f'<div class="seg" style="left:{left:.3f}%;width:{width:.3f}%;background:{_COLORS.get(category, "#9e9e9e")}"'
+                f' title="{html.escape(label_of(item))}"></div>'
+            )
+        return "".join(parts)
+
+    commands = bar(
+        [(c, max(CATEGORIES, key=lambda k: c[k])) for c in timeline["commands"]],
+        lambda c: f"{c['kind']} #{c['cmd_id']}: {c['end'] - c['start']:.3f} s",
+    )
+    segments = bar(
+        [(s, s["category"]) for s in timeline["segments"]],
+        lambda s: f"{s['category']} (id {s['cmd_id']}): {s['duration']:.3f} s",
+    )
+    rows = "".join(
+        f'<tr><td><span class="key" style="background:{_COLORS[c]}"></span>{c}</td>'
+        f'<td>{summary[c]:.3f} s</td><td>{summary[c] / total * 100:.1f} %</td></tr>'
+        for c in CATEGORIES
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+.track {{ position: relative; height: 28px; background: #f5f5f5; margin: 4px 0 16px; }}
+.seg {{ position: absolute; top: 0; bottom: 0; }}
+.key {{ display: inline-block; width: 12px; height: 12px; margin-right: 6px; }}
+td {{ padding: 2px 12px 2px 0; }}
+</style></head><body>
+<h1>{html.escape(title)}</h1>
+<p>Duration {summary['total']:.3f} s, limited by <b>{summary['limited_by']}</b>
+(host gaps {summary['host_share'] * 100:.1f} %).</p>
+<table>{rows}</table>
+<h2>Commands</h2><div class="track">{commands}</div>
+<h2>Robot activity</h2><div class="track">{segments}</div>
+</body></html>
+"""
+
+
+def write_report(timeline: dict, path):
+    """Write timeline as .html, as Chrome trace (.trace.json) or as plain .json."""
+    path = Path(path)
+    if path.suffix == ".html":
+        text = to_html(timeline)
+    elif path.name.endswith(".trace.json"):
+        text = json.dumps(to_chrome_trace(timeline))
+    else:
+        text = json.dumps(timeline, indent=2)
+    path.write_text(text, encoding="utf-8")
+
+
+class CycleProfiler:
+    """Profile a script run live from a Robot's telemetry and command traces.
+
+        with CycleProfiler(kuka, "job.html") as profiler:
+            ...                     # moves, grips, IO
+        print(profiler.timeline["summary"])
+
+    The TelemetryBuffer has to hold the whole run (10 minutes at 50 Hz by default).
+    """
+
+    def __init__(self, robot, path=None, **options):
+        self.robot = robot
+        self.path = path
+        self.options = options
+        self.timeline = None
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.time()
+        return self
+
+    def __exit__(self, *exc):
+        self.timeline = self.stop()
+
+    def stop(self) -> dict:
+        samples = self.robot.telemetry.samples()
+        samples = samples[samples["timestamp"] >= self._start]
+        timeline = build_timeline(samples, command_kinds(self.robot.tracer), **self.options)
+        if self.path is not None:
+            write_report(timeline, self.path)
+        return timeline
+
+
+def profile_recording(paths, **options) -> dict:
+    """Build the timeline of a recorded session (files of recorder.py).
+
+    Recordings do not know the command types, so gripper dwell shows up as
+    stationary time unless kinds (id -> "grip", ...) are passed in options.
+    """
+    recordings = [open_recording(path) for path in paths]
+    samples = np.concatenate(recordings) if recordings else np.empty(0)
+    return build_timeline(samples, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cycle-time report of a recorded robot session")
+    parser.add_argument("recording", help="recording file or directory with telemetry_*.bin files")
+    parser.add_argument("outputs", nargs="+", help="report files: .html, .trace.json or .json")
+    args = parser.parse_args()
+
+    source = Path(args.recording)
+    paths = list_recordings(source) if source.is_dir() else [source]
+    timeline = profile_recording(paths)
+    for output in args.outputs:
+        write_report(timeline, output)
+    print(json.dumps(timeline["summary"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
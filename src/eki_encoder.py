@@ -0,0 +1,120 @@
+from functools import lru_cache
+from point import Point6D, JointState
+
+# Precompiled templates for the RobotCommand messages of motion_eki.xml.
+# They produce exactly the bytes the former ElementTree builders produced
+# (attribute order, "<Tag ... />" for empty elements, header and footer), but
+# format the values directly instead of building and serialising a tree.
+
+_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<EthernetKRL>\n'
+_FOOTER = '\n</EthernetKRL>\n'
+
+_ZEROS = ("0",) * 6
+
+_MOVE_PARAMS = (
+    'Type="%s"><Move Mode="%s" BaseIndex="%s" ToolIndex="%s" Velocity="%s" '
+    'Acceleration="%s" Blending="%s" WaitForGripper="%s">'
+)
+_CARTESIAN = '<Cartesian X="%s" Y="%s" Z="%s" A="%s" B="%s" C="%s" />'
+_CARTESIAN_AUX = '<Cartesian_Aux X="%s" Y="%s" Z="%s" A="%s" B="%s" C="%s" />'
+_JOINT = '<Joint A1="%s" A2="%s" A3="%s" A4="%s" A5="%s" A6="%s" />'
+
+_GRIP = _HEADER + '<RobotCommand Id="%s" Type="3"><Grip><Jaw DirectionMode="%s" /></Grip></RobotCommand>' + _FOOTER
+_SUCTION = _HEADER + '<RobotCommand Id="%s" Type="4"><Suction><Vacuum Suction="%s" /></Suction></RobotCommand>' + _FOOTER
+_IO = _HEADER + '<RobotCommand Id="%s" Type="5"><IO user_out="%s" user_outstate="%s" /></RobotCommand>' + _FOOTER
+
+
+class MoveEncoder:
+    """Encoder for RobotCommand/Move messages that share the same motion parameters.
+
+    The constant part (type, mode, base, tool, velocity, ...) is formatted once
+    in the constructor; encoding a point only fills in the id and coordinates.
+    """
+
+    def __init__(self, cmd_type: int, mode: int, vel: float, acc: float, base: int, tool: int,
+                 blending: float, wait_for_gripper: int = 0):
+        params = _MOVE_PARAMS % (cmd_type, mode, base, tool, vel, acc, blending, wait_for_gripper)
+        head = _HEADER + '<RobotCommand Id="%s" ' + params.replace("%", "%%")
+        tail = '</Move></RobotCommand>' + _FOOTER
+
+        # cartesian target (+ optional aux point), joints unused
+        self._cartesian_template = head + _CARTESIAN + _CARTESIAN_AUX + (_JOINT % _ZEROS) + tail
+        # joint target, cartesian values unused
+        self._joint_template = head + (_CARTESIAN % _ZEROS) + (_CARTESIAN_AUX % _ZEROS) + _JOINT + tail
+
+    def _format(self, cmd_id: int, point: Point6D, aux_point: Point6D | None = None) -> str:
+        if aux_point is None:
+            aux = _ZEROS
+        else:
+            aux = (aux_point.x, aux_point.y, aux_point.z, aux_point.a, aux_point.b, aux_point.c)
+        return self._cartesian_template % (
+            cmd_id, point.x, point.y, point.z, point.a, point.b, point.c, *aux
+        )
+
+    def encode(self, cmd_id: int, point: Point6D, aux_point: Point6D | None = None) -> bytes:
+        return self._format(cmd_id, point, aux_point).encode("utf-8")
+
+    def encode_joint(self, cmd_id: int, joints: JointState) -> bytes:
+        return (self._joint_template % (
+            cmd_id, joints.a1, joints.a2, joints.a3, joints.a4, joints.a5, joints.a6
+        )).encode("utf-8")
+
+    def encode_each(self, first_id: int, points: list[Point6D]) -> list[bytes]:
+        """Encode points as separate messages with consecutive ids starting at first_id."""
+        template = self._cartesian_template
+        return [
+            (template % (cmd_id, p.x, p.y, p.z, p.a, p.b, p.c, *_ZEROS)).encode("utf-8")
+            for cmd_id, p in enumerate(points, start=first_id)
+        ]
+
+    def encode_batch(self, first_id: int, points: list[Point6D]) -> bytes:
+        """Encode points into one payload with consecutive ids starting at first_id."""
+        template = self._cartesian_template
+        return "".join([
+            template % (cmd_id, p.x, p.y, p.z, p.a, p.b, p.c, *_ZEROS)
+            for cmd_id, p in enumerate(points, start=first_id)
+        ]).encode("utf-8")
+
+
+def move_encoder(cmd_type: int, mode: int, vel: float, acc: float, base: int, tool: int,
+                 blending: float, wait_for_gripper: int = 0) -> MoveEncoder:
+    """Return a cached MoveEncoder, so repeated moves with the same parameters reuse it."""
+    # keyed by the formatted values: 1 == 1.0 and 0.0 == -0.0 must not share an encoder
+    return _cached_move_encoder(str(cmd_type), str(mode), str(vel), str(acc), str(base), str(tool),
+                                str(blending), str(wait_for_gripper))
+
+
+@lru_cache(maxsize=32)
+def _cached_move_encoder(*params: str) -> MoveEncoder:
+    return MoveEncoder(*params)
+
+
+def encode_move(cmd_id: int, point: Point6D, cmd_type: int, mode: int, vel: float, acc: float,
+                base: int, tool: int, blending: float, wait_for_gripper: int = 0,
+                aux_point: Point6D | None = None) -> bytes:
+    encoder = move_encoder(cmd_type, mode, vel, acc, base, tool, blending, wait_for_gripper)
+    return encoder.encode(cmd_id, point, aux_point)
+
+
+def encode_move_joint(cmd_id: int, joints: JointState, cmd_type: int, mode: int, vel: float, acc: float,
+                      base: int, tool: int, blending: float, wait_for_gripper: int = 0) -> bytes:
+    encoder = move_encoder(cmd_type, mode, vel, acc, base, tool, blending, wait_for_gripper)
+    return encoder.encode_joint(cmd_id, joints)
+
+
+def encode_move_batch(first_id: int, points: list[Point6D], cmd_type: int, mode: int, vel: float,
+                      acc: float, base: int, tool: int, blending: float, wait_for_gripper: int = 0) -> bytes:
+    encoder = move_encoder(cmd_type, mode, vel, acc, base, tool, blending, wait_for_gripper)
+    return encoder.encode_batch(first_id, points)
+
+
+def encode_grip(cmd_id: int, jaw_direction_mode: int) -> bytes:
+    return (_GRIP % (cmd_id, jaw_direction_mode)).encode("utf-8")
+
+
+def encode_suction(cmd_id: int, suction_mode: int) -> bytes:
+    return (_SUCTION % (cmd_id, suction_mode)).encode("utf-8")
+
+
+def encode_io(cmd_id: int, user_out: int, user_outstate: bool) -> bytes:
+    return (_IO % (cmd_id, user_out, "1" if user_outstate else "0")).encode("utf-8")
@@ -0,0 +1,139 @@
+class RobotStateFramer:
+    """Reassembles complete RobotState documents from the motion TCP stream.
+
+    TCP does not preserve message boundaries: one recv() can hold several
+    RobotState documents or only part of one. The framer keeps the bytes of an
+    unfinished document until the rest arrives and returns every complete
+    document in the order it was received.
+
+    Received data lives in one preallocated buffer that the socket writes into
+    directly (recv_into), so frames can be decoded in place without copying.
+    """
+
+    START_TAG = b"<RobotState"
+    END_TAG = b"</RobotState>"
+
+    def __init__(self, latest_only: bool = False, max_buffer: int = 65536):
+        # latest_only: only return the newest complete frame of each feed() call
+        self.latest_only = latest_only
+        self.max_buffer = max_buffer
+
+        self._buffer = bytearray(max_buffer)
+        self._view = memoryview(self._buffer)
+        self._size = 0
+
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.frames_malformed = 0
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Append received bytes and return all frames completed by them."""
+        frames: list[bytes] = []
+        emit = lambda start, end: frames.append(bytes(self._view[start:end]))
+
+        data = memoryview(data)
+        while data:
+            count = min(len(data), self.max_buffer - self._size)
+            self._view[self._size:self._size + count] = data[:count]
+            self._size += count
+            data = data[count:]
+            self._extract(emit)
+
+        return frames
+
+    def recv_into(self, read_into, decode) -> list | None:
+        """Receive once via read_into(buffer) and return the decoded complete frames.
+
+        decode(buffer, start, end) is called for each frame while it is still in
+        the receive buffer. Frames it rejects with ValueError are counted as
+        malformed and skipped. Returns None when the peer closed the connection.
+        """
+        return self.commit(read_into(self.free_space()), decode)
+
+    def free_space(self) -> memoryview:
+        """Writable part of the receive buffer, for callers that receive themselves."""
+        return self._view[self._size:]
+
+    def commit(self, count: int, decode) -> list | None:
+        """Account for count bytes written into free_space() and decode the complete frames."""
+        if not count:
+            return None
+        self._size += count
+
+        decoded = []
+
+        def emit(start, end):
+            try:
+                decoded.append(decode(self._buffer, start, end))
+            except ValueError:
+                self.frames_malformed += 1
+
+        self._extract(emit)
+        return decoded
+
+    def mark_malformed(self):
+        """Count a frame that was complete but could not be decoded."""
+        self.frames_malformed += 1
+
+    def reset(self):
+        """Forget any partial frame, e.g. after a reconnect."""
+        self._size = 0
+
+    def _extract(self, emit):
+        buf = self._buffer
+        size = self._size
+        pos = 0
+        latest_start = latest_end = -1
+        found = 0
+
+        while True:
+            end = buf.find(self.END_TAG, pos, size)
+            if end < 0:
+                break
+            end += len(self.END_TAG)
+
+            start = buf.rfind(self.START_TAG, pos, end)
+            if start < 0:
+                # closing tag without opening tag -> rest of a frame we never saw
+                self.frames_malformed += 1
+            else:
+                if buf.find(self.START_TAG, pos, start) >= 0:
+                    # an earlier frame was cut off before its closing tag
+                    self.frames_malformed += 1
+                found += 1
+                if self.latest_only:
+                    latest_start, latest_end = start, end
+                else:
+                    emit(start, end)
+            pos = end
+
+        if latest_start >= 0:
+            emit(latest_start, latest_end)
+            self.frames_dropped += found - 1
+        self.frames_received += found
+
+        # move the unfinished rest to the front of the buffer
+        if pos:
+            rest = size - pos
+            self._view[:rest] = self._view[pos:size]
+            self._size = rest
+
+        self._discard_overflow()
+
+    def _discard_overflow(self):
+        if self._size < self.max_buffer:
+            return
+
+        # buffer full without a closing tag: keep only the newest frame start
+        start = self._buffer.rfind(self.START_TAG, 0, self._size)
+        if start > 0:
+            rest = self._size - start
+            self._view[:rest] = self._view[start:self._size]
+            self._size = rest
+        else:
+            self._size = 0
+        self.frames_malformed += 1
+
+    @property
+    def pending_bytes(self) -> int:
+        return self._size
@@ -0,0 +1,40 @@
+import threading
+
+
+class IdAllocator:
+    """Hands out RobotCommand ids, safe for several producer threads.
+
+    reserve(n) returns the first of n contiguous ids that no other caller
+    gets. Ids are never reused, except that release() can hand back the
+    unsent tail of the newest reservation (a sequence that stopped early),
+    so wait_all does not wait for ids that never reach the controller.
+    """
+
+    def __init__(self, first_id: int = 1):
+        self._next = first_id
+        self._lock = threading.Lock()
+
+    @property
+    def next_id(self) -> int:
+        """The id the next reserve() will return."""
+        return self._next
+
+    def reserve(self, count: int = 1) -> int:
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        with self._lock:
+            first = self._next
+            self._next += count
+            return first
+
+    def release(self, first_unused: int, end: int) -> bool:
+        """Give back ids first_unused..end-1 if they are the newest reservation."""
+        with self._lock:
+            if self._next != end or first_unused > end:
+                return False
+            self._next = first_unused
+            return True
+
+    def reset(self, next_id: int):
+        with self._lock:
+            self._next = next_id
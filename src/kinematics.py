@@ -0,0 +1,360 @@
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from point import Point6D, JointState
+from scene_assets import ROBOT_URDF
+
+# frame of the KRC Cartesian position without tool ($FLANGE, X points out of the flange);
+# tool0 of the URDF is the ROS variant of it with Z out of the flange
+DEFAULT_TIP = "flange"
+
+
+def rpy_matrix(roll: float, pitch: float, yaw: float) -> np.ndarray:
+    """Rotation of a URDF origin rpy: fixed axes X, Y, Z, i.e. Rz(yaw) @ Ry(pitch) @ Rx(roll)."""
+    return abc_to_matrix(np.degrees([yaw, pitch, roll]))
+
+
+def abc_to_matrix(abc_deg) -> np.ndarray:
+    """Rotation matrices (..., 3, 3) of KUKA A/B/C angles in degrees (Rz(A) @ Ry(B) @ Rx(C))."""
+    a, b, c = np.moveaxis(np.radians(np.asarray(abc_deg, dtype=np.float64)), -1, 0)
+    ca, sa, cb, sb, cc, sc = np.cos(a), np.sin(a), np.cos(b), np.sin(b), np.cos(c), np.sin(c)
+    r = np.empty(a.shape + (3, 3))
+    r[..., 0, 0] = ca * cb
+    r[..., 0, 1] = ca * sb * sc - sa * cc
+    r[..., 0, 2] = ca * sb * cc + sa * sc
+    r[..., 1, 0] = sa * cb
+    r[..., 1, 1] = sa * sb * sc + ca * cc
+    r[..., 1, 2] = sa * sb * cc - ca * sc
+    r[..., 2, 0] = -sb
+    r[..., 2, 1] = cb * sc
+    r[..., 2, 2] = cb * cc
+    return r
+
+
+def matrix_to_abc(r: np.ndarray) -> np.ndarray:
+    """KUKA A/B/C in degrees (..., 3) of rotation matrices (..., 3, 3).
+
+    At B = +-90 deg only A - C (A + C) is defined, like the KRC the
+    whole rotation is then put into A and C is 0.
+    """
+    r = np.asarray(r, dtype=np.float64)
+    cb = np.hypot(r[..., 0, 0], r[..., 1, 0])
+    b = np.arctan2(-r[..., 2, 0], cb)
+    singular = cb < 1e-9
+    a = np.where(singular, np.arctan2(-r[..., 0, 1], r[..., 1, 1]), np.arctan2(r[..., 1, 0], r[..., 0, 0]))
+    c = np.where(singular, 0.0, np.arctan2(r[..., 2, 1], r[..., 2, 2]))
+    return np.degrees(np.stack([a, b, c], axis=-1))
+
+
+def _rotate_about_axis(rot: np.ndarray, axis: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    """rot @ R(axis, angle) for rotations stored as (3, 3, N) and one unit axis.
+
+    URDF axes are nearly always +-X/Y/Z, then only two columns change and
+    are updated in place; other axes get the Rodrigues matrix of every angle.
+    """
+    k = int(np.argmax(np.abs(axis)))
+    if abs(axis[k]) == 1.0:
+        angles = angles * axis[k]
+        c, s = np.cos(angles), np.sin(angles)
+        i, j = (k + 1) % 3, (k + 2) % 3
+        col_i, col_j = rot[:, i], rot[:, j]
+        old_i = col_i.copy()
+        tmp = np.empty_like(old_i)
+        col_i *= c
+        col_i += np.multiply(col_j, s, out=tmp)
+        col_j *= c
+        col_j -= np.multiply(old_i, s, out=tmp)
+        return rot
+
+    x, y, z = axis
+    skew = np.array([[0.0, -z, y], [z, 0.0, -x], [-y, x, 0.0]])
+    c, s = np.cos(angles), np.sin(angles)
+    turn = np.eye(3)[:, :, None] + s * skew[:, :, None] + (1.0 - c) * (skew @ skew)[:, :, None]
+    return np.einsum("ikn,kjn->ijn", rot, turn)
+
+
+def _apply_fixed(rot: np.ndarray, pos: np.ndarray, xyz: np.ndarray, fixed_rot: np.ndarray):
+    """Append a fixed transform to frames stored as (3, 3, N) and (3, N), pos in place."""
+    tmp = np.empty_like(pos)
+    for k in np.flatnonzero(xyz):
+        pos += np.multiply(rot[:, k], xyz[k], out=tmp)
+    if not np.array_equal(fixed_rot, np.eye(3)):
+        rot = np.ascontiguousarray(np.tensordot(fixed_rot, rot, axes=([0], [1])).transpose(1, 0, 2))
+    return rot, pos
+
+
+@dataclass(frozen=True)
+class KinematicChain:
+    """Serial chain A1..A6 of the URDF, lengths in mm, limits in degrees.
+
+    origins_* are the fixed joint origins (parent link to joint frame),
+    tip_* the fixed transform from the last axis to the tip frame.
+    """
+    joint_names: tuple[str, ...]
+    origins_xyz: np.ndarray       # (6, 3)
+    origins_rot: np.ndarray       # (6, 3, 3)
+    axes: np.ndarray              # (6, 3)
+    lower: np.ndarray             # (6,)
+    upper: np.ndarray             # (6,)
+    tip_xyz: np.ndarray           # (3,)
+    tip_rot: np.ndarray           # (3, 3)
+
+    def forward(self, joints_deg) -> np.ndarray:
+        """Tip poses (N, 6) as X, Y, Z [mm], A, B, C [deg] of joint vectors (N, 6) in degrees.
+
+        A single vector (6,) gives a single pose (6,). Rows of a telemetry
+        buffer or recording can be passed directly as rows["joints"].
+        """
+        rot, pos = self.forward_frames(joints_deg)
+        return np.concatenate([pos, matrix_to_abc(rot)], axis=-1)
+
+    def forward_frames(self, joints_deg) -> tuple[np.ndarray, np.ndarray]:
+        """Tip rotations (N, 3, 3) and positions (N, 3) in mm of joint vectors (N, 6) in degrees."""
+        q = np.radians(np.asarray(joints_deg, dtype=np.float64))
+        single = q.ndim == 1
+        q = np.atleast_2d(q)
+        if q.shape[-1] != 6:
+            raise ValueError(f"expected joint vectors of 6 axes, got shape {q.shape}")
+
+        # component-major (3, 3, N): every product below runs over contiguous N-vectors
+        n = q.shape[0]
+        rot = np.repeat(np.eye(3)[:, :, None], n, axis=2)
+        pos = np.zeros((3, n))
+        for i in range(6):
+            rot, pos = _apply_fixed(rot, pos, self.origins_xyz[i], self.origins_rot[i])
+            rot = _rotate_about_axis(rot, self.axes[i], q[:, i])
+        rot, pos = _apply_fixed(rot, pos, self.tip_xyz, self.tip_rot)
+        rot, pos = np.moveaxis(rot, 2, 0), pos.T
+
+        if single:
+            return rot[0], pos[0]
+        return rot, pos
+
+    def forward_point(self, joints: JointState, name: str = "") -> Point6D:
+        """Tip pose of one JointState as Point6D."""
+        pose = self.forward([joints.a1, joints.a2, joints.a3, joints.a4, joints.a5, joints.a6])
+        return Point6D(name, *(float(v) for v in pose))
+
+    @cached_property
+    def ik_layout(self) -> "_IkLayout":
+        return _ik_layout(self)
+
+    def within_limits(self, joints_deg) -> np.ndarray:
+        """True for every joint vector (..., 6) inside the URDF limits, False for NaN rows."""
+        q = np.asarray(joints_deg, dtype=np.float64)
+        return np.all((q >= self.lower) & (q <= self.upper), axis=-1)
+
+    def status(self, joints_deg) -> np.ndarray:
+        """KRC Status bits (...,) of joint vectors (..., 6) in degrees.
+
+        Bit 0: wrist point behind A1 (overhead area), bit 1: A3 beyond the
+        stretched arm (elbow up), bit 2: A5 negative.
+        """
+        q = np.radians(np.asarray(joints_deg, dtype=np.float64))
+        reach, gamma = self._arm(q)
+        overhead = reach < 0
+        elbow = gamma < 0
+        flip = q[..., 4] < 0
+        return overhead.astype(np.int8) | (elbow.astype(np.int8) << 1) | (flip.astype(np.int8) << 2)
+
+    def manipulability(self, joints_deg) -> np.ndarray:
+        """Yoshikawa measure |det J| (...,) of the geometric Jacobian in mm^3 of joint vectors (..., 6).
+
+        For the spherical wrist it splits into arm and wrist:
+        |det J| = reach * l2 * l3 * |sin(gamma)| * |sin(A5)|, 0 at every singularity.
+        """
+        layout = self.ik_layout
+        q = np.radians(np.asarray(joints_deg, dtype=np.float64))
+        reach, gamma = self._arm(q)
+        return np.abs(reach * layout.l2 * layout.l3 * np.sin(gamma) * np.sin(layout.s5 * q[..., 4]))
+
+    @property
+    def max_manipulability(self) -> float:
+        """Upper bound of manipulability(), for a relative measure between 0 and 1."""
+        layout = self.ik_layout
+        return layout.l2 * layout.l3 * (abs(layout.shoulder[0]) + layout.l2 + layout.l3)
+
+    def _arm(self, q: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Wrist point distance in front of A1 and elbow angle gamma (0 = stretched) of radians q (..., 6)."""
+        layout = self.ik_layout
+        theta2 = layout.s2 * q[..., 1]
+        theta3 = layout.s3 * q[..., 2]
+        reach = (layout.l2 * np.cos(theta2 - layout.phi2)
+                 + layout.l3 * np.cos(theta2 + theta3 - layout.phi3) + layout.shoulder[0])
+        return reach, layout.phi3 - layout.phi2 - theta3
+
+    def inverse(self, poses) -> np.ndarray:
+        """All joint solutions (N, 8, 6) in degrees of tip poses (N, 6) X, Y, Z, A, B, C.
+
+        Solution s is the one with Status s (see status()). Rows of poses out
+        of reach are NaN, limits are not applied (see within_limits()). At the
+        wrist singularity (A5 = 0) A4 is 0 and A6 takes the whole rotation.
+        All angles are in (-180, 180].
+        """
+        layout = self.ik_layout
+        poses = np.atleast_2d(np.asarray(poses, dtype=np.float64))
+        if poses.shape[-1] != 6:
+            raise ValueError(f"expected poses X, Y, Z, A, B, C, got shape {poses.shape}")
+        n = poses.shape[0]
+
+        r6 = abc_to_matrix(poses[:, 3:]) @ self.tip_rot.T
+        wrist = poses[:, :3] - r6 @ layout.wrist_offset
+
+        # A1: front (bit 0 clear) and overhead solution, (N, 2)
+        theta1 = np.arctan2(wrist[:, 1], wrist[:, 0])[:, None] + np.array([0.0, np.pi])
+        c1, s1 = np.cos(theta1), np.sin(theta1)
+        dx = wrist[:, 0, None] * c1 + wrist[:, 1, None] * s1 - layout.shoulder[0]
+        dz = wrist[:, 2, None] - layout.shoulder[2]
+
+        # A2/A3: planar two-link arm, gamma < 0 is the elbow-up solution (bit 1), (N, 2, 2)
+        k = (dx ** 2 + dz ** 2 - layout.l2 ** 2 - layout.l3 ** 2) / (2 * layout.l2 * layout.l3)
+        reachable = np.abs(k) <= 1.0
+        acos_k = np.arccos(np.clip(k, -1.0, 1.0))
+        gamma = np.stack([acos_k, -acos_k], axis=-1)
+        alpha = np.arctan2(dz, dx)[..., None] - np.arctan2(layout.l3 * np.sin(gamma),
+                                                           layout.l2 + layout.l3 * np.cos(gamma))
+        theta2 = layout.phi2 - alpha
+        theta23 = layout.phi3 - alpha - gamma
+
+        # wrist rotation M = Ry(-theta23) Rz(-theta1) R6 = Rx(a4) Ry(a5) Rx(a6), rows (N, 2, 2, 3)
+        rows = r6[:, None, :, :]
+        t0 = c1[..., None] * rows[..., 0, :] + s1[..., None] * rows[..., 1, :]
+        t1 = -s1[..., None] * rows[..., 0, :] + c1[..., None] * rows[..., 1, :]
+        t2 = np.broadcast_to(rows[..., 2, :], t0.shape)
+        c23, s23 = np.cos(theta23)[..., None], np.sin(theta23)[..., None]
+        m0 = c23 * t0[:, :, None] - s23 * t2[:, :, None]
+        m1 = np.broadcast_to(t1[:, :, None], m0.shape)
+        m2 = s23 * t0[:, :, None] + c23 * t2[:, :, None]
+
+        # A5 >= 0 (bit 2 clear) and A5 <= 0, (N, 2, 2, 2)
+        b = np.arccos(np.clip(m0[..., 0], -1.0, 1.0))[..., None] * np.array([1.0, -1.0]) * layout.s5
+        sign = np.sign(np.sin(b))
+        singular = np.abs(np.sin(b)) < 1e-9
+        a = np.where(singular, 0.0, np.arctan2(sign * m1[..., 0, None], -sign * m2[..., 0, None]))
+        c = np.where(singular,
+                     np.arctan2(np.sign(m0[..., 0, None]) * m2[..., 1, None], m1[..., 1, None]),
+                     np.arctan2(sign * m0[..., 1, None], sign * m0[..., 2, None]))
+
+        shape = (n, 2, 2, 2)
+        solutions = np.stack([
+            np.broadcast_to(theta1[:, :, None, None] * layout.s1, shape),
+            np.broadcast_to(theta2[..., None] * layout.s2, shape),
+            np.broadcast_to((theta23 - theta2)[..., None] * layout.s3, shape),
+            a * layout.s4,
+            b * layout.s5,
+            c * layout.s6,
+        ], axis=-1)
+        solutions = np.degrees(solutions)
+        solutions = -((-solutions + 180.0) % 360.0 - 180.0) + 0.0
+        solutions[~np.broadcast_to(reachable[:, :, None, None], shape)] = np.nan
+
+        # (N, shoulder, elbow, wrist) -> index bit0 + 2 * bit1 + 4 * bit2
+        return solutions.transpose(0, 3, 2, 1, 4).reshape(n, 8, 6)
+
+
+@dataclass(frozen=True)
+class _IkLayout:
+    s1: float
+    s2: float
+    s3: float
+    s4: float
+    s5: float
+    s6: float
+    shoulder: np.ndarray        # A2 in the A1 frame (x, 0, z)
+    l2: float
+    phi2: float
+    l3: float
+    phi3: float
+    wrist_offset: np.ndarray    # wrist point to tip along the A6 axis
+
+
+def _ik_layout(chain: "KinematicChain") -> _IkLayout:
+    """Geometry of the analytic solution, checks that the chain has the KUKA layout."""
+    signs = []
+    for axis, index in zip(np.round(chain.axes, 12), (2, 1, 1, 0, 1, 0)):
+        if abs(axis[index]) != 1.0:
+            raise ValueError("inverse kinematics needs the KUKA axis layout Z, Y, Y, X, Y, X")
+        signs.append(float(axis[index]))
+    if not all(np.allclose(r, np.eye(3)) for r in chain.origins_rot):
+        raise ValueError("inverse kinematics needs joint origins without rotation")
+
+    o = chain.origins_xyz
+    forearm = o[3] + o[4]
+    wrist_offset = o[5] + chain.tip_xyz
+    if o[0][0] or o[0][1] or o[1][1] or o[2][1] or forearm[1] or o[4][1] or o[4][2] \
+            or wrist_offset[1] or wrist_offset[2]:
+        raise ValueError("inverse kinematics needs a planar arm and a spherical wrist")
+
+    return _IkLayout(*signs, shoulder=o[0] + o[1],
+                     l2=float(np.hypot(o[2][0], o[2][2])), phi2=float(np.arctan2(o[2][2], o[2][0])),
+                     l3=float(np.hypot(forearm[0], forearm[2])), phi3=float(np.arctan2(forearm[2], forearm[0])),
+                     wrist_offset=wrist_offset)
+
+def _origin(element) -> tuple[np.ndarray, np.ndarray]:
+    origin = element.find("origin")
+    if origin is None:
+        return np.zeros(3), np.eye(3)
+    xyz = np.array([float(v) for v in origin.get("xyz", "0 0 0").split()]) * 1000.0
+    rpy = [float(v) for v in origin.get("rpy", "0 0 0").split()]
+    return xyz, rpy_matrix(*rpy)
+
+
+def load_chain(urdf: Path = ROBOT_URDF, tip: str = DEFAULT_TIP) -> KinematicChain:
+    """Read the revolute joints from base_link to tip out of the URDF.
+
+    Fixed joints between the axes are folded into the next joint origin,
+    those behind the last axis into the tip transform. The result is cached
+    until the file changes.
+    """
+    stat = os.stat(urdf)
+    return _load_chain(Path(urdf).resolve(), tip, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _load_chain(urdf: Path, tip: str, mtime_ns: int, size: int) -> KinematicChain:
+    joints = {j.find("child").get("link"): j for j in ET.parse(urdf).iter("joint")}
+
+    chain = []
+    link = tip
+    while link in joints:
+        joint = joints[link]
+        chain.append(joint)
+        link = joint.find("parent").get("link")
+    chain.reverse()
+
+    names, origins_xyz, origins_rot, axes, lower, upper = [], [], [], [], [], []
+    pending_xyz, pending_rot = np.zeros(3), np.eye(3)
+    for joint in chain:
+        xyz, rot = _origin(joint)
+        # fold the pending fixed transform into this origin
+        xyz, rot = pending_xyz + pending_rot @ xyz, pending_rot @ rot
+        if joint.get("type") == "fixed":
+            pending_xyz, pending_rot = xyz, rot
+            continue
+        if joint.get("type") != "revolute":
+            raise ValueError(f"joint {joint.get('name')!r}: only revolute and fixed joints are supported")
+        axis = np.array([float(v) for v in joint.find("axis").get("xyz").split()])
+        limit = joint.find("limit")
+        names.append(joint.get("name"))
+        origins_xyz.append(xyz)
+        origins_rot.append(rot)
+        axes.append(axis / np.linalg.norm(axis))
+        lower.append(np.degrees(float(limit.get("lower"))))
+        upper.append(np.degrees(float(limit.get("upper"))))
+        pending_xyz, pending_rot = np.zeros(3), np.eye(3)
+
+    if len(names) != 6:
+        raise ValueError(f"expected 6 revolute joints from base to {tip!r}, found {len(names)}")
+
+    return KinematicChain(tuple(names), np.array(origins_xyz), np.array(origins_rot), np.array(axes),
+                          np.array(lower), np.array(upper), pending_xyz, pending_rot)
+
+
+def forward_kinematics(joints_deg, chain: KinematicChain | None = None) -> np.ndarray:
+    """Flange poses (N, 6) X, Y, Z, A, B, C of joint vectors (N, 6) in degrees, see KinematicChain.forward."""
+    return (chain or load_chain()).forward(joints_deg)
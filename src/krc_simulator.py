@@ -0,0 +1,427 @@
+import argparse
+import math
+import socket
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from dataclasses import dataclass
+
+# Limits from <BUFFERING> and <BUFFSIZE> in motion_eki.xml / meta_eki.xml
+FIFO_LIMIT = 512
+MESSAGE_LIMIT = 65534
+
+CART_VELOCITY_MAX = 2.0  # m/s, $VEL_MA.CP
+
+_END_TAG = b"</EthernetKRL>"
+
+_STATE_TEMPLATE = (
+    '<RobotState>'
+    '<Command Id="%d" Finished_Id="%d" Stopped="%d"/>'
+    '<Position>'
+    '<Joint A1="%.4f" A2="%.4f" A3="%.4f" A4="%.4f" A5="%.4f" A6="%.4f"/>'
+    '<Cartesian X="%.4f" Y="%.4f" Z="%.4f" A="%.4f" B="%.4f" C="%.4f"/>'
+    '</Position>'
+    '<Velocity A1="%.4f" A2="%.4f" A3="%.4f" A4="%.4f" A5="%.4f" A6="%.4f"/>'
+    '<Torque A1="0.0" A2="0.0" A3="0.0" A4="0.0" A5="0.0" A6="0.0"/>'
+    '</RobotState>'
+)
+
+_AXES = ("A1", "A2", "A3", "A4", "A5", "A6")
+_CARTESIAN = ("X", "Y", "Z", "A", "B", "C")
+
+
+@dataclass
+class SimCommand:
+    """One RobotCommand as read from the EKI buffer (see get_command in motion_eki.src)."""
+    cmd_id: int
+    cmd_type: int
+    mode: int = 0
+    velocity: float = 0.0
+    joints: tuple = (0.0,) * 6
+    cartesian: tuple = (0.0,) * 6
+    cartesian_aux: tuple = (0.0,) * 6
+
+
+def parse_robot_command(message: bytes) -> SimCommand:
+    root = ET.fromstring(message)
+    cmd = root.find("RobotCommand")
+    if cmd is None:
+        raise ValueError("no RobotCommand element")
+
+    command = SimCommand(cmd_id=int(cmd.get("Id")), cmd_type=int(cmd.get("Type")))
+    move = cmd.find("Move")
+    if move is not None:
+        command.mode = int(move.get("Mode", 0))
+        command.velocity = float(move.get("Velocity", 0))
+        command.joints = _values(move.find("Joint"), _AXES)
+        command.cartesian = _values(move.find("Cartesian"), _CARTESIAN)
+        command.cartesian_aux = _values(move.find("Cartesian_Aux"), _CARTESIAN)
+    return command
+
+
+def _values(element, attrs) -> tuple:
+    if element is None:
+        return (0.0,) * len(attrs)
+    return tuple(float(element.get(a, 0)) for a in attrs)
+
+
+class _MessageReader:
+    """Splits a TCP stream into <EthernetKRL> messages and enforces the BUFFSIZE limit."""
+
+    def __init__(self, limit: int = MESSAGE_LIMIT):
+        self.limit = limit
+        self.buffer = bytearray()
+        self.too_long = 0
+
+    def feed(self, data: bytes) -> list[bytes]:
+        self.buffer += data
+        messages = []
+        while True:
+            end = self.buffer.find(_END_TAG)
+            if end < 0:
+                break
+            end += len(_END_TAG)
+            if end > self.limit:
+                self.too_long += 1
+            else:
+                messages.append(bytes(self.buffer[:end]).strip())
+            del self.buffer[:end]
+
+        if len(self.buffer) > self.limit:
+            # no end tag within BUFFSIZE: EKI discards the message
+            self.too_long += 1
+            self.buffer.clear()
+        return messages
+
+
+class KrcSimulator:
+    """Local stand-in for the KRC running motion_eki.src and meta_eki.sub.
+
+    Accepts one client on the motion and one on the meta port, buffers
+    RobotCommands in a FIFO of FIFO_LIMIT messages (overflowing messages are
+    dropped and counted) and executes them on a simulated clock. Moves take
+    distance / velocity (scaled by the override and motion_time_scale),
+    gripper, suction and IO commands finish immediately. Like motion_eki.src,
+    Type 1 runs do_grip before the move, so its id is reported finished when
+    the motion starts. RobotState is sent at state_rate Hz.
+
+    MetaCommand VelocityOverride sets the override in percent, AbortCommand
+    clears the FIFO, brakes the current motion and sets Stopped, which - like
+    ROBOT_STOPPED in KRL - stays set.
+
+    Cartesian moves only interpolate the cartesian pose and joint moves only
+    the joints, there is no kinematic model behind the simulator.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", motion_port: int = 0, meta_port: int = 0,
+                 state_rate: float = 50.0, motion_time_scale: float = 1.0,
+                 max_joint_velocity: float = 7.0, fifo_limit: int = FIFO_LIMIT):
+        self.host = host
+        self.state_rate = state_rate
+        self.motion_time_scale = motion_time_scale
+        self.max_joint_velocity = max_joint_velocity  # rad/s, max_joint_vel in motion_eki.src
+        self.fifo_limit = fifo_limit
+
+        self.override = 100
+        self.stopped = False
+        self.current_id = 0
+        self.finished_id = 0
+        self.joints = [0.0, -90.0, 90.0, 0.0, 0.0, 0.0]
+        self.cartesian = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+        self.joint_velocity = [0.0] * 6
+        self.cart_velocity = CART_VELOCITY_MAX
+        self.joint_vel_scale = 1.0
+
+        self.fifo: deque[SimCommand] = deque()
+        self.lock = threading.Lock()
+        self._motion = None  # (command, start pose, duration, elapsed)
+
+        self.commands_received = 0
+        self.fifo_overflows = 0
+        self.messages_too_long = 0
+        self.messages_malformed = 0
+        self.states_sent = 0
+        self.max_fifo_depth = 0
+
+        self._motion_server = self._listen(motion_port)
+        self._meta_server = self._listen(meta_port)
+        self._motion_client = None
+        self._running = False
+        self._threads: list[threading.Thread] = []
+
+    @property
+    def motion_port(self) -> int:
+        return self._motion_server.getsockname()[1]
+
+    @property
+    def meta_port(self) -> int:
+        return self._meta_server.getsockname()[1]
+
+    def _listen(self, port: int) -> socket.socket:
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((self.host, port))
+        server.listen(1)
+        server.settimeout(0.2)
+        return server
+
+    def start(self):
+        self._running = True
+        for target, args in (
+            (self._serve, (self._motion_server, self._handle_motion_message, True)),
+            (self._serve, (self._meta_server, self._handle_meta_message, False)),
+            (self._interpreter_loop, ()),
+        ):
+            thread = threading.Thread(target=target, args=args, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._running = False
+        for thread in self._threads:
+            thread.join(1.0)
+        self._threads.clear()
+        self._motion_server.close()
+        self._meta_server.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _serve(self, server: socket.socket, on_message, is_motion: bool):
+        while self._running:
+            try:
+                client, _ = server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+
+            client.settimeout(0.2)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if is_motion:
+                with self.lock:
+                    self.fifo.clear()  # reset_interface -> eki_clear
+                    self._motion_client = client
+            self._receive(client, on_message)
+            if is_motion:
+                with self.lock:
+                    self._motion_client = None
+            client.close()
+
+    def _receive(self, client: socket.socket, on_message):
+        reader = _MessageReader()
+        while self._running:
+            try:
+                data = client.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not data:
+                break
+
+            for message in reader.feed(data):
+                on_message(message)
+            with self.lock:
+                self.messages_too_long += reader.too_long
+            reader.too_long = 0
+
+    def _handle_motion_message(self, message: bytes):
+        try:
+            command = parse_robot_command(message)
+        except (ET.ParseError, ValueError, TypeError):
+            with self.lock:
+                self.messages_malformed += 1
+            return
+
+        with self.lock:
+            self.commands_received += 1
+            if len(self.fifo) >= self.fifo_limit:
+                self.fifo_overflows += 1
+                return
+            self.fifo.append(command)
+            self.max_fifo_depth = max(self.max_fifo_depth, len(self.fifo))
+
+    def _handle_meta_message(self, message: bytes):
+        try:
+            meta = ET.fromstring(message).find("MetaCommand")
+        except ET.ParseError:
+            meta = None
+        if meta is None:
+            with self.lock:
+                self.messages_malformed += 1
+            return
+
+        abort = meta.get("AbortCommand", meta.get("AbortCommands", "0"))
+        if abort in ("1", "true", "True", "TRUE"):
+            self.abort()
+            return
+
+        override = meta.get("VelocityOverride")
+        if override is not None:
+            with self.lock:
+                self.override = max(0, min(100, int(override)))
+
+    def abort(self):
+        """Same as stop_movement() in motion_eki.src."""
+        with self.lock:
+            self.fifo.clear()
+            self._motion = None
+            self.joint_velocity = [0.0] * 6
+            self.stopped = True
+
+    def _interpreter_loop(self):
+        period = 1.0 / self.state_rate
+        last = time.monotonic()
+        next_state = last
+        while self._running:
+            now = time.monotonic()
+            with self.lock:
+                self.advance(now - last)
+                client = self._motion_client
+                state = self.state_message() if client is not None else None
+            last = now
+
+            if state is not None:
+                try:
+                    client.sendall(state)
+                    self.states_sent += 1
+                except OSError:
+                    pass
+
+            next_state += period
+            delay = next_state - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_state = time.monotonic()
+
+    def advance(self, dt: float):
+        """Advance the simulated controller by dt seconds. Caller holds self.lock."""
+        factor = self.override / 100.0
+        while True:
+            if self._motion is None:
+                if not self.fifo:
+                    self.current_id = 0
+                    self.joint_velocity = [0.0] * 6
+                    return
+                self._start(self.fifo.popleft())
+                continue
+
+            command, start, duration, elapsed = self._motion
+            if factor <= 0.0:
+                return
+            remaining = (duration - elapsed) / factor
+            if remaining > dt:
+                elapsed += dt * factor
+                self._motion = (command, start, duration, elapsed)
+                self._interpolate(command, start, elapsed / duration, duration)
+                return
+
+            dt -= remaining
+            self._interpolate(command, start, 1.0, duration)
+            self.finished_id = command.cmd_id  # TRIGGER WHEN DISTANCE=1
+            self._motion = None
+
+    def _start(self, command: SimCommand):
+        self.current_id = command.cmd_id
+        if command.cmd_type in (1, 3, 4, 5):
+            self.finished_id = command.cmd_id  # do_grip / do_suction / set_out
+        if command.cmd_type not in (1, 2) or command.mode not in (1, 2, 3, 6):
+            return
+
+        duration = self._duration(command) * self.motion_time_scale
+        if duration <= 0.0:
+            self._interpolate(command, None, 1.0, 0.0)
+            self.finished_id = command.cmd_id
+            return
+        start = (tuple(self.joints), tuple(self.cartesian))
+        self._motion = (command, start, duration, 0.0)
+
+    def _duration(self, command: SimCommand) -> float:
+        if command.mode in (1, 2) and command.velocity > 0.0:
+            # set_joint_vel: velocity in rad/s, clamped to 10..100 % of max_joint_vel
+            self.joint_vel_scale = min(1.0, max(0.1, command.velocity / self.max_joint_velocity))
+
+        if command.mode == 1:
+            delta = max(abs(t - c) for t, c in zip(command.joints, self.joints))
+            return math.radians(delta) / (self.joint_vel_scale * self.max_joint_velocity)
+
+        if command.mode == 6:
+            distance = _distance(self.cartesian, command.cartesian_aux) + _distance(command.cartesian_aux, command.cartesian)
+        else:
+            distance = _distance(self.cartesian, command.cartesian)
+
+        if command.mode == 2:
+            # cartesian PTP: no kinematics, take the path at the scaled $VEL_MA.CP
+            return distance / 1000.0 / (self.joint_vel_scale * CART_VELOCITY_MAX)
+
+        if command.velocity > 0.0:
+            self.cart_velocity = min(command.velocity, CART_VELOCITY_MAX)  # set_cart_vel, m/s
+        return distance / 1000.0 / self.cart_velocity
+
+    def _interpolate(self, command: SimCommand, start, s: float, duration: float):
+        if command.mode == 1:
+            target, current = command.joints, self.joints
+        else:
+            target, current = command.cartesian, self.cartesian
+
+        if start is None or s >= 1.0:
+            current[:] = target
+            self.joint_velocity = [0.0] * 6
+            return
+
+        origin = start[0] if command.mode == 1 else start[1]
+        current[:] = [o + (t - o) * s for o, t in zip(origin, target)]
+        if command.mode == 1:
+            self.joint_velocity = [(t - o) / duration for o, t in zip(origin, target)]
+
+    def state_message(self) -> bytes:
+        return (_STATE_TEMPLATE % (
+            self.current_id, self.finished_id, 1 if self.stopped else 0,
+            *self.joints, *self.cartesian, *self.joint_velocity,
+        )).encode("utf-8")
+
+    def counters(self) -> dict:
+        with self.lock:
+            return {
+                "commands_received": self.commands_received,
+                "fifo_overflows": self.fifo_overflows,
+                "messages_too_long": self.messages_too_long,
+                "messages_malformed": self.messages_malformed,
+                "states_sent": self.states_sent,
+                "max_fifo_depth": self.max_fifo_depth,
+                "finished_id": self.finished_id,
+            }
+
+
+def _distance(a, b) -> float:
+    return math.dist(a[:3], b[:3])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated KRC speaking the motion_eki / meta_eki protocol")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--motion-port", type=int, default=54602)
+    parser.add_argument("--meta-port", type=int, default=54601)
+    parser.add_argument("--rate", type=float, default=50.0, help="RobotState rate in Hz")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="factor for simulated motion durations")
+    args = parser.parse_args()
+
+    with KrcSimulator(args.host, args.motion_port, args.meta_port, args.rate, args.time_scale) as krc:
+        print(f"KRC simulator on {args.host}: motion {krc.motion_port}, meta {krc.meta_port}")
+        try:
+            while True:
+                time.sleep(5)
+                print(krc.counters())
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
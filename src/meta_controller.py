@@ -2,37 +2,43 @@ import xml.etree.ElementTree as ET
 import time
 import socket
 
+from meta_sender import MetaSender
+
 class MetaController:
     def __init__(self, metaTransport):
         self.metaTransport = metaTransport
+        self.metaSender = MetaSender(metaTransport, self._build_xml)
 
     def receive_meta_loop(self):
         while self.metaTransport.connected:
             try:
-                data = self.metaTransport.socket.recv(4096)
-                print(data)
-                if not data:
-                    print("Meta connection lost")
+                if not self._on_meta_readable():
                     break
 
-            except self.metaTransport.socket.timeout:
+            except socket.timeout:
                 continue
 
             except Exception as e:
                 print("Meta receive error:", e)
                 break
 
-    def set_override(self, value: int):  
+    def _on_meta_readable(self) -> bool:
+        """Receive once from the meta channel. Returns False when the connection was closed."""
+        data = self.metaTransport.socket.recv(4096)
+        print(data)
+        if not data:
+            print("Meta connection lost")
+            return False
+        return True
+
+    def set_override(self, value: int):
+        """Queue a velocity override; returns at once, the MetaSender sends the latest value."""
         value = max(0, min(100, value))
-        xml = self._build_xml(value, abort=0)
-        print(f"Override sent:\n{xml.decode()}")
-        self.metaTransport.send(xml)
-        print(f" OVERRIDE: {value}%")
+        self.metaSender.set_override(value)
 
     def abort(self):
-        xml = self._build_xml(0, abort=1)
-        self.metaTransport.send(xml)
-        print(f"Abort sent:\n{xml.decode()}")
+        latency = self.metaSender.abort()
+        print(f"Abort sent after {latency * 1e3:.2f} ms")
 
     def _build_xml(self, override: int, abort: bool):
         full_message = (
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+
+# meta_eki.sub waits 0.02 s after each MetaCommand it reads
+META_DRAIN_INTERVAL = 0.02
+
+
+class MetaSender:
+    """Sends MetaCommands on the META channel from its own thread.
+
+    Override updates are coalesced: set_override() only stores the value and
+    returns, the writer thread sends the latest one at most every
+    min_interval seconds, so holding "+" cannot queue up messages the submit
+    interpreter drains slower than they arrive. abort() does not wait for
+    the writer: it sends on the caller's thread, drops a pending override and
+    records how long the send took.
+    """
+
+    def __init__(self, transport, build_xml, min_interval: float = META_DRAIN_INTERVAL):
+        self.transport = transport
+        self.build_xml = build_xml
+        self.min_interval = min_interval
+
+        self.overrides_requested = 0
+        self.overrides_sent = 0
+        self.last_sent_override = None
+        self.abort_latencies: deque[float] = deque(maxlen=100)
+
+        self._pending = None
+        self._abort_generation = 0             # bumped by every abort, stale overrides are dropped
+        self._lock = threading.Lock()          # guards _pending and _abort_generation
+        self._send_lock = threading.Lock()     # one sendall at a time on the socket
+        self._wakeup = threading.Event()
+        self._last_send = 0.0
+        self._busy = False                     # writer holds a value it has not sent yet
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def set_override(self, value: int):
+        """Queue an override in percent; only the newest queued value is sent."""
+        with self._lock:
+            self._pending = value
+            self.overrides_requested += 1
+        self.start()
+        self._wakeup.set()
+
+    def abort(self) -> float:
+        """Send AbortCommand immediately. Returns the latency in seconds until it was sent."""
+        start = time.perf_counter()
+        xml = self.build_xml(0, abort=1)
+        with self._send_lock:
+            # an override the writer already took must not follow the abort
+            with self._lock:
+                self._pending = None
+                self._abort_generation += 1
+            self.transport.send(xml)
+            self._last_send = time.monotonic()
+            self.last_sent_override = 0  # the abort message carries VelocityOverride="0"
+        latency = time.perf_counter() - start
+        self.abort_latencies.append(latency)
+        return latency
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until the latest override went out. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if self._pending is None and not self._busy:
+                    return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+
+    @property
+    def coalesced(self) -> int:
+        """Override requests that were replaced by a newer value before sending."""
+        return self.overrides_requested - self.overrides_sent
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._running:
+                return
+
+            # rate cap: wait for the interpreter, newer values arriving meanwhile win
+            delay = self._last_send + self.min_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self._lock:
+                value, self._pending = self._pending, None
+                generation = self._abort_generation
+                self._busy = value is not None
+            if value is None:
+                continue
+            try:
+                self._send_override(value, generation)
+            finally:
+                self._busy = False
+
+    def _send_override(self, value: int, generation: int):
+        xml = self.build_xml(value, abort=0)
+        try:
+            with self._send_lock:
+                if generation != self._abort_generation:
+                    return  # taken before an abort, sending it would undo the abort
+                if value == self.last_sent_override:
+                    self.overrides_sent += 1  # nothing to change on the controller
+                    return
+                self.transport.send(xml)
+                self._last_send = time.monotonic()
+                self.last_sent_override = value
+                self.overrides_sent += 1
+        except Exception as e:
+            print("Meta send error:", e)
@@ -1,77 +1,35 @@
-import xml.etree.ElementTree as ET
 from csvHelper import init_csv, save_point_csv, load_point_csv
 from point import Point6D, JointState
-import time
-import pybullet as p
-import pybullet_data
-import math
+from framing import RobotStateFramer
+from eki_encoder import encode_move, encode_move_joint, encode_grip, encode_suction, encode_io, move_encoder
+from command_handle import CommandHandle
+from command_trace import CommandTracer
+from state_slot import StateSlot
+from telemetry import TelemetryBuffer, DEFAULT_CAPACITY, states_to_rows
+from recorder import TelemetryRecorder, DEFAULT_MAX_BYTES
+from send_queue import SendQueue
+from id_allocator import IdAllocator
+from visualization import create_visualizer, DIRECT, PROCESS
+from robot_state import RobotState, parse_robot_state, decode_robot_state
 import threading
-from pathlib import Path
+import time
+import socket
 
+# Limits of the motion EKI channel, see KRL/motion_eki.xml
+EKI_BUFFER_LIMIT = 512      # <BUFFERING Mode="FIFO" Limit="512" />
+EKI_BUFFSIZE = 65534        # <BUFFSIZE Limit="65534" />
 
-class MotionController:
-    def __init__(self, motionTransport):
-        self.motionTransport = motionTransport
-        self.cmd_counter = 1
-        self.last_finished_id = 0
 
+class MotionDefaults:
+    """Default motion parameters, shared by the blocking and the asyncio controller."""
+
+    def __init__(self):
         self.default_velocity = 0.2
         self.default_acceleration = 0.2
         self.default_blending = 0.0
         self.default_base = 0
         self.default_tool = 15
 
-        self.data_lock = threading.Lock()
-
-        p.connect(p.GUI)
-        p.setGravity(0,0,-9.81)
-        project_root = Path(__file__).resolve().parents[1]
-
-        # Default PyBullet data path (planes, textures, etc.)
-        pybullet_data_path = pybullet_data.getDataPath()
-        p.setAdditionalSearchPath(pybullet_data_path)
-
-        # CELL (STL VISUAL)
-        table_stl = str(project_root / "kuka_kr3_support" / "meshes" / "kr3r540" / "visual"  /"whole_cell_binary.stl")
-
-        visual_shape = p.createVisualShape(
-            shapeType=p.GEOM_MESH,
-            fileName=table_stl,
-            meshScale=[1, 1, 1]
-        )
-
-        p.createMultiBody(
-            baseMass=0,
-            baseVisualShapeIndex=visual_shape,
-            basePosition=[0, 0, 0]
-        )
-
-
-        # Load our robot URDF: needs project root so package://kuka_kr3_support/... meshes resolve
-        p.setAdditionalSearchPath(str(project_root))
-        urdf_path = str(project_root / "kuka_kr3_support" / "urdf" / "kr3r540.urdf")
-        self.robotURDF = p.loadURDF(urdf_path,basePosition=[-0.2, -0.05, 0.9],useFixedBase=True)
-
-        # Restore default additional search path
-        p.setAdditionalSearchPath(pybullet_data_path)
-
-    def _update_command_state(self):
-        """Parse Command Id, Finished_Id and Stopped from lastMotionPacket."""
-        try:
-            xml_bytes: bytes = self.lastMotionPacket
-            end_idx = xml_bytes.find(b"</RobotState>") + len(b"</RobotState>")
-            xml_bytes = xml_bytes[:end_idx]
-
-            root = ET.fromstring(xml_bytes.decode())
-
-            cmd = root.find(".//Command")
-            if cmd is not None:
-                finished_id = cmd.get("Finished_Id")
-                if finished_id is not None:
-                    self.last_finished_id = int(finished_id)
-        except Exception:
-            pass  # don't crash on parse errors
-
     def _resolve_motion_params(self, vel=None, acc=None, base=None, tool=None, blending=None):
         vel = vel if vel is not None else self.default_velocity
         acc = acc if acc is not None else self.default_acceleration
@@ -96,70 +54,183 @@ class MotionController:
     def set_default_tool(self, tool: int):
         self.default_tool = tool
 
-    def get_current_Point6D(self, name: str) -> Point6D:
 
+def window_room(first_id: int, sent: int, finished: int, offsets: list[int], window: int, max_bytes: int) -> int:
+    """Number of further sequence messages that fit into the flow-control window right now.
+
+    offsets[i] holds the total size of the first i messages, finished is the
+    last reported Finished_Id and sent the number of messages already sent.
+    """
+    next_id = first_id + sent
+    in_flight = max(0, next_id - 1 - finished)
+    done = min(max(0, finished - first_id + 1), sent)
+    bytes_in_flight = offsets[sent] - offsets[done]
+
+    count = 0
+    total = len(offsets) - 1
+    while (sent + count < total
+           and in_flight + count < window
+           and bytes_in_flight + offsets[sent + count + 1] - offsets[sent] <= max_bytes):
+        count += 1
+    return count
+
+
+class MotionController(MotionDefaults):
+    def __init__(self, motionTransport, gui: bool = True, telemetry_capacity: int = DEFAULT_CAPACITY,
+                 visualization: str | None = None):
+        """visualization is "none", "direct" (headless PyBullet), "gui" or "process"; by
+        default "process" (GUI in its own process) or, with gui=False, "direct". A
+        backend object such as ProcessVisualizer(quality="full") can be passed as well.
+        PyBullet is loaded on the first rendered state."""
+        MotionDefaults.__init__(self)
+        self.motionTransport = motionTransport
+        # callers only enqueue, a writer thread batches the messages into sendall
+        self.send_queue = SendQueue(motionTransport)
+        # ids for all producer threads; the send lock keeps them in order on the wire
+        self.ids = IdAllocator()
+        self._send_lock = threading.Lock()
+        self.last_finished_id = 0
+
+        # newest RobotState, published by the receiver without locking the readers
+        self.state_slot = StateSlot()
+        # history of all received states for analysis, constant memory
+        self.telemetry = TelemetryBuffer(telemetry_capacity)
+        self.recorder: TelemetryRecorder | None = None
+        # send -> ack -> finish timing per command id
+        self.tracer = CommandTracer()
+
+        # flow control for streamed move sequences
+        self.stream_window = EKI_BUFFER_LIMIT // 2
+        self.stream_max_bytes = EKI_BUFFSIZE
+
+        self.stateFramer = RobotStateFramer()
+        self._lastMotionPacket = None
+
+        if visualization is None:
+            visualization = PROCESS if gui else DIRECT
+        self.visualizer = create_visualizer(visualization)
+
+    @property
+    def lastMotionPacket(self) -> bytes | None:
+        return self._lastMotionPacket
+
+    @lastMotionPacket.setter
+    def lastMotionPacket(self, xml_bytes: bytes):
+        """Store a received RobotState frame and decode it once into currentState."""
+        self._lastMotionPacket = xml_bytes
         try:
-            with self.data_lock:
-                xml_bytes: bytes = self.lastMotionPacket
-                # print("RAW XML BYTES:", xml_bytes)
-
-                end_idx = xml_bytes.find(b"</RobotState>") + len(b"</RobotState>")
-                xml_bytes = xml_bytes[:end_idx]
-
-            root = ET.fromstring(xml_bytes.decode())
-
-            cart = root.find(".//Cartesian")
-            if cart is None:
-                raise ValueError("No Cartesian point found in received data!")
-
-            point = Point6D(
-                name=name,
-                x=float(cart.get("X")),
-                y=float(cart.get("Y")),
-                z=float(cart.get("Z")),
-                a=float(cart.get("A")),
-                b=float(cart.get("B")),
-                c=float(cart.get("C"))
-            )
-            return point
-
-        except ET.ParseError:
+            self.currentState = parse_robot_state(xml_bytes)
+        except ValueError:
             print(" ERROR: Failed to parse RobotState XML!")
-            return None
-        except Exception as e:
-            print(f" ERROR while reading current point: {e}")
-            return None
+            self.stateFramer.mark_malformed()
 
-    def get_current_joint_state(self) -> JointState:
-        try:
-            xml_bytes: bytes = self.lastMotionPacket
-            # print("RAW XML BYTES:", xml_bytes)
+    @property
+    def cmd_counter(self) -> int:
+        """The id the next command will get."""
+        return self.ids.next_id
 
-            end_idx = xml_bytes.find(b"</RobotState>") + len(b"</RobotState>")
-            xml_bytes = xml_bytes[:end_idx]
+    @cmd_counter.setter
+    def cmd_counter(self, next_id: int):
+        self.ids.reset(next_id)
 
-            root = ET.fromstring(xml_bytes.decode())
+    @property
+    def currentState(self) -> RobotState | None:
+        return self.state_slot.value
 
-            joint = root.find(".//Joint")
-            if joint is None:
-                raise RuntimeError("RobotState/Position/Joint not found")
+    @currentState.setter
+    def currentState(self, state: RobotState | None):
+        self.state_slot.publish(state)
 
-            jointState = JointState(
-                a1 = float(joint.get("A1")),
-                a2 = float(joint.get("A2")),
-                a3 = float(joint.get("A3")),
-                a4 = float(joint.get("A4")),
-                a5 = float(joint.get("A5")),
-                a6 = float(joint.get("A6"))
-            )
-            return jointState
+    def _update_command_state(self):
+        """Take Finished_Id from the current RobotState snapshot."""
+        state = self.currentState
+        if state is not None and state.finished_id is not None:
+            self.last_finished_id = state.finished_id
+
+    def _publish_states(self, states: list[RobotState]):
+        """Make the newest received state current and wake up everyone waiting for a new state."""
+        if not states:
+            return
+        self.tracer.observe_all(states)
+        rows = states_to_rows(states)
+        self.telemetry.extend_rows(rows)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.write_rows(rows)
+        for state in states:
+            if state.finished_id is not None:
+                self.last_finished_id = state.finished_id
+        # Finished_Id is set before the publish, so a woken reader sees both
+        self.state_slot.publish(states[-1])
+
+    def start_recording(self, directory, max_bytes: int = DEFAULT_MAX_BYTES) -> TelemetryRecorder:
+        """Record every received state to binary files in directory (see recorder.py)."""
+        self.stop_recording()
+        self.recorder = TelemetryRecorder(directory, max_bytes=max_bytes)
+        return self.recorder
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    def wait_for_finished(self, cmd_id: int, timeout: float | None = None) -> bool:
+        """Block until Finished_Id reached cmd_id. Returns False on timeout, stop or disconnect."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        seq, state = self.state_slot.latest()
+        was_stopped = state is not None and bool(state.stopped)
+
+        while self.last_finished_id < cmd_id:
+            if not was_stopped and state is not None and state.stopped:
+                return False
+            if not self.motionTransport.connected:
+                return False
+
+            wait_time = 0.5
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+            seq, state = self.state_slot.wait_newer(seq, wait_time) or (seq, state)
+        return True
+
+    def wait_all(self, timeout: float | None = None) -> bool:
+        """Block until every command sent so far has finished."""
+        return self.wait_for_finished(self.cmd_counter - 1, timeout)
+
+    def get_current_state(self) -> RobotState | None:
+        return self.currentState
 
-        except ET.ParseError:
-            print(" ERROR: Failed to parse RobotState XML!")
+    def get_current_Point6D(self, name: str) -> Point6D:
+        state = self.currentState
+        if state is None or state.cartesian is None:
+            print(" ERROR while reading current point: No Cartesian point found in received data!")
+            return None
+
+        x, y, z, a, b, c = state.cartesian
+        return Point6D(name=name, x=x, y=y, z=z, a=a, b=b, c=c)
+
+    def get_current_joint_state(self) -> JointState:
+        state = self.currentState
+        if state is None or state.joints is None:
+            print(" ERROR while reading current point: RobotState/Position/Joint not found")
+            return None
+
+        return JointState(*state.joints)
+
+    def get_current_velocity(self) -> JointState:
+        state = self.currentState
+        if state is None or state.velocity is None:
             return None
-        except Exception as e:
-            print(f" ERROR while reading current point: {e}")
+        return JointState(*state.velocity)
+
+    def get_current_torque(self) -> JointState:
+        state = self.currentState
+        if state is None or state.torque is None:
             return None
+        return JointState(*state.torque)
 
     def touchup(self, name: str, csv_file: str):
         point : Point6D = self.get_current_Point6D(name)
@@ -167,86 +238,49 @@ class MotionController:
         return point
 
     def motion_visualization_loop(self):
+        self.stateFramer.reset()
+
         while self.motionTransport.connected:
             try:
-                data = self.motionTransport.socket.recv(4096)
-                if not data:
-                    print("Motion connection lost")
+                if not self._on_motion_readable():
                     break
 
-                with self.data_lock:
-                    self.lastMotionPacket = data
-                    self._update_command_state()
-                    joint_angles_deg = self.get_current_joint_state()
-
-                if joint_angles_deg is None:
-                    continue
-
-                joint_angles = [
-                math.radians(joint_angles_deg.a1),
-                math.radians(joint_angles_deg.a2),
-                math.radians(joint_angles_deg.a3),
-                math.radians(joint_angles_deg.a4),
-                math.radians(joint_angles_deg.a5),
-                math.radians(joint_angles_deg.a6),
-                ]
-                #  joint_angles = [math.radians(a) for a in joint_angles_deg]
-
-                for j in range(6):
-                    p.resetJointState(self.robotURDF, j, joint_angles[j])
-
-                p.stepSimulation()
-
-            except self.motionTransport.socket.timeout:
+            except socket.timeout:
                 continue
 
             except Exception as e:
                 print("Motion receive error:", e)
                 break
 
-            time.sleep(0.1)
+    def _on_motion_readable(self) -> bool:
+        """Receive once, publish all complete states and render the newest one.
+
+        Used by motion_visualization_loop and as IoReactor callback.
+        Returns False when the connection was closed.
+        """
+        states = self.stateFramer.recv_into(self.motionTransport.receive_into, decode_robot_state)
+        if states is None:
+            print("Motion connection lost")
+            return False
+
+        if states:
+            # every frame updates the command state, only the newest one is rendered
+            self._publish_states(states)
+            self._render_current_state()
+        return True
+
+    def _render_current_state(self):
+        joint_angles_deg = self.get_current_joint_state()
+        if joint_angles_deg is None:
+            return
+        self.visualizer.show((joint_angles_deg.a1, joint_angles_deg.a2, joint_angles_deg.a3,
+                              joint_angles_deg.a4, joint_angles_deg.a5, joint_angles_deg.a6))
 
     def _build_move_xml(self, cmd_id: int, point: Point6D, cmd_type: int, mode: int,
         vel: float, acc: float, base: int, tool: int, blending: float,
         wait_for_gripper: int = 0, aux_point: Point6D | None = None):
-        root = ET.Element("RobotCommand", Id=str(cmd_id), Type=str(cmd_type))
-        move = ET.SubElement(root, "Move",
-            Mode=str(mode),
-            BaseIndex=str(base),
-            ToolIndex=str(tool),
-            Velocity=str(vel),
-            Acceleration=str(acc),
-            Blending=str(blending),
-            WaitForGripper=str(wait_for_gripper)
-        )
-        cart = ET.SubElement(move, "Cartesian")
-        cart.set("X", str(point.x))
-        cart.set("Y", str(point.y))
-        cart.set("Z", str(point.z))
-        cart.set("A", str(point.a))
-        cart.set("B", str(point.b))
-        cart.set("C", str(point.c))
-
-        aux = ET.SubElement(move, "Cartesian_Aux")
-
-        if aux_point is not None:
-            aux.set("X", str(aux_point.x))
-            aux.set("Y", str(aux_point.y))
-            aux.set("Z", str(aux_point.z))
-            aux.set("A", str(aux_point.a))
-            aux.set("B", str(aux_point.b))
-            aux.set("C", str(aux_point.c))
-        else:
-            for k in ["X","Y","Z","A","B","C"]:
-             aux.set(k, "0")
-
-        joint = ET.SubElement(move, "Joint")
-        for a in ["A1","A2","A3","A4","A5","A6"]:
-            joint.set(a, "0")
-
-        xml_body = ET.tostring(root, encoding="utf-8", method="xml").decode("utf-8")
-        full_message = f'<?xml version="1.0" encoding="UTF-8"?>\n<EthernetKRL>\n{xml_body}\n</EthernetKRL>\n'
-        return full_message.encode("utf-8")
+        return encode_move(cmd_id, point, cmd_type, mode, vel, acc, base, tool, blending,
+                           wait_for_gripper=wait_for_gripper, aux_point=aux_point)
 
     def _build_move_joint_xml(
         self,
@@ -261,93 +295,114 @@ class MotionController:
         blending: float,
         wait_for_gripper: int = 0
     ):
-        root = ET.Element("RobotCommand", Id=str(cmd_id), Type=str(cmd_type))
-        move = ET.SubElement(
-            root,
-            "Move",
-            Mode=str(mode),
-            BaseIndex=str(base),
-            ToolIndex=str(tool),
-            Velocity=str(vel),
-            Acceleration=str(acc),
-            Blending=str(blending),
-            WaitForGripper=str(wait_for_gripper)
-        )
-
-        cart = ET.SubElement(move, "Cartesian")
-        for k in ["X", "Y", "Z", "A", "B", "C"]:
-            cart.set(k, "0")
-
-        aux = ET.SubElement(move, "Cartesian_Aux")
-        for k in ["X", "Y", "Z", "A", "B", "C"]:
-            aux.set(k, "0")
-
-        joint = ET.SubElement(move, "Joint")
-        joint.set("A1", str(joints.a1))
-        joint.set("A2", str(joints.a2))
-        joint.set("A3", str(joints.a3))
-        joint.set("A4", str(joints.a4))
-        joint.set("A5", str(joints.a5))
-        joint.set("A6", str(joints.a6))
-
-        xml_body = ET.tostring(root, encoding="utf-8", method="xml").decode("utf-8")
-        full_message = (
-            f'<?xml version="1.0" encoding="UTF-8"?>\n'
-            f'<EthernetKRL>\n{xml_body}\n</EthernetKRL>\n'
-        )
-        return full_message.encode("utf-8")
+        return encode_move_joint(cmd_id, joints, cmd_type, mode, vel, acc, base, tool, blending,
+                                 wait_for_gripper=wait_for_gripper)
 
-    def _send_move(self, point: Point6D, cmd_type, mode, vel, acc, base, tool, blending, aux_point: Point6D | None = None):
-        xml_bytes = self._build_move_xml(
-            cmd_id=self.cmd_counter,
-            point=point,
-            cmd_type=cmd_type,
-            mode=mode,
-            vel=vel,
-            acc=acc,
-            base=base,
-            tool=tool,
-            blending=blending,
-            aux_point=aux_point
-        )
-
-        self.motionTransport.send(xml_bytes)
-        print(f"Move sent:\n{xml_bytes.decode()}")
-        self.cmd_counter += 1
-
-    def move_sequence(self, points: list[Point6D], mode: int, vel=None, acc=None, base=None, tool=None, blending=None) -> None:
+    def _send_command(self, encode, cmd_type: str, mode: int | None = None) -> CommandHandle:
+        """Reserve the next id, encode the command with it and queue it, atomically for all threads."""
+        with self._send_lock:
+            cmd_id = self.ids.reserve()
+            try:
+                xml_bytes = encode(cmd_id)
+                self.tracer.sent(cmd_id, cmd_type, mode)
+                self.send_queue.put(xml_bytes)
+            except Exception:
+                self.ids.release(cmd_id, cmd_id + 1)
+                raise
+        return CommandHandle(self, cmd_id)
+
+    def _send_move(self, point: Point6D, cmd_type, mode, vel, acc, base, tool, blending, aux_point: Point6D | None = None) -> CommandHandle:
+        return self._send_command(
+            lambda cmd_id: self._build_move_xml(
+                cmd_id=cmd_id,
+                point=point,
+                cmd_type=cmd_type,
+                mode=mode,
+                vel=vel,
+                acc=acc,
+                base=base,
+                tool=tool,
+                blending=blending,
+                aux_point=aux_point
+            ),
+            "move", mode)
+
+    def move_sequence(self, points: list[Point6D], mode: int, vel=None, acc=None, base=None, tool=None, blending=None,
+        window: int | None = None, timeout: float | None = None) -> CommandHandle | None:
+        """Send a sequence of moves, streaming it in windows the controller can buffer.
+
+        At most `window` commands (default stream_window) and stream_max_bytes of
+        sequence data are in flight at once. Further moves are sent as Finished_Id
+        reports completed ones, so this call blocks until the last move is sent.
+        timeout limits how long to wait without any progress of Finished_Id.
+        The returned handle finishes with the last move of the sequence; if no
+        move was sent (stopped before the first one) it is empty and done.
+        """
         vel, acc, base, tool, blending = self._resolve_motion_params(vel=vel,acc=acc,base=base,tool=tool,blending=blending)
 
         if not points:
             print("No points provided for sequence.")
             return
 
-        messages: list[bytes] = []
-        next_id = self.cmd_counter
-        for p in points:
-            xml_bytes = self._build_move_xml(
-                cmd_id=next_id,
-                point=p,
-                cmd_type=1,
-                mode=mode,
-                vel=vel,
-                acc=acc,
-                base=base,
-                tool=tool,
-                blending=blending
-            )
-            messages.append(xml_bytes)
-            next_id += 1
+        encoder = move_encoder(1, mode, vel, acc, base, tool, blending)
+
+        # other threads wait until the sequence is queued, their ids follow it
+        with self._send_lock:
+            first_id = self.ids.reserve(len(points))
+            messages = encoder.encode_each(first_id, points)
+            sent = self._stream_messages(first_id, messages, window or self.stream_window, timeout, mode=mode)
+
+        print(f"Sequence sent with {sent} moves. Total bytes: {sum(len(m) for m in messages)}")
+        return CommandHandle(self, first_id + sent - 1, first_id=first_id)
+
+    def _stream_messages(self, first_id: int, messages: list[bytes], window: int, timeout: float | None,
+                         mode: int | None = None) -> int:
+        """Send messages with the reserved ids first_id.., respecting the window. Returns how many were sent.
+
+        Ids of messages that were not sent (stop, timeout) are released again.
+        """
+        # offsets[i] = bytes of messages[:i], to get the bytes in flight in O(1)
+        offsets = [0]
+        for message in messages:
+            offsets.append(offsets[-1] + len(message))
 
-        payload = b"".join(messages)
-        self.motionTransport.send(payload)
-        print(f"Sequence sent with {len(points)} moves. Total bytes: {len(payload)}")
-        self.cmd_counter = next_id
+        seq, state = self.state_slot.latest()
+        was_stopped = state is not None and bool(state.stopped)
 
-    def ptp(self, point: Point6D, vel=None, acc=None, base=None, tool=None, blending=None):
+        sent = 0
+        try:
+            while sent < len(messages):
+                last_progress = time.monotonic()
+                while True:
+                    finished = self.last_finished_id
+                    count = window_room(first_id, sent, finished, offsets, window, self.stream_max_bytes)
+                    if count:
+                        break
+
+                    if not was_stopped and state is not None and state.stopped:
+                        print(f"Sequence stopped by controller after {sent} of {len(messages)} moves.")
+                        return sent
+                    if not self.motionTransport.connected:
+                        raise RuntimeError("Not connected")
+                    if timeout is not None and time.monotonic() - last_progress > timeout:
+                        raise TimeoutError(f"No move finished within {timeout} s (Finished_Id {finished})")
+
+                    seq, state = self.state_slot.wait_newer(seq, 0.5) or (seq, state)
+                    if self.last_finished_id != finished:
+                        last_progress = time.monotonic()
+
+                self.tracer.sent_range(first_id + sent, first_id + sent + count - 1, "move", mode)
+                self.send_queue.put(b"".join(messages[sent:sent + count]))
+                sent += count
+            return sent
+        finally:
+            if sent < len(messages):
+                self.ids.release(first_id + sent, first_id + len(messages))
+
+    def ptp(self, point: Point6D, vel=None, acc=None, base=None, tool=None, blending=None) -> CommandHandle:
         vel, acc, base, tool, blending = self._resolve_motion_params(vel=vel,acc=acc,base=base,tool=tool,blending=blending)
 
-        self._send_move(
+        return self._send_move(
             point=point,
             cmd_type=1,
             mode=2,
@@ -358,7 +413,7 @@ class MotionController:
             blending=blending
         )
 
-    def ptp_joint(self, joints: JointState, vel=None, acc=None, base=None, tool=None, blending=None):
+    def ptp_joint(self, joints: JointState, vel=None, acc=None, base=None, tool=None, blending=None) -> CommandHandle:
         vel, acc, base, tool, blending = self._resolve_motion_params(
             vel=vel,
             acc=acc,
@@ -367,26 +422,24 @@ class MotionController:
             blending=blending
         )
 
-        xml_bytes = self._build_move_joint_xml(
-            cmd_id=self.cmd_counter,
-            joints=joints,
-            cmd_type=1,
-            mode=1,
-            vel=vel,
-            acc=acc,
-            base=base,
-            tool=tool,
-            blending=blending
-        )
-
-        self.motionTransport.send(xml_bytes)
-        print(f"Joint move sent:\n{xml_bytes.decode()}")
-        self.cmd_counter += 1
+        return self._send_command(
+            lambda cmd_id: self._build_move_joint_xml(
+                cmd_id=cmd_id,
+                joints=joints,
+                cmd_type=1,
+                mode=1,
+                vel=vel,
+                acc=acc,
+                base=base,
+                tool=tool,
+                blending=blending
+            ),
+            "move", 1)
 
-    def lin(self, point: Point6D, vel=None, acc=None, base=None, tool=None, blending=None):
+    def lin(self, point: Point6D, vel=None, acc=None, base=None, tool=None, blending=None) -> CommandHandle:
         vel, acc, base, tool, blending = self._resolve_motion_params(vel=vel,acc=acc,base=base,tool=tool,blending=blending)
 
-        self._send_move(
+        return self._send_move(
             point=point,
             cmd_type=1,
             mode=3,
@@ -397,10 +450,10 @@ class MotionController:
             blending=blending
         )
 
-    def circ(self, end: Point6D, aux: Point6D, vel=None, acc=None, base=None, tool=None, blending=None):
+    def circ(self, end: Point6D, aux: Point6D, vel=None, acc=None, base=None, tool=None, blending=None) -> CommandHandle:
         vel, acc, base, tool, blending = self._resolve_motion_params(vel=vel,acc=acc,base=base,tool=tool,blending=blending)
 
-        self._send_move(
+        return self._send_move(
             point=end,
             cmd_type=1,
             mode=6,
@@ -418,100 +471,67 @@ class MotionController:
     def _build_grip_xml(
         self,
         jaw_direction_mode: int = 0,
-
+        cmd_id: int | None = None,
     ) -> bytes:
-        """Build XML command for gripper"""
-
+        """Build XML command for gripper (cmd_id defaults to the next free id)"""
         # RobotCommand Element mit Id und Type=3 (Grip only)
-        root = ET.Element("RobotCommand", Id=str(self.cmd_counter), Type="3")
-        grip = ET.SubElement(root, "Grip")
-        jaw = ET.SubElement(grip, "Jaw")
-        jaw.set("DirectionMode", str(jaw_direction_mode))
-
-        xml_body = ET.tostring(root, encoding="utf-8", method="xml").decode("utf-8")
-        full_message = f'<?xml version="1.0" encoding="UTF-8"?>\n<EthernetKRL>\n{xml_body}\n</EthernetKRL>\n'
-        return full_message.encode("utf-8")
+        return encode_grip(self.cmd_counter if cmd_id is None else cmd_id, jaw_direction_mode)
 
     def jaw_open(
         self,
-    ) -> None:
+    ) -> CommandHandle:
         """Open the jaw gripper."""
-        xml = self._build_grip_xml(
-            jaw_direction_mode=0
-        )
-
-        self.motionTransport.send(xml)
-        print(f"debug:\n{xml.decode()}")
-        print(f" Jaw gripper OPEN command sent (ID: {self.cmd_counter})")
-        self.cmd_counter += 1
+        handle = self._send_command(
+            lambda cmd_id: self._build_grip_xml(jaw_direction_mode=0, cmd_id=cmd_id), "grip")
+        print(f" Jaw gripper OPEN command sent (ID: {handle.cmd_id})")
+        return handle
 
     def jaw_close(
         self,
-    ) -> None:
+    ) -> CommandHandle:
         """Close the jaw gripper."""
-        xml = self._build_grip_xml(
-            jaw_direction_mode=1
-        )
-
-        self.motionTransport.send(xml)
-        print(f"debug:\n{xml.decode()}")
-        print(f" Jaw gripper CLOSE command sent (ID: {self.cmd_counter})")
-        self.cmd_counter += 1
+        handle = self._send_command(
+            lambda cmd_id: self._build_grip_xml(jaw_direction_mode=1, cmd_id=cmd_id), "grip")
+        print(f" Jaw gripper CLOSE command sent (ID: {handle.cmd_id})")
+        return handle
 
     def _build_suction_xml(
         self,
         suction_mode: int = 0,
+        cmd_id: int | None = None,
     ) -> bytes:
         """Build XML command for vacuum suction"""
+        return encode_suction(self.cmd_counter if cmd_id is None else cmd_id, suction_mode)
 
-        root = ET.Element("RobotCommand", Id=str(self.cmd_counter), Type="4")
-        grip = ET.SubElement(root, "Suction")
-        vacuum = ET.SubElement(grip, "Vacuum")
-        vacuum.set("Suction", str(suction_mode))
-
-        xml_body = ET.tostring(root, encoding="utf-8", method="xml").decode("utf-8")
-        full_message = f'<?xml version="1.0" encoding="UTF-8"?>\n<EthernetKRL>\n{xml_body}\n</EthernetKRL>\n'
-        return full_message.encode("utf-8")
-
-    def suction_on(self) -> None:
+    def suction_on(self) -> CommandHandle:
         """Turn on the vacuum suction."""
-        xml = self._build_suction_xml(suction_mode=1)
-        self.motionTransport.send(xml)
-        print(f"debug:\n{xml.decode()}")
-        print(f" Vacuum SUCTION ON command sent (ID: {self.cmd_counter})")
-        self.cmd_counter += 1
+        handle = self._send_command(
+            lambda cmd_id: self._build_suction_xml(suction_mode=1, cmd_id=cmd_id), "suction")
+        print(f" Vacuum SUCTION ON command sent (ID: {handle.cmd_id})")
+        return handle
 
-    def suction_off(self) -> None:
+    def suction_off(self) -> CommandHandle:
         """Turn off the vacuum suction."""
-        xml = self._build_suction_xml(suction_mode=0)
-        self.motionTransport.send(xml)
-        print(f"debug:\n{xml.decode()}")
-        print(f" Vacuum SUCTION OFF command sent (ID: {self.cmd_counter})")
-        self.cmd_counter += 1
+        handle = self._send_command(
+            lambda cmd_id: self._build_suction_xml(suction_mode=0, cmd_id=cmd_id), "suction")
+        print(f" Vacuum SUCTION OFF command sent (ID: {handle.cmd_id})")
+        return handle
 
     # ==================== IO METHODS ====================
 
     def _build_io_xml(
         self,
         user_out: int,
-        user_outstate: bool
+        user_outstate: bool,
+        cmd_id: int | None = None,
     ) -> bytes:
         """Build XML command for triggering digital IOs"""
+        # user_outstate tells the KUKA whether to set True or False
+        return encode_io(self.cmd_counter if cmd_id is None else cmd_id, user_out, user_outstate)
 
-        root = ET.Element("RobotCommand", Id=str(self.cmd_counter), Type="5")
-        io = ET.SubElement(root, "IO")
-        io.set("user_out", str(user_out))
-        # Add user_outstate to the root so the KUKA knows whether to set True or False
-        io.set("user_outstate", "1" if user_outstate else "0")
-
-        xml_body = ET.tostring(root, encoding="utf-8", method="xml").decode("utf-8")
-        full_message = f'<?xml version="1.0" encoding="UTF-8"?>\n<EthernetKRL>\n{xml_body}\n</EthernetKRL>\n'
-        return full_message.encode("utf-8")
-
-    def set_user_out(self, user_out: int, user_outstate: bool) -> None:
+    def set_user_out(self, user_out: int, user_outstate: bool) -> CommandHandle:
         """Set a general user IO output."""
-        xml = self._build_io_xml(user_out=user_out, user_outstate=user_outstate)
-        self.motionTransport.send(xml)
-        print(f"debug:\n{xml.decode()}")
-        print(f" IO User_Out {user_out} set to {user_outstate} sent (ID: {self.cmd_counter})")
-        self.cmd_counter += 1
\ No newline at end of file
+        handle = self._send_command(
+            lambda cmd_id: self._build_io_xml(user_out=user_out, user_outstate=user_outstate, cmd_id=cmd_id), "io")
+        print(f" IO User_Out {user_out} set to {user_outstate} sent (ID: {handle.cmd_id})")
+        return handle
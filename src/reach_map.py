@@ -0,0 +1,287 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+from kinematics import load_chain, matrix_to_abc, DEFAULT_TIP
+from point import Point6D
+from reachability import points_to_array, to_robroot
+from scene_assets import PROJECT_ROOT, ROBOT_URDF
+
+DEFAULT_CACHE_DIR = PROJECT_ROOT / ".cache" / "reach"
+
+# bump when the stored values change, old cache entries are then ignored
+REACH_MAP_VERSION = 1
+
+# voxel edge in mm and orientation bins of the approach direction (flange X axis)
+DEFAULT_RESOLUTION = 50.0
+DEFAULT_POLAR_BINS = 6
+DEFAULT_AZIMUTH_BINS = 12
+
+# bit s of status_mask: reachable inside the limits with KRC Status s;
+# manipulability: best |det J| of those solutions relative to the maximum (0..1)
+REACH_DTYPE = np.dtype([("status_mask", "u1"), ("manipulability", "f2")])
+
+
+@dataclass(frozen=True)
+class ReachGrid:
+    """Voxels around the robot and approach direction bins of a reachability map.
+
+    origin is the centre of voxel (0, 0, 0) in $ROBROOT [mm]. Directions are
+    binned in equal angles: polar angle from +Z, azimuth from +X.
+    """
+    origin: tuple[float, float, float]
+    resolution: float
+    shape: tuple[int, int, int]
+    polar_bins: int
+    azimuth_bins: int
+
+    @property
+    def bins(self) -> int:
+        return self.polar_bins * self.azimuth_bins
+
+    def voxel_centres(self, ix: slice = slice(None)) -> np.ndarray:
+        """Centres (nx, ny, nz, 3) of the voxels, optionally of an x range only."""
+        axes = [self.origin[i] + self.resolution * np.arange(self.shape[i]) for i in range(3)]
+        axes[0] = axes[0][ix]
+        return np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+
+    def directions(self) -> np.ndarray:
+        """Unit approach vectors (polar_bins, azimuth_bins, 3) at the bin centres."""
+        polar = (np.arange(self.polar_bins) + 0.5) * math.pi / self.polar_bins
+        azimuth = (np.arange(self.azimuth_bins) + 0.5) * 2 * math.pi / self.azimuth_bins
+        polar, azimuth = np.meshgrid(polar, azimuth, indexing="ij")
+        return np.stack([np.sin(polar) * np.cos(azimuth), np.sin(polar) * np.sin(azimuth), np.cos(polar)], axis=-1)
+
+    def index(self, x: float, y: float, z: float, a: float, b: float) -> tuple | None:
+        """Voxel and bin index of a flange pose, None outside of the grid. C does not matter:
+        it turns the flange about its X axis, which is A6, and A6 covers every angle."""
+        i = round((x - self.origin[0]) / self.resolution)
+        j = round((y - self.origin[1]) / self.resolution)
+        k = round((z - self.origin[2]) / self.resolution)
+        if not (0 <= i < self.shape[0] and 0 <= j < self.shape[1] and 0 <= k < self.shape[2]):
+            return None
+        # flange X axis of Rz(A) Ry(B) Rx(C)
+        a, b = math.radians(a), math.radians(b)
+        cos_b = math.cos(b)
+        dx, dy, dz = math.cos(a) * cos_b, math.sin(a) * cos_b, -math.sin(b)
+        polar = math.acos(max(-1.0, min(1.0, dz)))
+        azimuth = math.atan2(dy, dx) % (2 * math.pi)
+        p = min(int(polar * self.polar_bins / math.pi), self.polar_bins - 1)
+        q = min(int(azimuth * self.azimuth_bins / (2 * math.pi)), self.azimuth_bins - 1)
+        return i, j, k, p, q
+
+
+def default_grid(urdf=ROBOT_URDF, resolution: float = DEFAULT_RESOLUTION, polar_bins: int = DEFAULT_POLAR_BINS,
+                 azimuth_bins: int = DEFAULT_AZIMUTH_BINS) -> ReachGrid:
+    """Grid over the sphere the flange can reach around A2, from the URDF lengths."""
+    layout = load_chain(urdf).ik_layout
+    radius = abs(layout.shoulder[0]) + layout.l2 + layout.l3 + float(np.linalg.norm(layout.wrist_offset))
+    count = 2 * math.ceil(radius / resolution) + 1
+    centre = (0.0, 0.0, float(layout.shoulder[2]))
+    origin = tuple(c - (count // 2) * resolution for c in centre)
+    return ReachGrid(origin, float(resolution), (count, count, count), polar_bins, azimuth_bins)
+
+
+def _flange_rotations(directions: np.ndarray) -> np.ndarray:
+    """A flange rotation (..., 3, 3) with X along each direction; the roll is arbitrary (A6)."""
+    x = directions
+    helper = np.where(np.abs(x[..., 2:3]) < 0.9, [0.0, 0.0, 1.0], [1.0, 0.0, 0.0])
+    y = np.cross(helper, x)
+    y /= np.linalg.norm(y, axis=-1, keepdims=True)
+    return np.stack([x, y, np.cross(x, y)], axis=-1)
+
+
+def _build_slab(urdf: str, grid: ReachGrid, start: int, stop: int) -> np.ndarray:
+    """Map values (stop - start, ny, nz, polar_bins, azimuth_bins) of the voxels start..stop-1 along X."""
+    chain = load_chain(Path(urdf))
+    centres = grid.voxel_centres(slice(start, stop)).reshape(-1, 1, 3)
+    abc = matrix_to_abc(_flange_rotations(grid.directions())).reshape(1, -1, 3)
+    poses = np.concatenate(np.broadcast_arrays(centres, abc), axis=-1).reshape(-1, 6)
+
+    solutions = chain.inverse(poses)
+    valid = chain.within_limits(solutions)
+    values = np.zeros(len(poses), dtype=REACH_DTYPE)
+    values["status_mask"] = (valid * (1 << np.arange(8))).sum(axis=1)
+    manipulability = np.where(valid, chain.manipulability(solutions), 0.0).max(axis=1)
+    values["manipulability"] = manipulability / chain.max_manipulability
+    return values.reshape(stop - start, grid.shape[1], grid.shape[2], grid.polar_bins, grid.azimuth_bins)
+
+
+def build_map(grid: ReachGrid, out: np.ndarray, urdf=ROBOT_URDF, workers: int | None = None):
+    """Fill out (grid shape + bins) slab by slab along X, on a process pool if workers > 1."""
+    workers = workers or os.cpu_count() or 1
+    slabs = [(i, min(i + 2, grid.shape[0])) for i in range(0, grid.shape[0], 2)]
+    if workers <= 1:
+        for start, stop in slabs:
+            out[start:stop] = _build_slab(str(urdf), grid, start, stop)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        results = pool.map(_build_slab, *zip(*[(str(urdf), grid, start, stop) for start, stop in slabs]))
+        for (start, stop), values in zip(slabs, results):
+            out[start:stop] = values
+
+
+def map_key(grid: ReachGrid, urdf=ROBOT_URDF, tip: str = DEFAULT_TIP) -> str:
+    """Content hash of the URDF, the grid and the map version."""
+    params = json.dumps(asdict(grid), sort_keys=True)
+    digest = hashlib.sha256(f"{REACH_MAP_VERSION}:{tip}:{params}".encode())
+    digest.update(Path(urdf).read_bytes())
+    return digest.hexdigest()[:20]
+
+
+@dataclass(frozen=True)
+class ReachSample:
+    reachable: bool
+    status_mask: int
+    manipulability: float
+
+
+_OUT_OF_GRID = ReachSample(False, 0, 0.0)
+
+
+class ReachMap:
+    """Precomputed reachability per voxel and approach direction, memory-mapped.
+
+    Values hold for the voxel centre and the bin centre direction, so near
+    the edge of the workspace lookup() is an estimate; check_points() in
+    reachability.py gives the exact answer for a path. lookup() and
+    lookup_many() take flange poses in $ROBROOT, lookup_point() and
+    reachable() take points in base with the TCP tool, like check_points().
+    """
+
+    def __init__(self, grid: ReachGrid, data: np.ndarray, key: str = "", path: Path | None = None):
+        self.grid = grid
+        self.data = data
+        self.key = key
+        self.path = path
+        # plain views, a field lookup on the structured memmap per call would cost more than the rest
+        self._mask = data["status_mask"]
+        self._manipulability = data["manipulability"]
+
+    def lookup(self, x: float, y: float, z: float, a: float, b: float, c: float = 0.0) -> ReachSample:
+        index = self.grid.index(x, y, z, a, b)
+        if index is None:
+            return _OUT_OF_GRID
+        mask = int(self._mask[index])
+        return ReachSample(mask != 0, mask, float(self._manipulability[index]))
+
+    def lookup_point(self, point: Point6D, base=None, tool=None) -> ReachSample:
+        """Value for a point as read from the point CSVs: a TCP pose in base (see reachability.to_robroot)."""
+        if base is None and tool is None:
+            return self.lookup(point.x, point.y, point.z, point.a, point.b, point.c)
+        return self.lookup(*to_robroot(points_to_array([point]), base, tool)[0])
+
+    def reachable(self, point: Point6D, status: int | None = None, base=None, tool=None) -> bool:
+        """True if the map has a solution for point, with the given KRC Status if one is given."""
+        mask = self.lookup_point(point, base, tool).status_mask
+        return bool(mask if status is None else mask >> status & 1)
+
+    def lookup_many(self, poses) -> np.ndarray:
+        """Values (N,) of REACH_DTYPE for flange poses (N, 6), zero outside of the grid."""
+        poses = np.asarray(poses, dtype=np.float64).reshape(-1, 6)
+        grid = self.grid
+        voxel = np.rint((poses[:, :3] - grid.origin) / grid.resolution).astype(np.int64)
+        inside = np.all((voxel >= 0) & (voxel < grid.shape), axis=1)
+
+        a, b = np.radians(poses[:, 3]), np.radians(poses[:, 4])
+        polar = np.arccos(np.clip(-np.sin(b), -1.0, 1.0))
+        azimuth = np.arctan2(np.sin(a) * np.cos(b), np.cos(a) * np.cos(b)) % (2 * np.pi)
+        p = np.minimum((polar * grid.polar_bins / np.pi).astype(np.int64), grid.polar_bins - 1)
+        q = np.minimum((azimuth * grid.azimuth_bins / (2 * np.pi)).astype(np.int64), grid.azimuth_bins - 1)
+
+        values = np.zeros(len(poses), dtype=REACH_DTYPE)
+        i, j, k = voxel[inside].T
+        values[inside] = self.data[i, j, k, p[inside], q[inside]]
+        return values
+
+
+def load_reach_map(urdf=ROBOT_URDF, cache_dir=DEFAULT_CACHE_DIR, resolution: float = DEFAULT_RESOLUTION,
+                   polar_bins: int = DEFAULT_POLAR_BINS, azimuth_bins: int = DEFAULT_AZIMUTH_BINS,
+                   workers: int | None = None) -> ReachMap:
+    """Return the cached map for the URDF and grid, building it first if it is missing.
+
+    Entries are keyed by the content hash of the URDF and the grid, so an
+    edited URDF never answers from a stale map. Building happens in a
+    temporary directory that is renamed into place, the map file is then
+    opened read-only with np.load(mmap_mode="r").
+    """
+    grid = default_grid(urdf, resolution, polar_bins, azimuth_bins)
+    cache_dir = Path(cache_dir)
+    key = map_key(grid, urdf)
+    entry = cache_dir / key
+
+    if not (entry / "manifest.json").exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        build = Path(tempfile.mkdtemp(prefix=".build-", dir=cache_dir))
+        try:
+            _build_entry(build, grid, key, Path(urdf), workers)
+            os.replace(build, entry)
+        except OSError:
+            # another process finished the same entry first
+            shutil.rmtree(build, ignore_errors=True)
+            if not (entry / "manifest.json").exists():
+                raise
+        except BaseException:
+            shutil.rmtree(build, ignore_errors=True)
+            raise
+
+    return ReachMap(grid, np.load(entry / "map.npy", mmap_mode="r"), key, entry)
+
+
+def _build_entry(target: Path, grid: ReachGrid, key: str, urdf: Path, workers: int | None):
+    started = time.perf_counter()
+    shape = grid.shape + (grid.polar_bins, grid.azimuth_bins)
+    data = np.lib.format.open_memmap(target / "map.npy", mode="w+", dtype=REACH_DTYPE, shape=shape)
+    build_map(grid, data, urdf, workers)
+    data.flush()
+    reachable = float(np.count_nonzero(data["status_mask"]) / data.size)
+    del data
+
+    manifest = {
+        "version": REACH_MAP_VERSION,
+        "key": key,
+        "urdf": str(urdf),
+        "grid": asdict(grid),
+        "reachable": round(reachable, 4),
+        "build_seconds": round(time.perf_counter() - started, 3),
+    }
+    (target / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+
+def clear_cache(cache_dir=DEFAULT_CACHE_DIR):
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the reachability map of the KR3 and look up poses")
+    parser.add_argument("--resolution", type=float, default=DEFAULT_RESOLUTION, help="voxel edge in mm")
+    parser.add_argument("--polar-bins", type=int, default=DEFAULT_POLAR_BINS)
+    parser.add_argument("--azimuth-bins", type=int, default=DEFAULT_AZIMUTH_BINS)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR))
+    parser.add_argument("--lookup", help="flange pose X,Y,Z,A,B,C in $ROBROOT")
+    args = parser.parse_args()
+
+    reach_map = load_reach_map(cache_dir=args.cache_dir, resolution=args.resolution, polar_bins=args.polar_bins,
+                               azimuth_bins=args.azimuth_bins, workers=args.workers)
+    manifest = json.loads((reach_map.path / "manifest.json").read_text())
+    print(f"{reach_map.path} ({manifest['build_seconds']} s, {reach_map.data.nbytes / 1e6:.1f} MB, "
+          f"{100 * manifest['reachable']:.1f}% reachable)")
+    if args.lookup:
+        print(reach_map.lookup(*(float(v) for v in args.lookup.split(","))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""Reachability check of Point6D sequences before they are sent to the robot.
+
+    python src/reachability.py database/Haus_von_nikolaus_punkte.csv --mode lin
+    python src/reachability.py database/Astar.csv --base 400,-100,150,0,0,0
+
+Every point is solved with the analytic inverse kinematics of the URDF
+(see kinematics.py) and walked like the KRC would: a LIN or a PTP to a
+frame without Status keeps the Status of the previous point, so a point
+that is only reachable in another configuration is reported as a
+configuration change. LIN segments are additionally sampled in between
+to find limit violations and wrist/shoulder singularities on the way.
+"""
+import argparse
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+from csvHelper import load_all_points_csv
+from kinematics import load_chain, abc_to_matrix, matrix_to_abc
+from point import Point6D
+from scene_assets import ROBOT_URDF
+
+PTP = 2
+LIN = 3
+MODES = {"ptp": PTP, "lin": LIN}
+
+HOME_JOINTS = (0.0, -90.0, 90.0, 0.0, 0.0, 0.0)
+
+# poses checked between two points of a LIN segment
+DEFAULT_SAMPLES = 20
+# larger axis steps between two samples mean the path runs through a singularity
+JOINT_JUMP = 30.0
+
+# below this many poses the process pool costs more than it saves
+PARALLEL_THRESHOLD = 50000
+CHUNK_SIZE = 20000
+
+UNREACHABLE = "unreachable"
+CONFIG_CHANGE = "config_change"
+SINGULARITY = "singularity"
+
+
+@dataclass(frozen=True)
+class PointResult:
+    index: int
+    name: str
+    joints: tuple | None        # axis values A1..A6 in degrees the robot would take
+    status: int | None          # KRC Status of that solution
+    problem: str | None = None
+
+
+@dataclass(frozen=True)
+class SegmentResult:
+    index: int                  # segment from point index to point index + 1
+    start: str
+    end: str
+    problem: str | None = None
+    detail: str = ""
+
+
+@dataclass
+class ReachabilityReport:
+    mode: int
+    points: list[PointResult]
+    segments: list[SegmentResult]
+
+    @property
+    def ok(self) -> bool:
+        return not self.unreachable and not self.problems
+
+    @property
+    def unreachable(self) -> list[PointResult]:
+        return [p for p in self.points if p.problem == UNREACHABLE]
+
+    @property
+    def problems(self) -> list[SegmentResult]:
+        return [s for s in self.segments if s.problem is not None]
+
+    def summary(self) -> str:
+        counts = {kind: sum(s.problem == kind for s in self.segments)
+                  for kind in (UNREACHABLE, CONFIG_CHANGE, SINGULARITY)}
+        lines = [f"{len(self.points)} points, {len(self.unreachable)} unreachable, "
+                 f"{counts[CONFIG_CHANGE]} configuration changes, {counts[SINGULARITY]} singularities, "
+                 f"{counts[UNREACHABLE]} blocked segments"]
+        lines += [f"  {p.name}: unreachable" for p in self.unreachable]
+        lines += [f"  {s.start} -> {s.end}: {s.problem}" + (f" ({s.detail})" if s.detail else "")
+                  for s in self.problems]
+        return "\n".join(lines)
+
+
+def points_to_array(points) -> np.ndarray:
+    """Poses (N, 6) X, Y, Z, A, B, C of Point6D objects."""
+    return np.array([(p.x, p.y, p.z, p.a, p.b, p.c) for p in points], dtype=np.float64).reshape(-1, 6)
+
+
+def _frame(frame) -> tuple[np.ndarray, np.ndarray]:
+    if isinstance(frame, Point6D):
+        frame = (frame.x, frame.y, frame.z, frame.a, frame.b, frame.c)
+    frame = np.asarray(frame, dtype=np.float64)
+    return abc_to_matrix(frame[3:]), frame[:3]
+
+
+def to_robroot(poses, base=None, tool=None) -> np.ndarray:
+    """Flange poses in $ROBROOT of TCP poses given in a base frame.
+
+    base and tool are frames X, Y, Z, A, B, C (Point6D or sequence): the base
+    in $ROBROOT and the TCP in the flange, None is the identity.
+    """
+    poses = np.asarray(poses, dtype=np.float64).reshape(-1, 6)
+    if base is None and tool is None:
+        return poses.copy()
+    rot, pos = abc_to_matrix(poses[:, 3:]), poses[:, :3]
+    if tool is not None:
+        tool_rot, tool_pos = _frame(tool)
+        rot = rot @ tool_rot.T
+        pos = pos - rot @ tool_pos
+    if base is not None:
+        base_rot, base_pos = _frame(base)
+        rot = base_rot @ rot
+        pos = pos @ base_rot.T + base_pos
+    return np.concatenate([pos, matrix_to_abc(rot)], axis=1)
+
+
+def _quaternions(rot: np.ndarray) -> np.ndarray:
+    """Unit quaternions (..., 4) w, x, y, z of rotation matrices (..., 3, 3)."""
+    m = rot
+    trace = np.stack([1 + m[..., 0, 0] + m[..., 1, 1] + m[..., 2, 2],
+                      1 + m[..., 0, 0] - m[..., 1, 1] - m[..., 2, 2],
+                      1 - m[..., 0, 0] + m[..., 1, 1] - m[..., 2, 2],
+                      1 - m[..., 0, 0] - m[..., 1, 1] + m[..., 2, 2]], axis=-1)
+    candidates = np.stack([
+        np.stack([trace[..., 0], m[..., 2, 1] - m[..., 1, 2], m[..., 0, 2] - m[..., 2, 0], m[..., 1, 0] - m[..., 0, 1]], -1),
+        np.stack([m[..., 2, 1] - m[..., 1, 2], trace[..., 1], m[..., 0, 1] + m[..., 1, 0], m[..., 0, 2] + m[..., 2, 0]], -1),
+        np.stack([m[..., 0, 2] - m[..., 2, 0], m[..., 0, 1] + m[..., 1, 0], trace[..., 2], m[..., 1, 2] + m[..., 2, 1]], -1),
+        np.stack([m[..., 1, 0] - m[..., 0, 1], m[..., 0, 2] + m[..., 2, 0], m[..., 1, 2] + m[..., 2, 1], trace[..., 3]], -1),
+    ], axis=-2)
+    # the candidate with the largest diagonal term is numerically the best
+    best = np.take_along_axis(candidates, np.argmax(trace, axis=-1)[..., None, None], axis=-2)[..., 0, :]
+    return best / np.linalg.norm(best, axis=-1, keepdims=True)
+
+
+def _quaternion_matrices(q: np.ndarray) -> np.ndarray:
+    w, x, y, z = np.moveaxis(q, -1, 0)
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)], -1),
+        np.stack([2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)], -1),
+        np.stack([2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)], -1),
+    ], axis=-2)
+
+
+def interpolate_segments(poses: np.ndarray, samples: int = DEFAULT_SAMPLES) -> np.ndarray:
+    """Poses (N-1, samples, 6) strictly between consecutive poses of a LIN path.
+
+    Position is linear, orientation is interpolated on the shortest
+    rotation (slerp), like the KRC does with $ORI_TYPE = #VAR.
+    """
+    poses = np.asarray(poses, dtype=np.float64)
+    t = (np.arange(1, samples + 1) / (samples + 1))[None, :, None]
+    start, end = poses[:-1, None, :], poses[1:, None, :]
+    positions = start[..., :3] + (end[..., :3] - start[..., :3]) * t
+
+    q = _quaternions(abc_to_matrix(poses[:, 3:]))
+    q0, q1 = q[:-1, None, :], q[1:, None, :]
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    q1 = np.where(dot < 0, -q1, q1)
+    dot = np.abs(dot)
+    angle = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_angle = np.sin(angle)
+    small = sin_angle < 1e-9
+    w0 = np.where(small, 1 - t, np.sin((1 - t) * angle) / np.where(small, 1.0, sin_angle))
+    w1 = np.where(small, t, np.sin(t * angle) / np.where(small, 1.0, sin_angle))
+    quats = w0 * q0 + w1 * q1
+    quats /= np.linalg.norm(quats, axis=-1, keepdims=True)
+    return np.concatenate([positions, matrix_to_abc(_quaternion_matrices(quats))], axis=-1)
+
+
+def _solve_chunk(urdf: str, poses: np.ndarray) -> np.ndarray:
+    return load_chain(Path(urdf)).inverse(poses)
+
+
+def solve(poses, urdf=ROBOT_URDF, workers: int | None = None) -> np.ndarray:
+    """Inverse kinematics (N, 8, 6) of many poses, spread across a process pool.
+
+    workers=None uses all CPUs once there are PARALLEL_THRESHOLD poses and
+    stays in this process below, workers=1 never starts a pool.
+    """
+    poses = np.asarray(poses, dtype=np.float64).reshape(-1, 6)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(poses) >= PARALLEL_THRESHOLD else 1
+    if workers <= 1 or len(poses) < 2:
+        return _solve_chunk(str(urdf), poses)
+
+    size = min(CHUNK_SIZE, math.ceil(len(poses) / workers))
+    chunks = [poses[i:i + size] for i in range(0, len(poses), size)]
+    # spawn like the visualiser: the children must not inherit sockets or threads of a running robot
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        return np.concatenate(list(pool.map(_solve_chunk, [str(urdf)] * len(chunks), chunks)))
+
+
+def _wrap(angles: np.ndarray) -> np.ndarray:
+    return (angles + 180.0) % 360.0 - 180.0
+
+
+def check_points(points: list[Point6D], mode: int = LIN, base=None, tool=None, start_joints=HOME_JOINTS,
+                 samples: int = DEFAULT_SAMPLES, workers: int | None = None, urdf=ROBOT_URDF) -> ReachabilityReport:
+    """Check a point sequence for move_sequence(points, mode) against the URDF.
+
+    The first point takes the solution closest to start_joints (the current
+    axis values, if known). Points are expected in base, the TCP is tool
+    (see to_robroot), the check runs in $ROBROOT.
+    """
+    chain = load_chain(urdf)
+    n = len(points)
+    poses = to_robroot(points_to_array(points), base, tool)
+    inner = interpolate_segments(poses, samples) if mode == LIN and n > 1 else np.empty((0, samples, 6))
+
+    solutions = solve(np.concatenate([poses, inner.reshape(-1, 6)]), urdf, workers)
+    point_solutions = solutions[:n]
+    valid = chain.within_limits(point_solutions)
+    inner_solutions = solutions[n:].reshape(len(inner), samples, 8, 6)
+
+    point_results, segments = [], []
+    status = None
+    previous = np.asarray(start_joints, dtype=np.float64)
+    for i, point in enumerate(points):
+        problem = None
+        old_status = status
+        if not valid[i].any():
+            point_results.append(PointResult(i, point.name, None, None, UNREACHABLE))
+        else:
+            if status is None or not valid[i, status]:
+                candidates = np.flatnonzero(valid[i])
+                distance = np.abs(_wrap(point_solutions[i, candidates] - previous)).sum(axis=1)
+                problem = None if status is None else CONFIG_CHANGE
+                status = int(candidates[np.argmin(distance)])
+            joints = _nearest_equivalent(chain, point_solutions[i, status], previous)
+            point_results.append(PointResult(i, point.name, tuple(joints.tolist()), status, problem))
+
+        if i == 0:
+            if point_results[0].joints is not None:
+                previous = np.asarray(point_results[0].joints)
+            continue
+
+        start, end = point_results[i - 1], point_results[i]
+        if start.joints is None or end.joints is None:
+            segments.append(SegmentResult(i - 1, start.name, end.name, UNREACHABLE, "end point out of reach"))
+        elif problem == CONFIG_CHANGE:
+            segments.append(SegmentResult(i - 1, start.name, end.name, CONFIG_CHANGE,
+                                          f"Status {old_status} -> {status}"))
+        elif mode == LIN:
+            segments.append(_check_lin_segment(chain, i - 1, start, end, inner_solutions[i - 1, :, status]))
+        else:
+            segments.append(SegmentResult(i - 1, start.name, end.name))
+        if end.joints is not None:
+            previous = np.asarray(end.joints)
+
+    return ReachabilityReport(mode, point_results, segments)
+
+
+def _nearest_equivalent(chain, joints: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """joints +-360 deg per axis where that is closer to previous and inside the limits (A6)."""
+    shifted = previous + _wrap(joints - previous)
+    return np.where((shifted >= chain.lower) & (shifted <= chain.upper), shifted, joints)
+
+
+def _check_lin_segment(chain, index: int, start: PointResult, end: PointResult, inner: np.ndarray) -> SegmentResult:
+    path = np.vstack([start.joints, inner, end.joints])
+    steps = _wrap(np.diff(path, axis=0))
+    if np.isnan(steps).any():
+        at = int(np.argmax(np.isnan(steps).any(axis=1)))
+        return SegmentResult(index, start.name, end.name, UNREACHABLE,
+                             f"out of reach after {100 * at // (len(steps))}% of the path")
+
+    unwrapped = path[0] + np.vstack([np.zeros(6), np.cumsum(steps, axis=0)])
+    outside = ~chain.within_limits(unwrapped)
+    if outside.any():
+        at = int(np.argmax(outside))
+        axis = int(np.argmax((unwrapped[at] < chain.lower) | (unwrapped[at] > chain.upper)))
+        return SegmentResult(index, start.name, end.name, UNREACHABLE,
+                             f"A{axis + 1} limit after {100 * at // (len(path) - 1)}% of the path")
+
+    jump = np.abs(steps)
+    if jump.max() > JOINT_JUMP:
+        at, axis = np.unravel_index(np.argmax(jump), jump.shape)
+        return SegmentResult(index, start.name, end.name, SINGULARITY,
+                             f"A{axis + 1} jumps {jump[at, axis]:.0f} deg after {100 * at // len(steps)}% of the path")
+    return SegmentResult(index, start.name, end.name)
+
+
+def _parse_frame(text: str):
+    values = [float(v) for v in text.split(",")]
+    if len(values) != 6:
+        raise argparse.ArgumentTypeError("expected X,Y,Z,A,B,C")
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a point CSV for reachability and configuration changes")
+    parser.add_argument("csv", help="point file, e.g. database/Astar.csv")
+    parser.add_argument("--mode", choices=tuple(MODES), default="lin")
+    parser.add_argument("--base", type=_parse_frame, help="base frame X,Y,Z,A,B,C in $ROBROOT")
+    parser.add_argument("--tool", type=_parse_frame, help="TCP X,Y,Z,A,B,C in the flange")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    report = check_points(load_all_points_csv(args.csv), MODES[args.mode], args.base, args.tool,
+                          samples=args.samples, workers=args.workers)
+    print(report.summary())
+    sys.exit(0 if report.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import selectors
+import socket
+import threading
+
+
+class IoReactor:
+    """Single-threaded I/O loop that services the sockets of one or many robots.
+
+    Each registered socket has a callback that is run as soon as the socket is
+    readable; there is no polling timeout. A callback returns False when the
+    connection is finished, the socket is then unregistered and on_closed runs.
+    Registration is thread-safe: changes are handed to the reactor thread and
+    it is woken up through an internal socket pair.
+    """
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ, None)
+
+        self._pending: list = []
+        self._pending_lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    def register(self, sock, on_readable, on_closed=None):
+        self._submit(lambda: self._selector.register(sock, selectors.EVENT_READ, (on_readable, on_closed)))
+
+    def unregister(self, sock):
+        """Stop watching sock. Once this returns its callback will not run again."""
+        self._submit(lambda: self._remove(sock), wait=True)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 1.0):
+        self._running = False
+        self._wakeup()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def run(self):
+        """Run the reactor in the calling thread until stop() is called."""
+        self._running = True
+        while self._running:
+            for key, _ in self._selector.select():
+                if key.fileobj is self._wakeup_recv:
+                    self._drain_wakeup()
+                    continue
+
+                if self._selector.get_map().get(key.fd) is not key:
+                    continue  # in this round already unregistered
+
+                on_readable, on_closed = key.data
+                try:
+                    keep = on_readable()
+                except Exception as e:
+                    print("Reactor callback error:", e)
+                    keep = False
+
+                if keep is False:
+                    self._remove(key.fileobj)
+                    if on_closed is not None:
+                        on_closed()
+
+    def close(self):
+        self.stop()
+        self._selector.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+
+    @property
+    def socket_count(self) -> int:
+        return len(self._selector.get_map()) - 1
+
+    def _submit(self, change, wait: bool = False):
+        if self._thread is None or self._thread is threading.current_thread():
+            change()
+            return
+
+        done = threading.Event()
+
+        def apply():
+            try:
+                change()
+            finally:
+                done.set()
+
+        with self._pending_lock:
+            self._pending.append(apply)
+        self._wakeup()
+        if wait:
+            done.wait(1.0)
+
+    def _remove(self, sock):
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass  # schon entfernt oder Socket bereits geschlossen
+
+    def _wakeup(self):
+        try:
+            self._wakeup_send.send(b"\0")
+        except OSError:
+            pass
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_recv.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        for change in pending:
+            change()
@@ -0,0 +1,159 @@
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from telemetry import TELEMETRY_DTYPE, row_to_state
+
+# File layout: 16 byte header (magic, record size, reserved), then fixed-width
+# TELEMETRY_DTYPE records, appended in the order they were received.
+MAGIC = b"KRLTEL01"
+_HEADER = struct.Struct("<8sII")
+HEADER_SIZE = _HEADER.size
+
+# 256 MB are about 1.2 million records, more than six hours at 50 Hz
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class TelemetryRecorder:
+    """Append-only binary recorder for the RobotState stream.
+
+    Each file starts with a small header followed by TELEMETRY_DTYPE records.
+    When a file would grow beyond max_bytes a new one is started, file names
+    sort chronologically (prefix_YYYYmmdd_HHMMSS_NNN.bin).
+    """
+
+    def __init__(self, directory, prefix: str = "telemetry", max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < HEADER_SIZE + TELEMETRY_DTYPE.itemsize:
+            raise ValueError("max_bytes is smaller than a single record")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+
+        self.files: list[Path] = []
+        self.records_written = 0
+        self._file = None
+        self._size = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def write_rows(self, rows: np.ndarray):
+        """Append rows of TELEMETRY_DTYPE, rotating to a new file at the size limit.
+
+        Rows written after close() are ignored, so the receiver may still hold
+        a reference while another thread stops the recording.
+        """
+        with self._lock:
+            while len(rows) and not self._closed:
+                if self._file is None or self._size + TELEMETRY_DTYPE.itemsize > self.max_bytes:
+                    self._rotate()
+
+                room = (self.max_bytes - self._size) // TELEMETRY_DTYPE.itemsize
+                chunk, rows = rows[:room], rows[room:]
+                self._file.write(chunk.tobytes())
+                self._size += chunk.nbytes
+                self.records_written += len(chunk)
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._close_file()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _rotate(self):
+        self._close_file()
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        index = len(self.files)
+        while True:
+            path = self.directory / f"{self.prefix}_{stamp}_{index:03d}.bin"
+            try:
+                # another recorder (or an earlier start in the same second) may own this name
+                self._file = open(path, "xb")
+                break
+            except FileExistsError:
+                index += 1
+        self._file.write(_HEADER.pack(MAGIC, TELEMETRY_DTYPE.itemsize, 0))
+        self._size = HEADER_SIZE
+        self.files.append(path)
+
+
+def open_recording(path) -> np.ndarray:
+    """Memory-map a recording read-only; fields are zero-copy views (rec["joints"][:, 0])."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        magic, record_size, _ = _HEADER.unpack(f.read(HEADER_SIZE))
+    if magic != MAGIC or record_size != TELEMETRY_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a telemetry recording of this version")
+
+    # a crashed writer may leave a partial last record, it is ignored
+    count = (os.path.getsize(path) - HEADER_SIZE) // record_size
+    if count == 0:
+        return np.empty(0, dtype=TELEMETRY_DTYPE)
+    return np.memmap(path, dtype=TELEMETRY_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def list_recordings(directory, prefix: str = "telemetry") -> list[Path]:
+    return sorted(Path(directory).glob(f"{prefix}_*.bin"))
+
+
+class ReplaySource:
+    """Plays recorded states back in their original timing, scaled by speed.
+
+    speed=2.0 plays twice as fast, speed=0 as fast as possible. Iterating
+    yields lists of RobotState that were received together; feed() hands
+    them to a MotionController like the receive loop does, so the PyBullet
+    visualisation and everything waiting on states follows the recording.
+    """
+
+    def __init__(self, recordings, speed: float = 1.0):
+        if isinstance(recordings, np.ndarray):
+            recordings = [recordings]
+        self.recordings = [r if isinstance(r, np.ndarray) else open_recording(r) for r in recordings]
+        self.speed = speed
+
+    def __iter__(self):
+        start_wall = time.monotonic()
+        start_time = None
+
+        for records in self.recordings:
+            if len(records) == 0:
+                continue
+            timestamps = records["timestamp"]
+            # states of one receive batch share a timestamp
+            bounds = np.flatnonzero(np.diff(timestamps)) + 1
+            for lo, hi in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(records)]))):
+                timestamp = float(timestamps[lo])
+                if start_time is None:
+                    start_time = timestamp
+                if self.speed > 0:
+                    delay = (timestamp - start_time) / self.speed - (time.monotonic() - start_wall)
+                    if delay > 0:
+                        time.sleep(delay)
+                yield [row_to_state(row) for row in records[lo:hi]]
+
+    def feed(self, controller, render: bool = True):
+        """Publish every recorded batch to controller, optionally rendering it."""
+        for states in self:
+            controller._publish_states(states)
+            if render:
+                controller._render_current_state()
@@ -1,29 +1,47 @@
 import threading
-from time import sleep
 from motion_controller import MotionController
 from meta_controller import MetaController
 from transport import TcpTransport
+from reactor import IoReactor
+from telemetry import DEFAULT_CAPACITY
 
 
 class Robot(MotionController, MetaController):
 
-    def __init__(self, ip: str, port_meta: int, port_motion: int):
+    def __init__(self, ip: str, port_meta: int, port_motion: int, gui: bool = True,
+                 telemetry_capacity: int = DEFAULT_CAPACITY, visualization: str | None = None):
         self.meta_transport = TcpTransport(ip, port_meta)
         self.motion_transport = TcpTransport(ip, port_motion)
 
         # MotionController initialisieren
-        MotionController.__init__(self, motionTransport=self.motion_transport)
+        MotionController.__init__(self, motionTransport=self.motion_transport, gui=gui,
+                                  telemetry_capacity=telemetry_capacity, visualization=visualization)
         # MetaController initialisieren
         MetaController.__init__(self, metaTransport=self.meta_transport)
 
         self._meta_thread = None
         self._motion_thread = None
+        self._reactor: IoReactor | None = None
 
     def connect(self):
         self.motion_transport.connect()
         self.meta_transport.connect()
 
-    def start_receive_threads(self):
+    def start_receive_threads(self, reactor: IoReactor | None = None):
+        """Start receiving RobotState frames.
+
+        Without a reactor a dedicated thread runs motion_visualization_loop. With
+        an IoReactor the motion and meta sockets are serviced by the reactor
+        thread instead, which can be shared by several robots.
+        """
+        if reactor is not None:
+            self._reactor = reactor
+            self.stateFramer.reset()
+            reactor.register(self.motion_transport.socket, self._on_motion_readable)
+            reactor.register(self.meta_transport.socket, self._on_meta_readable)
+            reactor.start()
+            return
+
         """
         self._meta_thread = threading.Thread(
             target=self.receive_meta_loop,
@@ -39,13 +57,22 @@ class Robot(MotionController, MetaController):
         self._motion_thread.start()
 
     def disconnect(self):
-        if self.motion_transport.connected:
-            while True:
-                with self.data_lock:
-                    if self.cmd_counter <= self.last_finished_id + 1:
-                        print("cmd_counter:", self.cmd_counter, "last_finished_id:", self.last_finished_id)
-                        break
-                sleep(0.5)
+        state = self.get_current_state()
+        if self.motion_transport.connected and not (state is not None and state.stopped):
+            # nach einem Abort meldet die KRC keine Finished_Id mehr
+            self.wait_all()
+            print("cmd_counter:", self.cmd_counter, "last_finished_id:", self.last_finished_id)
+
+        if self._reactor is not None:
+            self._reactor.unregister(self.motion_transport.socket)
+            self._reactor.unregister(self.meta_transport.socket)
+            self._reactor = None
 
+        self.send_queue.flush(timeout=1.0)
+        self.send_queue.stop()
+        self.metaSender.flush()
+        self.metaSender.stop()
         self.motion_transport.disconnect()
-        self.meta_transport.disconnect()
\ No newline at end of file
+        self.meta_transport.disconnect()
+        self.stop_recording()
+        self.visualizer.close()
@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+
+AXES = ("A1", "A2", "A3", "A4", "A5", "A6")
+CARTESIAN = ("X", "Y", "Z", "A", "B", "C")
+
+
+@dataclass(frozen=True)
+class RobotState:
+    """Immutable snapshot of one decoded RobotState packet (see KRL/motion_eki.xml)."""
+    cmd_id: int | None = None
+    finished_id: int | None = None
+    stopped: bool | None = None
+    joints: tuple[float, ...] | None = None       # Position/Joint A1..A6 [deg]
+    cartesian: tuple[float, ...] | None = None    # Position/Cartesian X Y Z [mm], A B C [deg]
+    velocity: tuple[float, ...] | None = None     # Velocity A1..A6
+    torque: tuple[float, ...] | None = None       # Torque A1..A6
+
+
+# The RobotState schema is fixed by the <SEND> section of motion_eki.xml, so the
+# decoder only looks for the known tags and attributes instead of building a tree.
+# All search keys are compiled to bytes once at import time.
+_TAG_COMMAND = b"<Command"
+_TAG_JOINT = b"<Joint"
+_TAG_CARTESIAN = b"<Cartesian"
+_TAG_VELOCITY = b"<Velocity"
+_TAG_TORQUE = b"<Torque"
+
+_ATTR_ID = b' Id="'
+_ATTR_FINISHED_ID = b' Finished_Id="'
+_ATTR_STOPPED = b' Stopped="'
+_ATTR_AXES = tuple(f' {name}="'.encode() for name in AXES)
+_ATTR_CARTESIAN = tuple(f' {name}="'.encode() for name in CARTESIAN)
+
+_TAG_DELIMITERS = b" \t\r\n/>"
+_TRUE_VALUES = (b"1", b"true", b"TRUE", b"True")
+
+
+def _find_element(buf, tag: bytes, start: int, end: int) -> tuple[int, int]:
+    """Return the attribute span (after the tag name, up to '>') of the first <tag ...> element."""
+    i = buf.find(tag, start, end)
+    # skip longer tag names with the same prefix, e.g. <Cartesian_Aux
+    while i >= 0 and i + len(tag) < end and buf[i + len(tag)] not in _TAG_DELIMITERS:
+        i = buf.find(tag, i + len(tag), end)
+    if i < 0:
+        return -1, -1
+
+    close = buf.find(b">", i, end)
+    if close < 0:
+        raise ValueError(f"Unterminated element {tag.decode()}")
+    return i + len(tag), close
+
+
+def _find_value(buf, view, attr: bytes, lo: int, hi: int):
+    """Return the raw value of attr inside [lo, hi) as a memoryview slice, or None."""
+    i = buf.find(attr, lo, hi)
+    if i < 0:
+        return None
+    i += len(attr)
+    j = buf.find(b'"', i, hi)
+    if j < 0:
+        raise ValueError(f"Unterminated attribute {attr.decode().strip()}")
+    return view[i:j]
+
+
+def _decode_values(buf, view, tag: bytes, attrs, start: int, end: int) -> tuple[float, ...] | None:
+    lo, hi = _find_element(buf, tag, start, end)
+    if lo < 0:
+        return None
+
+    values = []
+    for attr in attrs:
+        raw = _find_value(buf, view, attr, lo, hi)
+        if raw is None:
+            raise ValueError(f"Missing attribute {attr.decode().strip()} in {tag.decode()}")
+        values.append(float(raw))
+    return tuple(values)
+
+
+def decode_robot_state(buf, start: int = 0, end: int | None = None) -> RobotState:
+    """Decode the RobotState frame in buf[start:end] without building an XML tree.
+
+    buf may be bytes or a bytearray (e.g. the framer's receive buffer); the
+    values are converted straight from the buffer. Raises ValueError on bad data.
+    """
+    if end is None:
+        end = len(buf)
+    view = memoryview(buf)
+
+    cmd_id = finished_id = stopped = None
+    lo, hi = _find_element(buf, _TAG_COMMAND, start, end)
+    if lo >= 0:
+        raw = _find_value(buf, view, _ATTR_ID, lo, hi)
+        if raw is not None:
+            cmd_id = int(raw)
+        raw = _find_value(buf, view, _ATTR_FINISHED_ID, lo, hi)
+        if raw is not None:
+            finished_id = int(raw)
+        raw = _find_value(buf, view, _ATTR_STOPPED, lo, hi)
+        if raw is not None:
+            stopped = raw in _TRUE_VALUES
+
+    return RobotState(
+        cmd_id=cmd_id,
+        finished_id=finished_id,
+        stopped=stopped,
+        joints=_decode_values(buf, view, _TAG_JOINT, _ATTR_AXES, start, end),
+        cartesian=_decode_values(buf, view, _TAG_CARTESIAN, _ATTR_CARTESIAN, start, end),
+        velocity=_decode_values(buf, view, _TAG_VELOCITY, _ATTR_AXES, start, end),
+        torque=_decode_values(buf, view, _TAG_TORQUE, _ATTR_AXES, start, end),
+    )
+
+
+def parse_robot_state(xml_bytes: bytes) -> RobotState:
+    """Decode one complete RobotState frame. Raises ValueError on bad data."""
+    return decode_robot_state(xml_bytes)
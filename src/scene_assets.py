@@ -0,0 +1,309 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CELL_MESH = PROJECT_ROOT / "kuka_kr3_support" / "meshes" / "kr3r540" / "visual" / "whole_cell_binary.stl"
+ROBOT_URDF = PROJECT_ROOT / "kuka_kr3_support" / "urdf" / "kr3r540.urdf"
+DEFAULT_CACHE_DIR = PROJECT_ROOT / ".cache" / "scene"
+
+# bump when the generated files change, old cache entries are then ignored
+ASSET_VERSION = 1
+
+# grid cells along the bounding box diagonal for vertex clustering, None keeps the mesh
+QUALITY_LEVELS = {"preview": 120, "full": None}
+DEFAULT_QUALITY = "preview"
+
+# support directions for the convex collision hulls
+HULL_DIRECTIONS = 128
+
+_STL_RECORD = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+
+
+@dataclass(frozen=True)
+class SceneAssets:
+    """Files to load into PyBullet for one quality level."""
+    quality: str
+    key: str
+    cell_mesh: Path
+    urdf: Path
+
+
+# ==================== STL ====================
+
+def read_stl(path) -> np.ndarray:
+    """Triangles of a binary or ASCII STL file as float32 array (N, 3, 3)."""
+    data = Path(path).read_bytes()
+    if len(data) >= 84:
+        count = int(np.frombuffer(data, dtype="<u4", count=1, offset=80)[0])
+        if 84 + count * _STL_RECORD.itemsize == len(data):
+            return np.frombuffer(data, dtype=_STL_RECORD, count=count, offset=84)["vertices"].copy()
+
+    vertices = [line.split()[1:4] for line in data.decode("ascii", errors="replace").splitlines()
+                if line.strip().startswith("vertex")]
+    return np.asarray(vertices, dtype=np.float32).reshape(-1, 3, 3)
+
+
+def write_stl(path, triangles: np.ndarray):
+    triangles = np.asarray(triangles, dtype=np.float32)
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+    records = np.zeros(len(triangles), dtype=_STL_RECORD)
+    records["normal"] = normals
+    records["vertices"] = triangles
+    with open(path, "wb") as f:
+        f.write(b"scene_assets".ljust(80, b"\0"))
+        f.write(np.uint32(len(triangles)).tobytes())
+        f.write(records.tobytes())
+
+
+# ==================== GEOMETRY ====================
+
+def decimate(triangles: np.ndarray, resolution: int) -> np.ndarray:
+    """Vertex clustering: merge all vertices within one grid cell and drop collapsed triangles.
+
+    resolution is the number of cells along the bounding box diagonal.
+    """
+    vertices = triangles.reshape(-1, 3).astype(np.float64)
+    if len(vertices) == 0:
+        return triangles
+    low = vertices.min(axis=0)
+    diagonal = float(np.linalg.norm(vertices.max(axis=0) - low))
+    if diagonal == 0.0:
+        return triangles[:0]
+    cell = diagonal / resolution
+
+    cells = np.floor((vertices - low) / cell).astype(np.int64)
+    # one integer per grid cell, np.unique on 1-D keys is much faster than on rows
+    size = int(cells.max()) + 1
+    keys = (cells[:, 0] * size + cells[:, 1]) * size + cells[:, 2]
+    _, cluster = np.unique(keys, return_inverse=True)
+    cluster = cluster.reshape(-1)
+    counts = np.bincount(cluster)
+    centers = np.zeros((len(counts), 3))
+    np.add.at(centers, cluster, vertices)
+    centers /= counts[:, None]
+
+    faces = cluster.reshape(-1, 3)
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+    # the same triangle from several source triangles is kept once
+    ordered = np.sort(faces, axis=1)
+    count = len(counts)
+    _, first = np.unique((ordered[:, 0] * count + ordered[:, 1]) * count + ordered[:, 2], return_index=True)
+    faces = faces[np.sort(first)]
+    return centers[faces].astype(np.float32)
+
+
+def _support_points(vertices: np.ndarray, directions: int) -> np.ndarray:
+    """Extreme vertices in evenly spread directions, all of them lie on the convex hull."""
+    i = np.arange(directions) + 0.5
+    polar = np.arccos(1 - 2 * i / directions)
+    azimuth = np.pi * (1 + 5 ** 0.5) * i
+    normals = np.stack((np.cos(azimuth) * np.sin(polar), np.sin(azimuth) * np.sin(polar), np.cos(polar)), axis=1)
+    extreme = np.unique(np.argmax(vertices @ normals.T, axis=0))
+    return vertices[extreme]
+
+
+def convex_hull(points: np.ndarray) -> np.ndarray:
+    """Triangles (N, 3, 3) of the convex hull of points, outward facing (incremental hull)."""
+    points = np.unique(np.asarray(points, dtype=np.float64), axis=0)
+    scale = float(np.ptp(points, axis=0).max()) if len(points) else 0.0
+    eps = 1e-9 * max(scale, 1.0)
+
+    # start with a tetrahedron of far apart points
+    a = int(np.argmin(points[:, 0]))
+    b = int(np.argmax(np.linalg.norm(points - points[a], axis=1)))
+    line = points[b] - points[a]
+    c = int(np.argmax(np.linalg.norm(np.cross(points - points[a], line), axis=1)))
+    normal = np.cross(line, points[c] - points[a])
+    heights = (points - points[a]) @ normal
+    d = int(np.argmax(np.abs(heights)))
+    if abs(heights[d]) <= eps * np.linalg.norm(normal) or len({a, b, c, d}) < 4:
+        raise ValueError("points are flat, no convex hull")
+
+    inside = points[[a, b, c, d]].mean(axis=0)
+    faces: list[tuple[int, int, int]] = []
+    normals: list[np.ndarray] = []
+
+    def add_face(i, j, k):
+        n = np.cross(points[j] - points[i], points[k] - points[i])
+        n /= np.linalg.norm(n)
+        if (inside - points[i]) @ n > 0:
+            i, j, n = j, i, -n
+        faces.append((i, j, k))
+        normals.append(n)
+
+    for face in ((a, b, c), (a, b, d), (a, c, d), (b, c, d)):
+        add_face(*face)
+
+    # farthest points first, most of the others are then inside already
+    order = np.argsort(-np.linalg.norm(points - inside, axis=1))
+    for p in order:
+        if p in (a, b, c, d):
+            continue
+        corners = points[[f[0] for f in faces]]
+        heights = np.einsum("ij,ij->i", np.asarray(normals), points[p] - corners)
+        visible = np.flatnonzero(heights > eps)
+        if len(visible) == 0:
+            continue
+
+        edges = set()
+        for f in visible:
+            i, j, k = faces[f]
+            edges.update(((i, j), (j, k), (k, i)))
+        horizon = [(i, j) for i, j in edges if (j, i) not in edges]
+        keep = np.ones(len(faces), dtype=bool)
+        keep[visible] = False
+        faces = [f for f, kept in zip(faces, keep) if kept]
+        normals = [n for n, kept in zip(normals, keep) if kept]
+        for i, j in horizon:
+            add_face(i, j, p)
+
+    return points[np.asarray(faces)].astype(np.float32)
+
+
+def collision_hull(triangles: np.ndarray, directions: int = HULL_DIRECTIONS) -> np.ndarray:
+    """Convex hull of a mesh, built from its extreme vertices."""
+    vertices = np.unique(triangles.reshape(-1, 3).astype(np.float64), axis=0)
+    return convex_hull(_support_points(vertices, directions))
+
+
+# ==================== CACHE ====================
+
+def _resolve_package_path(filename: str) -> Path:
+    if filename.startswith("package://"):
+        return PROJECT_ROOT / filename[len("package://"):]
+    return (ROBOT_URDF.parent / filename).resolve()
+
+
+def source_files(urdf=ROBOT_URDF, cell_mesh=CELL_MESH) -> list[Path]:
+    """The URDF, every mesh it references and the cell mesh."""
+    meshes = {_resolve_package_path(m.get("filename")) for m in ET.parse(urdf).iter("mesh")}
+    return [Path(urdf), Path(cell_mesh), *sorted(meshes)]
+
+
+def source_key(paths, quality: str) -> str:
+    """Content hash of the source files, quality level and asset version."""
+    digest = hashlib.sha256(f"{ASSET_VERSION}:{quality}".encode())
+    for path in paths:
+        digest.update(Path(path).name.encode())
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:20]
+
+
+def prepare_assets(quality: str = DEFAULT_QUALITY, cache_dir=DEFAULT_CACHE_DIR,
+                   urdf=ROBOT_URDF, cell_mesh=CELL_MESH) -> SceneAssets:
+    """Return the cached assets for quality, building them first if the sources changed.
+
+    Visual meshes are decimated to the quality level ("full" keeps the
+    originals), collision meshes are replaced by convex hulls. Entries are
+    keyed by the content hash of all sources, so an edited URDF or mesh
+    never loads stale files; building happens in a temporary directory that
+    is renamed into place.
+    """
+    if quality not in QUALITY_LEVELS:
+        raise ValueError(f"unknown quality {quality!r}, expected one of {tuple(QUALITY_LEVELS)}")
+    cache_dir = Path(cache_dir)
+    key = source_key(source_files(urdf, cell_mesh), quality)
+    entry = cache_dir / f"{quality}-{key}"
+
+    if not (entry / "manifest.json").exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        build = Path(tempfile.mkdtemp(prefix=".build-", dir=cache_dir))
+        try:
+            _build_assets(build, quality, key, Path(urdf), Path(cell_mesh))
+            os.replace(build, entry)
+        except OSError:
+            # another process finished the same entry first
+            shutil.rmtree(build, ignore_errors=True)
+            if not (entry / "manifest.json").exists():
+                raise
+        except BaseException:
+            shutil.rmtree(build, ignore_errors=True)
+            raise
+
+    manifest = json.loads((entry / "manifest.json").read_text())
+    return SceneAssets(quality, key, entry / manifest["cell_mesh"], entry / manifest["urdf"])
+
+
+def _build_assets(target: Path, quality: str, key: str, urdf: Path, cell_mesh: Path):
+    resolution = QUALITY_LEVELS[quality]
+    started = time.perf_counter()
+    stats = {}
+
+    def visual(source: Path, name: str) -> Path:
+        if resolution is None:
+            return source
+        triangles = read_stl(source)
+        reduced = decimate(triangles, resolution)
+        write_stl(target / name, reduced)
+        stats[name] = [len(triangles), len(reduced)]
+        return target / name
+
+    def collision(source: Path, name: str) -> Path:
+        triangles = read_stl(source)
+        try:
+            hull = collision_hull(triangles)
+        except ValueError:
+            return source
+        write_stl(target / name, hull)
+        stats[name] = [len(triangles), len(hull)]
+        return target / name
+
+    cell = visual(cell_mesh, "cell.stl")
+
+    tree = ET.parse(urdf)
+    for kind in ("visual", "collision"):
+        for element in tree.iter(kind):
+            for mesh in element.iter("mesh"):
+                source = _resolve_package_path(mesh.get("filename"))
+                name = f"{kind}_{source.stem}.stl"
+                path = visual(source, name) if kind == "visual" else collision(source, name)
+                # generated files relative to the URDF, the entry is renamed after the build
+                mesh.set("filename", path.name if path.parent == target else str(path))
+    tree.write(target / urdf.name, encoding="utf-8", xml_declaration=True)
+
+    manifest = {
+        "version": ASSET_VERSION,
+        "quality": quality,
+        "key": key,
+        "cell_mesh": cell.name if cell.parent == target else str(cell),
+        "urdf": urdf.name,
+        "triangles": stats,
+        "build_seconds": round(time.perf_counter() - started, 3),
+    }
+    (target / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+
+def clear_cache(cache_dir=DEFAULT_CACHE_DIR):
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepare decimated PyBullet scene assets")
+    parser.add_argument("--quality", choices=tuple(QUALITY_LEVELS), action="append",
+                        help="quality level to build (default: all)")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR))
+    args = parser.parse_args()
+
+    for quality in args.quality or QUALITY_LEVELS:
+        assets = prepare_assets(quality, args.cache_dir)
+        manifest = json.loads((assets.urdf.parent / "manifest.json").read_text())
+        print(f"{quality}: {assets.urdf.parent} ({manifest['build_seconds']} s)")
+        for name, (before, after) in manifest["triangles"].items():
+            print(f"  {name:<24}{before:>8} -> {after:>6} triangles")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import threading
+from collections import deque
+
+# one sendall carries at most this many bytes, so a long backlog still goes out in steps
+DEFAULT_MAX_BATCH_BYTES = 65534
+
+
+class SendQueue:
+    """Outbound queue with a writer thread for one transport.
+
+    put() only appends pre-encoded bytes and returns, the writer thread joins
+    everything queued so far (up to max_batch_bytes) into one transport.send.
+    Messages keep their order. If a send fails the error is kept, queued
+    messages are dropped and the next put() raises it until stop() is called.
+    """
+
+    def __init__(self, transport, max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES):
+        self.transport = transport
+        self.max_batch_bytes = max_batch_bytes
+        self.error: Exception | None = None
+
+        self.messages_sent = 0
+        self.batches_sent = 0
+        self.bytes_sent = 0
+        self.messages_dropped = 0
+        self.max_depth = 0
+        self.max_bytes_in_flight = 0
+
+        self._queue: deque[bytes] = deque()
+        self._bytes_queued = 0
+        self._bytes_sending = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    @property
+    def depth(self) -> int:
+        """Messages waiting for the writer."""
+        return len(self._queue)
+
+    @property
+    def bytes_in_flight(self) -> int:
+        """Bytes queued or handed to the socket but not yet sent."""
+        return self._bytes_queued + self._bytes_sending
+
+    def put(self, data: bytes):
+        with self._cond:
+            if self.error is not None:
+                raise RuntimeError(f"Send failed: {self.error}")
+            if not self.transport.connected:
+                raise RuntimeError("Not connected")
+            if not self._running:
+                self._start()
+
+            self._queue.append(data)
+            self._bytes_queued += len(data)
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self.max_bytes_in_flight = max(self.max_bytes_in_flight, self.bytes_in_flight)
+            self._cond.notify()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything queued was sent. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._bytes_sending, timeout)
+
+    def stop(self, timeout: float = 1.0):
+        """Send what is queued, then end the writer thread and forget a send error."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            # on timeout the writer keeps draining and clears _thread itself when done
+            thread.join(timeout)
+        with self._cond:
+            # the transport is reconnected before the queue is used again
+            self.error = None
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "bytes_in_flight": self.bytes_in_flight,
+            "max_bytes_in_flight": self.max_bytes_in_flight,
+            "messages_sent": self.messages_sent,
+            "batches_sent": self.batches_sent,
+            "bytes_sent": self.bytes_sent,
+            "messages_dropped": self.messages_dropped,
+        }
+
+    def _start(self):
+        self._running = True
+        # a writer that stop() did not wait out is still running, it serves the queue again
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and self._running:
+                    self._cond.wait()
+                if not self._queue:
+                    self._thread = None
+                    return
+
+                batch = [self._queue.popleft()]
+                size = len(batch[0])
+                while self._queue and size + len(self._queue[0]) <= self.max_batch_bytes:
+                    batch.append(self._queue.popleft())
+                    size += len(batch[-1])
+                self._bytes_queued -= size
+                self._bytes_sending = size
+
+            try:
+                self.transport.send(batch[0] if len(batch) == 1 else b"".join(batch))
+            except Exception as e:
+                print("Send error:", e)
+                with self._cond:
+                    self.error = e
+                    self.messages_dropped += len(batch) + len(self._queue)
+                    self._queue.clear()
+                    self._bytes_queued = 0
+                    self._bytes_sending = 0
+                    self._running = False
+                    self._thread = None
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                self._bytes_sending = 0
+                self.messages_sent += len(batch)
+                self.batches_sent += 1
+                self.bytes_sent += size
+                self._cond.notify_all()
@@ -0,0 +1,47 @@
+import threading
+
+
+class StateSlot:
+    """Single-writer, many-reader slot holding the newest RobotState.
+
+    The writer replaces one (sequence, state) tuple per publish; assigning an
+    attribute is atomic, so readers always see a consistent pair without a
+    lock and never block the receiver. Waiting readers sleep on an event that
+    the writer swaps out and sets after each publish.
+    """
+
+    def __init__(self):
+        self._entry = (0, None)
+        self._event = threading.Event()
+
+    def publish(self, state):
+        """Make state the newest one and wake all waiting readers. Only one thread may publish."""
+        self._entry = (self._entry[0] + 1, state)
+        event, self._event = self._event, threading.Event()
+        event.set()
+
+    def latest(self) -> tuple:
+        """Return (sequence, state) of the newest publication; sequence 0 means nothing published yet."""
+        return self._entry
+
+    @property
+    def value(self):
+        return self._entry[1]
+
+    @property
+    def seq(self) -> int:
+        return self._entry[0]
+
+    def wait_newer(self, seq: int, timeout: float | None = None) -> tuple | None:
+        """Block until a state with a sequence greater than seq is published.
+
+        Returns (sequence, state) of the newest state, or None on timeout.
+        """
+        event = self._event
+        entry = self._entry
+        if entry[0] > seq:
+            return entry
+        # the event was taken before the re-check, a publish in between sets it
+        if not event.wait(timeout):
+            return None
+        return self._entry
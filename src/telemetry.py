@@ -0,0 +1,152 @@
+import threading
+import time
+
+import numpy as np
+
+from robot_state import RobotState
+
+# one row per received RobotState; missing values are NaN, a missing id or flag is -1
+TELEMETRY_DTYPE = np.dtype([
+    ("timestamp", "f8"),
+    ("cmd_id", "i8"),
+    ("finished_id", "i8"),
+    ("stopped", "i1"),
+    ("joints", "f8", (6,)),
+    ("cartesian", "f8", (6,)),
+    ("velocity", "f8", (6,)),
+    ("torque", "f8", (6,)),
+])
+
+AXIS_FIELDS = ("joints", "cartesian", "velocity", "torque")
+
+# 10 minutes at the 50 Hz state rate of motion_eki.src, about 6 MB
+DEFAULT_CAPACITY = 30000
+
+_NO_VALUES = (np.nan,) * 6
+
+
+class TelemetryBuffer:
+    """Fixed-size ring buffer of RobotState samples backed by a structured numpy array.
+
+    The receiver appends, older samples are overwritten once the buffer is
+    full, so memory stays constant. Queries return copies in chronological
+    order and can be used with numpy directly (samples["joints"][:, 0] is A1).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=TELEMETRY_DTYPE)
+        self._next = 0      # index of the next write
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, state: RobotState, timestamp: float | None = None):
+        self.extend([state], timestamp)
+
+    def extend(self, states: list[RobotState], timestamp: float | None = None):
+        """Append states received together; they share one timestamp (time.time() if None)."""
+        if states:
+            self.extend_rows(states_to_rows(states, timestamp))
+
+    def extend_rows(self, rows: np.ndarray):
+        """Append rows of TELEMETRY_DTYPE, e.g. from states_to_rows or a recording."""
+        if len(rows) > self.capacity:
+            rows = rows[-self.capacity:]
+
+        with self._lock:
+            end = self._next + len(rows)
+            if end <= self.capacity:
+                self._data[self._next:end] = rows
+            else:
+                split = self.capacity - self._next
+                self._data[self._next:] = rows[:split]
+                self._data[:end - self.capacity] = rows[split:]
+            self._next = end % self.capacity
+            self._count = min(self._count + len(rows), self.capacity)
+
+    def clear(self):
+        with self._lock:
+            self._next = 0
+            self._count = 0
+
+    def samples(self) -> np.ndarray:
+        """All stored samples, oldest first."""
+        with self._lock:
+            if self._count < self.capacity:
+                return self._data[:self._count].copy()
+            return np.concatenate((self._data[self._next:], self._data[:self._next]))
+
+    def last(self, n: int) -> np.ndarray:
+        """The newest n samples, oldest first."""
+        samples = self.samples()
+        return samples[max(0, len(samples) - n):]
+
+    def last_seconds(self, seconds: float, now: float | None = None) -> np.ndarray:
+        """Samples received within the last seconds before now (time.time() if None)."""
+        if now is None:
+            now = time.time()
+        samples = self.samples()
+        # timestamps are ascending, so the window starts at a binary-searched index
+        start = np.searchsorted(samples["timestamp"], now - seconds, side="left")
+        return samples[start:]
+
+    def by_command(self, first_id: int, last_id: int | None = None) -> np.ndarray:
+        """Samples recorded while the controller executed command ids first_id..last_id."""
+        if last_id is None:
+            last_id = first_id
+        samples = self.samples()
+        ids = samples["cmd_id"]
+        return samples[(ids >= first_id) & (ids <= last_id)]
+
+    def stats(self, field: str = "joints", samples: np.ndarray | None = None) -> dict[str, np.ndarray]:
+        """min/max/mean per axis of field over samples (default: everything stored)."""
+        return axis_stats(self.samples() if samples is None else samples, field)
+
+
+def states_to_rows(states: list[RobotState], timestamp: float | None = None) -> np.ndarray:
+    """Convert states received together into TELEMETRY_DTYPE rows sharing one timestamp."""
+    if timestamp is None:
+        timestamp = time.time()
+
+    rows = np.empty(len(states), dtype=TELEMETRY_DTYPE)
+    rows["timestamp"] = timestamp
+    rows["cmd_id"] = [-1 if s.cmd_id is None else s.cmd_id for s in states]
+    rows["finished_id"] = [-1 if s.finished_id is None else s.finished_id for s in states]
+    rows["stopped"] = [-1 if s.stopped is None else int(s.stopped) for s in states]
+    for field in AXIS_FIELDS:
+        rows[field] = [getattr(s, field) or _NO_VALUES for s in states]
+    return rows
+
+
+def row_to_state(row) -> RobotState:
+    """Turn a telemetry row back into a RobotState."""
+    values = {}
+    for field in AXIS_FIELDS:
+        axes = row[field]
+        values[field] = None if np.isnan(axes).all() else tuple(axes.tolist())
+    cmd_id, finished_id, stopped = int(row["cmd_id"]), int(row["finished_id"]), int(row["stopped"])
+    return RobotState(
+        cmd_id=None if cmd_id < 0 else cmd_id,
+        finished_id=None if finished_id < 0 else finished_id,
+        stopped=None if stopped < 0 else bool(stopped),
+        **values,
+    )
+
+
+def axis_stats(samples: np.ndarray, field: str) -> dict[str, np.ndarray]:
+    if field not in AXIS_FIELDS:
+        raise ValueError(f"unknown telemetry field {field!r}, expected one of {AXIS_FIELDS}")
+    values = samples[field]
+    if len(values) == 0 or np.isnan(values).all():
+        empty = np.full(6, np.nan)
+        return {"min": empty, "max": empty.copy(), "mean": empty.copy()}
+    return {
+        "min": np.nanmin(values, axis=0),
+        "max": np.nanmax(values, axis=0),
+        "mean": np.nanmean(values, axis=0),
+    }
@@ -34,11 +34,14 @@ class TcpTransport:
     def send(self, data: bytes):
         if not self.connected:
             raise RuntimeError("Not connected")
-        print("SEND ->", self.socket.getpeername())   # Ziel (IP, Port)
-
         self.socket.sendall(data)
 
     def receive(self, bufsize: int = 8192) -> bytes:
         if not self.connected:
             raise RuntimeError("Not connected")
         return self.socket.recv(bufsize)
+
+    def receive_into(self, buffer) -> int:
+        if not self.connected:
+            raise RuntimeError("Not connected")
+        return self.socket.recv_into(buffer)
@@ -0,0 +1,331 @@
+import math
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from scene_assets import prepare_assets, CELL_MESH, ROBOT_URDF, DEFAULT_QUALITY
+
+NONE = "none"
+DIRECT = "direct"
+GUI = "gui"
+PROCESS = "process"
+MODES = (NONE, DIRECT, GUI, PROCESS)
+
+# frames per second of the visualiser process
+DEFAULT_RENDER_RATE = 60.0
+# the view runs this far behind the newest state, two state periods at 50 Hz,
+# so there is nearly always a newer sample to interpolate towards
+DEFAULT_RENDER_DELAY = 0.04
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+ROBOT_BASE_POSITION = [-0.2, -0.05, 0.9]
+
+
+class NullVisualizer:
+    """Visualisation backend that draws nothing, for scripts, tests and servers."""
+    mode = NONE
+
+    @property
+    def loaded(self) -> bool:
+        return False
+
+    def show(self, joints_deg):
+        pass
+
+    def close(self):
+        pass
+
+
+class PyBulletVisualizer:
+    """Shows the robot cell in PyBullet, headless (DIRECT) or in a window (GUI).
+
+    Nothing is imported or loaded until the first show() (or load()), so
+    creating a controller stays cheap and pybullet is only needed when a
+    view is actually drawn. The meshes come from the scene asset cache in
+    the given quality ("preview", "full"), None loads the original files.
+    """
+
+    def __init__(self, mode: str = GUI, quality: str | None = DEFAULT_QUALITY):
+        if mode not in (DIRECT, GUI):
+            raise ValueError(f"unknown PyBullet mode {mode!r}, expected {DIRECT!r} or {GUI!r}")
+        self.mode = mode
+        self.quality = quality
+        self.client = None
+        self.robot_id = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.client is not None
+
+    def load(self):
+        if self.client is not None:
+            return
+        import pybullet
+        import pybullet_data
+        from pybullet_utils.bullet_client import BulletClient
+
+        cell_mesh, urdf = self._scene_files()
+        client = BulletClient(connection_mode=pybullet.GUI if self.mode == GUI else pybullet.DIRECT)
+        client.setGravity(0, 0, -9.81)
+
+        # Default PyBullet data path (planes, textures, etc.)
+        pybullet_data_path = pybullet_data.getDataPath()
+        client.setAdditionalSearchPath(pybullet_data_path)
+
+        # CELL (STL VISUAL)
+        visual_shape = client.createVisualShape(shapeType=pybullet.GEOM_MESH, fileName=str(cell_mesh),
+                                                meshScale=[1, 1, 1])
+        client.createMultiBody(baseMass=0, baseVisualShapeIndex=visual_shape, basePosition=[0, 0, 0])
+
+        # Load our robot URDF: needs project root so package://kuka_kr3_support/... meshes resolve
+        client.setAdditionalSearchPath(str(PROJECT_ROOT))
+        self.robot_id = client.loadURDF(str(urdf), basePosition=ROBOT_BASE_POSITION, useFixedBase=True)
+
+        # Restore default additional search path
+        client.setAdditionalSearchPath(pybullet_data_path)
+        self.client = client
+
+    def _scene_files(self) -> tuple[Path, Path]:
+        if self.quality is None:
+            return CELL_MESH, ROBOT_URDF
+        try:
+            assets = prepare_assets(self.quality)
+        except OSError as e:
+            # read-only installation: show the original meshes
+            print("Scene asset cache not available:", e)
+            return CELL_MESH, ROBOT_URDF
+        return assets.cell_mesh, assets.urdf
+
+    def show(self, joints_deg):
+        """Set the six robot axes (degrees, A1..A6) and step the simulation."""
+        self.load()
+        for j, angle in enumerate(joints_deg):
+            self.client.resetJointState(self.robot_id, j, math.radians(angle))
+        self.client.stepSimulation()
+
+    def joint_positions(self) -> list[float]:
+        """Current axis values in the simulation in radians."""
+        self.load()
+        return [self.client.getJointState(self.robot_id, j)[0] for j in range(6)]
+
+    def close(self):
+        client, self.client = self.client, None
+        if client is not None:
+            client.disconnect()
+            self.robot_id = None
+
+
+class JointBlock:
+    """Newest joint vector in a multiprocessing.shared_memory block.
+
+    Layout: int64 sequence and stop flag, then float64 timestamp and A1..A6
+    in degrees. There is one writer; it makes the sequence odd while writing
+    (seqlock), so a reader never sees a half-written vector and nobody waits
+    on a lock.
+    """
+    SIZE = 2 * 8 + 7 * 8
+
+    def __init__(self, name: str | None = None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.SIZE)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self._header = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf)
+        self._values = np.ndarray((7,), dtype=np.float64, buffer=self.shm.buf, offset=16)
+        if self.owner:
+            self._header[:] = 0
+            self._values[:] = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def stopped(self) -> bool:
+        return bool(self._header[1])
+
+    def stop(self):
+        self._header[1] = 1
+
+    def write(self, joints_deg, timestamp: float | None = None):
+        self._header[0] += 1
+        self._values[0] = time.time() if timestamp is None else timestamp
+        self._values[1:] = joints_deg
+        self._header[0] += 1
+
+    def read(self) -> tuple[int, float, tuple] | None:
+        """(sequence, timestamp, joints) of the newest vector, None before the first write."""
+        while True:
+            seq = int(self._header[0])
+            if seq == 0:
+                return None
+            if seq % 2:
+                continue
+            values = self._values.copy()
+            if int(self._header[0]) == seq:
+                return seq // 2, float(values[0]), tuple(values[1:].tolist())
+
+    def close(self):
+        # numpy views must be gone before the buffer can be released
+        self._header = self._values = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class JointInterpolator:
+    """Joint vectors between timestamped samples for rendering at any frame rate.
+
+    at(t) interpolates linearly between the samples around t and holds the
+    first/last sample outside of them, it never extrapolates.
+    """
+
+    def __init__(self, history: int = 32):
+        self.samples: deque[tuple[float, tuple]] = deque(maxlen=history)
+
+    def add(self, timestamp: float, joints):
+        if self.samples and timestamp <= self.samples[-1][0]:
+            # same receive time (batch) or clock step: the newer vector replaces the last one
+            self.samples[-1] = (self.samples[-1][0], tuple(joints))
+            return
+        self.samples.append((timestamp, tuple(joints)))
+
+    def at(self, t: float) -> tuple | None:
+        if not self.samples:
+            return None
+        if t >= self.samples[-1][0]:
+            return self.samples[-1][1]
+        if t <= self.samples[0][0]:
+            return self.samples[0][1]
+
+        newer = len(self.samples) - 1
+        while self.samples[newer - 1][0] > t:
+            newer -= 1
+        t0, j0 = self.samples[newer - 1]
+        t1, j1 = self.samples[newer]
+        f = (t - t0) / (t1 - t0)
+        return tuple(a + (b - a) * f for a, b in zip(j0, j1))
+
+
+def _render_process(block_name: str, mode: str, rate: float, delay: float, quality: str | None):
+    """Entry point of the visualiser process.
+
+    Renders on its own frame clock: every frame shows the pose of delay
+    seconds ago, interpolated between the samples taken from the block.
+    """
+    block = JointBlock(block_name)
+    viewer = PyBulletVisualizer(mode, quality)
+    interpolator = JointInterpolator()
+    parent = multiprocessing.parent_process()
+    period = 1.0 / rate
+    last_seq = 0
+    last_pose = None
+    next_frame = time.monotonic()
+    try:
+        while not block.stopped and (parent is None or parent.is_alive()):
+            sample = block.read()
+            if sample is not None and sample[0] != last_seq:
+                last_seq = sample[0]
+                interpolator.add(sample[1], sample[2])
+
+            pose = interpolator.at(time.time() - delay)
+            if pose is not None and pose != last_pose:
+                viewer.show(pose)
+                last_pose = pose
+
+            next_frame += period
+            remaining = next_frame - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+            else:
+                # a slow frame: skip ahead instead of rendering a burst to catch up
+                next_frame = time.monotonic()
+    finally:
+        viewer.close()
+        block.close()
+
+
+class ProcessVisualizer:
+    """Runs the PyBullet view in its own process, fed through shared memory.
+
+    show() only writes the joint vector into a JointBlock, so the receive
+    thread does no rendering and does not share the GIL with PyBullet. The
+    process renders rate frames per second, interpolated between the
+    received states (see JointInterpolator), independent of the state rate.
+    It is started on the first show(); if it crashes the robot keeps running
+    without a view (see alive, restart()).
+    """
+    mode = PROCESS
+
+    def __init__(self, render_mode: str = GUI, rate: float = DEFAULT_RENDER_RATE,
+                 delay: float = DEFAULT_RENDER_DELAY, quality: str | None = DEFAULT_QUALITY):
+        if render_mode not in (DIRECT, GUI):
+            raise ValueError(f"unknown PyBullet mode {render_mode!r}, expected {DIRECT!r} or {GUI!r}")
+        self.render_mode = render_mode
+        self.rate = rate
+        self.delay = delay
+        self.quality = quality
+        self.block: JointBlock | None = None
+        self.process = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.process is not None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def load(self):
+        if self.process is not None:
+            return
+        if self.block is None:
+            self.block = JointBlock()
+        # spawn: the child must not inherit sockets or threads of the controller
+        ctx = multiprocessing.get_context("spawn")
+        args = (self.block.name, self.render_mode, self.rate, self.delay, self.quality)
+        self.process = ctx.Process(target=_render_process, args=args, daemon=True, name="visualizer")
+        self.process.start()
+
+    def show(self, joints_deg):
+        self.load()
+        self.block.write(joints_deg)
+
+    def restart(self):
+        """Start a new visualiser process after the old one died."""
+        if self.process is not None and not self.process.is_alive():
+            self.process = None
+        self.load()
+
+    def close(self, timeout: float = 2.0):
+        process, self.process = self.process, None
+        if self.block is not None:
+            self.block.stop()
+        if process is not None:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout)
+        if self.block is not None:
+            self.block.close()
+            self.block = None
+
+
+def create_visualizer(mode: str = GUI, quality: str | None = DEFAULT_QUALITY):
+    """Visualisation backend for mode "none", "direct" (headless PyBullet), "gui"
+    or "process" (GUI in a separate process). A backend object is returned as is."""
+    if not isinstance(mode, str):
+        return mode
+    if mode == NONE:
+        return NullVisualizer()
+    if mode in (DIRECT, GUI):
+        return PyBulletVisualizer(mode, quality)
+    if mode == PROCESS:
+        return ProcessVisualizer(GUI, quality=quality)
+    raise ValueError(f"unknown visualization mode {mode!r}, expected one of {MODES}")
@@ -0,0 +1,161 @@
+import asyncio
+import re
+import sys
+import unittest
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from async_robot import AsyncRobot, AsyncCommandHandle
+from krc_simulator import KrcSimulator
+from point import Point6D, JointState
+
+
+def robot_state(finished_id: int) -> bytes:
+    return (
+        '<RobotState>'
+        f'<Command Id="0" Finished_Id="{finished_id}" Stopped="0"/>'
+        '<Position>'
+        '<Joint A1="1.0" A2="2.0" A3="3.0" A4="4.0" A5="5.0" A6="6.0"/>'
+        '<Cartesian X="10.0" Y="20.0" Z="30.0" A="0.0" B="90.0" C="0.0"/>'
+        '</Position>'
+        '</RobotState>'
+    ).encode('utf-8')
+
+
+class FakeKrc:
+    """Minimaler KRC-Ersatz: nimmt Kommandos an und meldet sie nacheinander als fertig."""
+
+    def __init__(self):
+        self.received_ids: list[int] = []
+        self.meta_messages: list[bytes] = []
+        self.finished = 0
+        self.max_in_flight = 0
+
+    async def start(self):
+        self.motion_server = await asyncio.start_server(self.handle_motion, '127.0.0.1', 0)
+        self.meta_server = await asyncio.start_server(self.handle_meta, '127.0.0.1', 0)
+        self.motion_port = self.motion_server.sockets[0].getsockname()[1]
+        self.meta_port = self.meta_server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        for server in (self.motion_server, self.meta_server):
+            server.close()
+            await server.wait_closed()
+
+    async def handle_motion(self, reader, writer):
+        async def send_states():
+            while not writer.is_closing():
+                if self.received_ids and self.finished < self.received_ids[-1]:
+                    self.finished += 1
+                writer.write(robot_state(self.finished))
+                await asyncio.sleep(0.002)
+
+        task = asyncio.create_task(send_states())
+        buffer = b''
+        try:
+            while data := await reader.read(65536):
+                buffer += data
+                *messages, buffer = buffer.split(b'</EthernetKRL>\n')
+                for message in messages:
+                    self.received_ids.append(int(re.search(rb'Id="(\d+)"', message).group(1)))
+                self.max_in_flight = max(self.max_in_flight, len(self.received_ids) - self.finished)
+        finally:
+            task.cancel()
+            writer.close()
+
+    async def handle_meta(self, reader, writer):
+        while data := await reader.read(4096):
+            self.meta_messages.append(data)
+        writer.close()
+
+
+class TestAsyncRobot(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.krc = FakeKrc()
+        await self.krc.start()
+        self.robot = AsyncRobot('127.0.0.1', self.krc.meta_port, self.krc.motion_port)
+        await self.robot.connect()
+        self.point = Point6D("P", 100.0, 0.0, 200.0, 0.0, 90.0, 0.0)
+
+    async def asyncTearDown(self):
+        await self.robot.disconnect(timeout=2)
+        await self.krc.stop()
+
+    async def test_awaitable_commands(self):
+        handle = await self.robot.lin(self.point)
+        self.assertIsInstance(handle, AsyncCommandHandle)
+
+        self.assertTrue(await asyncio.wait_for(handle, 2))
+        self.assertTrue(handle.done())
+
+        handles = [await self.robot.ptp(self.point), await self.robot.jaw_open(), await self.robot.set_user_out(2, True)]
+        self.assertTrue(await self.robot.wait_all(timeout=2))
+        self.assertEqual([h.cmd_id for h in handles], [2, 3, 4])
+        self.assertEqual(self.krc.received_ids, [1, 2, 3, 4])
+
+    async def test_state_iterator(self):
+        count = 0
+        async for state in self.robot.states(latest_only=True):
+            self.assertEqual(state.joints, (1.0, 2.0, 3.0, 4.0, 5.0, 6.0))
+            count += 1
+            if count == 5:
+                break
+        self.assertEqual(count, 5)
+
+    async def test_streamed_sequence(self):
+        handle = await self.robot.move_sequence([self.point] * 60, mode=3, window=8, timeout=2)
+
+        self.assertTrue(await handle.wait(timeout=2))
+        self.assertEqual(self.krc.received_ids, list(range(1, 61)))
+        self.assertLessEqual(self.krc.max_in_flight, 8)
+
+    async def test_concurrent_tasks_keep_id_order(self):
+        await asyncio.gather(*(self.robot.lin(self.point) for _ in range(20)))
+        self.assertTrue(await self.robot.wait_all(timeout=2))
+        self.assertEqual(self.krc.received_ids, list(range(1, 21)))
+
+    async def test_meta_override(self):
+        await self.robot.set_override(150)
+        for _ in range(100):
+            if self.krc.meta_messages:
+                break
+            await asyncio.sleep(0.01)
+        self.assertIn(b'VelocityOverride="100"', b''.join(self.krc.meta_messages))
+
+
+class TestAsyncRobotAgainstSimulator(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        # echte Bewegungszeiten, damit beim Abort noch Bewegungen offen sind
+        self.krc = KrcSimulator(state_rate=200.0)
+        self.krc.start()
+        self.robot = AsyncRobot('127.0.0.1', self.krc.meta_port, self.krc.motion_port)
+        await self.robot.connect()
+
+    async def asyncTearDown(self):
+        self.krc.stop()
+
+    async def test_disconnect_after_abort(self):
+        for i in range(6):
+            await self.robot.ptp_joint(JointState(90.0 * (-1) ** i, -90, 90, 0, 0, 0), vel=0.01)
+        for _ in range(100):
+            if self.krc.commands_received == 6:
+                break
+            await asyncio.sleep(0.01)
+        await self.robot.abort()
+        for _ in range(100):
+            if self.robot.currentState is not None and self.robot.currentState.stopped:
+                break
+            await asyncio.sleep(0.01)
+
+        # nach dem Abort kommt keine Finished_Id mehr, disconnect darf nicht darauf warten
+        self.assertLess(self.robot.last_finished_id, 6)
+        await asyncio.wait_for(self.robot.disconnect(), 2)
+        self.assertFalse(self.robot.motion_transport.connected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import sys
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 from pathlib import Path
 
 # Fügt den `src` Ordner in den Python-Pfad ein
@@ -12,10 +12,9 @@ from meta_controller import MetaController
 
 class TestBoundaries(unittest.TestCase):
 
-    @patch('motion_controller.p')
-    def setUp(self, mock_pybullet):
+    def setUp(self):
         mock_transport = MagicMock()
-        self.motion = MotionController(mock_transport)
+        self.motion = MotionController(mock_transport, visualization="none")
         self.meta = MetaController(mock_transport)
 
     def test_velocity_boundaries(self):
@@ -34,6 +33,8 @@ class TestBoundaries(unittest.TestCase):
     def test_meta_override_boundaries(self):
         # 1. Zu hoch (Override über 100% macht keinen Sinn)
         self.meta.set_override(150)
+        # Der MetaSender sendet aus seinem eigenen Thread
+        self.assertTrue(self.meta.metaSender.flush())
 
         # Wir prüfen mit welchem Parameter _build_xml intern aufgerufen wurde.
         # Im meta_controller.py hast du programmiert: value = max(0, min(100, value))
@@ -45,6 +46,7 @@ class TestBoundaries(unittest.TestCase):
 
         # 2. Zu niedrig
         self.meta.set_override(-50)
+        self.assertTrue(self.meta.metaSender.flush())
         last_call_neg = self.meta.metaTransport.send.call_args[0][0].decode('utf-8')
         self.assertIn('VelocityOverride="0"', last_call_neg, "Override wurde nicht auf 0 begrenzt!")
 
@@ -0,0 +1,103 @@
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from motion_controller import MotionController
+from command_handle import CommandHandle, wait_all
+from point import Point6D, JointState
+from robot_state import RobotState
+
+
+class TestCommandHandle(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MagicMock()
+        self.transport.connected = True
+        self.motion = MotionController(self.transport, visualization="none")
+        self.point = Point6D("P", 100.0, 0.0, 200.0, 0.0, 90.0, 0.0)
+
+    def finish_later(self, finished_id, delay=0.05, stopped=False):
+        def publish():
+            time.sleep(delay)
+            self.motion._publish_states([RobotState(finished_id=finished_id, stopped=stopped)])
+        threading.Thread(target=publish, daemon=True).start()
+
+    def test_every_send_method_returns_handle(self):
+        handles = [
+            self.motion.ptp(self.point),
+            self.motion.lin(self.point),
+            self.motion.circ(self.point, self.point),
+            self.motion.ptp_joint(JointState(0, -90, 90, 0, 0, 0)),
+            self.motion.jaw_open(),
+            self.motion.jaw_close(),
+            self.motion.suction_on(),
+            self.motion.suction_off(),
+            self.motion.set_user_out(3, True),
+        ]
+
+        self.assertTrue(all(isinstance(h, CommandHandle) for h in handles))
+        self.assertEqual([h.cmd_id for h in handles], list(range(1, 10)))
+
+    def test_sequence_handle_covers_all_ids(self):
+        handle = self.motion.move_sequence([self.point] * 5, mode=3)
+
+        self.assertEqual((handle.first_id, handle.cmd_id), (1, 5))
+
+    def test_sequence_stopped_before_first_move(self):
+        # Fenster ist durch den PTP voll, der Stopp kommt bevor ein Move gesendet wurde
+        first = self.motion.ptp(self.point)
+        self.finish_later(0, stopped=True)
+        handle = self.motion.move_sequence([self.point] * 5, mode=3, window=1, timeout=5)
+
+        self.assertTrue(handle.empty)
+        self.assertTrue(handle.done())
+        self.assertTrue(handle.wait(timeout=0.1))
+        self.assertEqual(repr(handle), "CommandHandle(empty)")
+        self.assertFalse(first.done())
+        self.assertFalse(wait_all([handle, first], timeout=0.1))
+        self.assertTrue(wait_all([handle]))
+
+    def test_wait_resolves_on_finished_id(self):
+        first = self.motion.lin(self.point)
+        second = self.motion.lin(self.point)
+
+        self.finish_later(1)
+        self.assertTrue(first.wait(timeout=2))
+        self.assertFalse(second.done())
+
+        self.finish_later(2)
+        self.assertTrue(wait_all([first, second], timeout=2))
+        self.assertTrue(second.done())
+
+    def test_wait_timeout(self):
+        handle = self.motion.lin(self.point)
+
+        start = time.monotonic()
+        self.assertFalse(handle.wait(timeout=0.1))
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def test_wait_returns_on_stop(self):
+        handle = self.motion.lin(self.point)
+
+        self.finish_later(0, stopped=True)
+        self.assertFalse(handle.wait(timeout=2))
+
+    def test_wait_all_on_controller(self):
+        self.motion.lin(self.point)
+        self.motion.jaw_open()
+
+        self.finish_later(2)
+        self.assertTrue(self.motion.wait_all(timeout=2))
+
+    def test_wait_all_without_commands(self):
+        self.assertTrue(self.motion.wait_all(timeout=0))
+        self.assertTrue(wait_all([]))
+
+if __name__ == '__main__':
+    unittest.main()
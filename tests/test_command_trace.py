@@ -0,0 +1,95 @@
+import sys
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from command_trace import CommandTracer
+from motion_controller import MotionController
+from point import Point6D
+from robot_state import RobotState
+
+
+class TestCommandTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.tracer = CommandTracer(window=100)
+
+    def test_send_ack_finish(self):
+        self.tracer.sent(1, "move", 3, timestamp=10.0)
+        self.tracer.observe(RobotState(cmd_id=1, finished_id=0), timestamp=10.2)
+        self.tracer.observe(RobotState(cmd_id=1, finished_id=0), timestamp=10.4)
+        self.tracer.observe(RobotState(cmd_id=0, finished_id=1), timestamp=11.0)
+
+        trace = self.tracer.completed[-1]
+        self.assertAlmostEqual(trace.queue_delay, 0.2)
+        self.assertAlmostEqual(trace.execution_time, 0.8)
+        self.assertAlmostEqual(trace.total_time, 1.0)
+        self.assertEqual(self.tracer.pending(), 0)
+
+        lin = self.tracer.percentiles()["mode"]["lin"]
+        self.assertAlmostEqual(lin["execution"]["p50"], 0.8)
+        self.assertEqual(lin["total"]["count"], 1)
+
+    def test_finished_id_completes_skipped_ids(self):
+        # Greifer-Befehle zwischen zwei States werden nie als Command/@Id gemeldet
+        self.tracer.sent(1, "grip", timestamp=0.0)
+        self.tracer.sent(2, "io", timestamp=0.0)
+        self.tracer.sent(3, "move", 1, timestamp=0.0)
+        self.tracer.observe(RobotState(cmd_id=3, finished_id=2), timestamp=0.1)
+
+        stats = self.tracer.percentiles()
+        self.assertEqual(stats["type"]["grip"]["total"]["count"], 1)
+        self.assertNotIn("queue", stats["type"]["grip"])
+        self.assertEqual(self.tracer.pending(), 1)
+
+    def test_groups_by_mode_and_type(self):
+        self.tracer.sent_range(1, 10, "move", 3, timestamp=0.0)
+        self.tracer.sent(11, "move", 2, timestamp=0.0)
+        self.tracer.sent(12, "suction", timestamp=0.0)
+        for cmd_id in range(1, 13):
+            self.tracer.observe(RobotState(cmd_id=cmd_id, finished_id=cmd_id - 1), timestamp=float(cmd_id))
+        self.tracer.observe(RobotState(cmd_id=0, finished_id=12), timestamp=13.0)
+
+        stats = self.tracer.percentiles()
+        self.assertEqual(stats["mode"]["lin"]["execution"]["count"], 10)
+        self.assertEqual(stats["mode"]["ptp"]["execution"]["count"], 1)
+        self.assertEqual(stats["type"]["move"]["total"]["count"], 11)
+        self.assertEqual(stats["type"]["suction"]["total"]["count"], 1)
+        self.assertIn("lin", self.tracer.report())
+
+    def test_pending_is_bounded(self):
+        tracer = CommandTracer(max_pending=5)
+        tracer.sent_range(1, 20, "move", 3)
+        self.assertEqual(tracer.pending(), 5)
+
+
+class TestControllerTracing(unittest.TestCase):
+
+    def setUp(self):
+        transport = MagicMock()
+        transport.connected = True
+        self.motion = MotionController(transport, visualization="none")
+        self.point = Point6D("P", 100.0, 0.0, 200.0, 0.0, 90.0, 0.0)
+
+    def test_every_command_is_traced(self):
+        self.motion.lin(self.point)
+        self.motion.circ(self.point, self.point)
+        self.motion.jaw_open()
+        self.motion.suction_on()
+        self.motion.set_user_out(1, True)
+        self.motion.move_sequence([self.point] * 3, mode=2)
+        self.assertEqual(self.motion.tracer.pending(), 8)
+
+        self.motion._publish_states([RobotState(cmd_id=8, finished_id=8)])
+
+        stats = self.motion.tracer.percentiles()
+        self.assertEqual(self.motion.tracer.pending(), 0)
+        self.assertEqual(stats["mode"]["ptp"]["total"]["count"], 3)
+        self.assertEqual(stats["mode"]["circ"]["total"]["count"], 1)
+        self.assertEqual(stats["type"]["io"]["total"]["count"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
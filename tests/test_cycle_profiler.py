@@ -0,0 +1,115 @@
+import json
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from cycle_profiler import build_timeline, to_chrome_trace, write_report, profile_recording, CycleProfiler
+from motion_controller import MotionController
+from recorder import TelemetryRecorder, list_recordings
+from robot_state import RobotState
+from telemetry import states_to_rows
+import numpy as np
+
+
+def sample(t: float, cmd_id: int, finished_id: int, x: float) -> np.ndarray:
+    state = RobotState(cmd_id=cmd_id, finished_id=finished_id, stopped=False,
+                       joints=(0.0, -90.0, 90.0, 0.0, 0.0, 0.0),
+                       cartesian=(x, 0.0, 200.0, 0.0, 90.0, 0.0),
+                       velocity=(0.0,) * 6)
+    return states_to_rows([state], timestamp=t)
+
+
+def job() -> np.ndarray:
+    # 0-1 s: lin 1 faehrt, 1.1-1.5 s: Greifer 2, 1.6-2.5 s: nichts in der Queue, 2.5-3.5 s: lin 3 faehrt
+    # (ein Intervall gehoert immer zum Befehl des Samples an seinem Anfang)
+    rows = []
+    for i in range(11):
+        rows.append(sample(i * 0.1, 1, 0, x=i * 10.0))
+    for i in range(1, 6):
+        rows.append(sample(1.0 + i * 0.1, 2, 1, x=100.0))
+    for i in range(1, 11):
+        rows.append(sample(1.5 + i * 0.1, 0, 2, x=100.0))
+    for i in range(1, 11):
+        rows.append(sample(2.5 + i * 0.1, 3, 2, x=100.0 + i * 10.0))
+    rows.append(sample(3.6, 0, 3, x=200.0))
+    return np.concatenate(rows)
+
+
+class TestBuildTimeline(unittest.TestCase):
+
+    def test_categories(self):
+        timeline = build_timeline(job(), kinds={1: "lin", 2: "grip", 3: "lin"})
+        summary = timeline["summary"]
+
+        self.assertAlmostEqual(summary["total"], 3.6)
+        self.assertAlmostEqual(summary["motion"], 2.0, places=3)
+        self.assertAlmostEqual(summary["stationary"], 0.2, places=3)
+        self.assertAlmostEqual(summary["gripper_dwell"], 0.5, places=3)
+        self.assertAlmostEqual(summary["host_gap"], 0.9, places=3)
+        self.assertEqual(summary["limited_by"], "host")
+
+        commands = {c["cmd_id"]: c for c in timeline["commands"]}
+        self.assertEqual(commands[2]["kind"], "grip")
+        self.assertAlmostEqual(commands[1]["motion"], 1.0, places=3)
+
+    def test_without_kinds_dwell_is_stationary(self):
+        summary = build_timeline(job())["summary"]
+        self.assertAlmostEqual(summary["stationary"], 0.7, places=3)
+        self.assertEqual(summary["gripper_dwell"], 0.0)
+
+    def test_empty(self):
+        self.assertEqual(build_timeline(job()[:1])["duration"], 0.0)
+
+    def test_reports(self):
+        timeline = build_timeline(job(), kinds={1: "lin", 2: "grip", 3: "lin"})
+        trace = to_chrome_trace(timeline)
+        names = [e["name"] for e in trace["traceEvents"] if e["ph"] == "X"]
+        self.assertIn("grip #2", names)
+        self.assertIn("host_gap", names)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("job.html", "job.trace.json", "job.json"):
+                write_report(timeline, Path(tmp) / name)
+            self.assertIn("traceEvents", json.loads((Path(tmp) / "job.trace.json").read_text()))
+            self.assertIn("limited by", (Path(tmp) / "job.html").read_text())
+
+    def test_html_with_zero_length_segment(self):
+        # ein Batch mit gemeinsamem Zeitstempel, in dem die Id wechselt, ergibt ein Segment der Länge 0
+        rows = np.concatenate([sample(0.0, 5, 4, x=0.0), sample(0.0, 6, 5, x=0.0),
+                               sample(0.1, 6, 5, x=10.0), sample(0.2, 0, 6, x=20.0)])
+        timeline = build_timeline(rows)
+        self.assertIn(0.0, [s["duration"] for s in timeline["segments"]])
+        with tempfile.TemporaryDirectory() as tmp:
+            write_report(timeline, Path(tmp) / "job.html")
+            self.assertIn("limited by", (Path(tmp) / "job.html").read_text())
+
+    def test_from_recording(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with TelemetryRecorder(tmp) as recorder:
+                recorder.write_rows(job())
+            timeline = profile_recording(list_recordings(tmp))
+        self.assertAlmostEqual(timeline["summary"]["total"], 3.6)
+
+
+class TestLiveProfiler(unittest.TestCase):
+
+    def test_profile_block(self):
+        transport = MagicMock()
+        transport.connected = True
+        motion = MotionController(transport, visualization="none")
+
+        with CycleProfiler(motion) as profiler:
+            motion.jaw_close()
+            motion._publish_states([RobotState(cmd_id=1, finished_id=0, joints=(0.0,) * 6, velocity=(0.0,) * 6)])
+            motion._publish_states([RobotState(cmd_id=0, finished_id=1, joints=(0.0,) * 6, velocity=(0.0,) * 6)])
+
+        commands = profiler.timeline["commands"]
+        self.assertEqual([(c["cmd_id"], c["kind"]) for c in commands], [(1, "grip")])
+
+if __name__ == '__main__':
+    unittest.main()
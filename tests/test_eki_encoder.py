@@ -0,0 +1,106 @@
+import sys
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from point import Point6D, JointState
+from eki_encoder import (encode_move, encode_move_joint, encode_move_batch, encode_grip,
+                         encode_suction, encode_io, move_encoder)
+
+
+# Referenz: die urspruenglichen ElementTree-Builder aus motion_controller.py
+def _wrap(root) -> bytes:
+    xml_body = ET.tostring(root, encoding="utf-8", method="xml").decode("utf-8")
+    full_message = f'<?xml version="1.0" encoding="UTF-8"?>\n<EthernetKRL>\n{xml_body}\n</EthernetKRL>\n'
+    return full_message.encode("utf-8")
+
+
+def reference_move(cmd_id, point, cmd_type, mode, vel, acc, base, tool, blending,
+                   wait_for_gripper=0, aux_point=None, joints=None):
+    root = ET.Element("RobotCommand", Id=str(cmd_id), Type=str(cmd_type))
+    move = ET.SubElement(root, "Move", Mode=str(mode), BaseIndex=str(base), ToolIndex=str(tool),
+                         Velocity=str(vel), Acceleration=str(acc), Blending=str(blending),
+                         WaitForGripper=str(wait_for_gripper))
+    cart = ET.SubElement(move, "Cartesian")
+    for k in ["X", "Y", "Z", "A", "B", "C"]:
+        cart.set(k, str(getattr(point, k.lower())) if point is not None else "0")
+    aux = ET.SubElement(move, "Cartesian_Aux")
+    for k in ["X", "Y", "Z", "A", "B", "C"]:
+        aux.set(k, str(getattr(aux_point, k.lower())) if aux_point is not None else "0")
+    joint = ET.SubElement(move, "Joint")
+    for a in ["A1", "A2", "A3", "A4", "A5", "A6"]:
+        joint.set(a, str(getattr(joints, a.lower())) if joints is not None else "0")
+    return _wrap(root)
+
+
+def reference_simple(cmd_id, cmd_type, parent, child, attrs):
+    root = ET.Element("RobotCommand", Id=str(cmd_id), Type=str(cmd_type))
+    element = ET.SubElement(root, parent)
+    if child is not None:
+        element = ET.SubElement(element, child)
+    for k, v in attrs.items():
+        element.set(k, v)
+    return _wrap(root)
+
+
+class TestEkiEncoder(unittest.TestCase):
+
+    def setUp(self):
+        self.points = [
+            Point6D("P1", 100.5, -50.2, 300.0, 90.0, 0.0, 180.0),
+            Point6D("P2", 1, 2, 3, 4, 5, 6),
+            Point6D("P3", -0.0, 1e-7, 123456789.125, -179.99, 0.1, 1e20),
+        ]
+
+    def test_move_is_byte_identical(self):
+        for pt in self.points:
+            for vel in (0.2, 1, 0.1 + 0.2):
+                self.assertEqual(
+                    encode_move(42, pt, 1, 2, vel, 1.0, 0, 15, 0.0),
+                    reference_move(42, pt, 1, 2, vel, 1.0, 0, 15, 0.0),
+                )
+
+    def test_circ_is_byte_identical(self):
+        end, aux = self.points[0], self.points[1]
+        self.assertEqual(
+            encode_move(7, end, 1, 6, 0.1, 0.2, 15, 15, 0.0, aux_point=aux),
+            reference_move(7, end, 1, 6, 0.1, 0.2, 15, 15, 0.0, aux_point=aux),
+        )
+
+    def test_joint_move_is_byte_identical(self):
+        joints = JointState(0, -90.0, 90.0, 0.5, 45, -0.25)
+        self.assertEqual(
+            encode_move_joint(3, joints, 1, 1, 0.2, 0.2, 0, 15, 0.0),
+            reference_move(3, None, 1, 1, 0.2, 0.2, 0, 15, 0.0, joints=joints),
+        )
+
+    def test_batch_matches_single_messages(self):
+        points = self.points * 100
+        payload = encode_move_batch(10, points, 1, 3, 0.1, 0.2, 0, 15, 0.0)
+        expected = b"".join(
+            reference_move(10 + i, pt, 1, 3, 0.1, 0.2, 0, 15, 0.0) for i, pt in enumerate(points)
+        )
+        self.assertEqual(payload, expected)
+
+        messages = move_encoder(1, 3, 0.1, 0.2, 0, 15, 0.0).encode_each(10, points)
+        self.assertEqual(b"".join(messages), expected)
+
+    def test_cache_keeps_int_and_float_apart(self):
+        # 1 == 1.0 fuer Python, aber im XML steht "1" bzw. "1.0"
+        pt = self.points[0]
+        self.assertIn(b'Velocity="1"', encode_move(1, pt, 1, 2, 1, 0.2, 0, 15, 0.0))
+        self.assertIn(b'Velocity="1.0"', encode_move(1, pt, 1, 2, 1.0, 0.2, 0, 15, 0.0))
+
+    def test_grip_suction_io_are_byte_identical(self):
+        self.assertEqual(encode_grip(77, 1), reference_simple(77, 3, "Grip", "Jaw", {"DirectionMode": "1"}))
+        self.assertEqual(encode_suction(78, 0), reference_simple(78, 4, "Suction", "Vacuum", {"Suction": "0"}))
+        self.assertEqual(
+            encode_io(79, 3, True),
+            reference_simple(79, 5, "IO", None, {"user_out": "3", "user_outstate": "1"}),
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import sys
+import unittest
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from framing import RobotStateFramer
+from robot_state import decode_robot_state
+
+
+def make_state(finished_id: int) -> bytes:
+    return (
+        '<RobotState>'
+        f'<Command Id="{finished_id + 1}" Finished_Id="{finished_id}" Stopped="0"/>'
+        '<Position><Joint A1="1.0" A2="2.0" A3="3.0" A4="4.0" A5="5.0" A6="6.0"/></Position>'
+        '</RobotState>'
+    ).encode('utf-8')
+
+
+class TestRobotStateFramer(unittest.TestCase):
+
+    def test_multiple_frames_in_one_chunk(self):
+        # Drei komplette States in einem recv() -> alle drei in Reihenfolge
+        framer = RobotStateFramer()
+        frames = framer.feed(make_state(1) + make_state(2) + make_state(3))
+
+        self.assertEqual(frames, [make_state(1), make_state(2), make_state(3)])
+        self.assertEqual(framer.frames_received, 3)
+        self.assertEqual(framer.pending_bytes, 0)
+
+    def test_frame_split_across_chunks(self):
+        # Ein State wird auf zwei recv() Aufrufe verteilt
+        framer = RobotStateFramer()
+        data = make_state(7)
+
+        self.assertEqual(framer.feed(data[:20]), [])
+        self.assertEqual(framer.feed(data[20:]), [data])
+
+    def test_byte_by_byte(self):
+        framer = RobotStateFramer()
+        data = make_state(1) + make_state(2)
+
+        frames = []
+        for i in range(len(data)):
+            frames += framer.feed(data[i:i + 1])
+
+        self.assertEqual(frames, [make_state(1), make_state(2)])
+
+    def test_xml_declaration_is_skipped(self):
+        framer = RobotStateFramer()
+        frames = framer.feed(b'<?xml version="1.0" encoding="UTF-8"?>\n' + make_state(4))
+
+        self.assertEqual(frames, [make_state(4)])
+        self.assertEqual(framer.frames_malformed, 0)
+
+    def test_latest_only_counts_dropped(self):
+        framer = RobotStateFramer(latest_only=True)
+        frames = framer.feed(make_state(1) + make_state(2) + make_state(3))
+
+        self.assertEqual(frames, [make_state(3)])
+        self.assertEqual(framer.frames_received, 3)
+        self.assertEqual(framer.frames_dropped, 2)
+
+    def test_truncated_frame_counts_malformed(self):
+        # Erster State bricht mitten drin ab, danach kommt ein kompletter State
+        framer = RobotStateFramer()
+        frames = framer.feed(make_state(1)[:30] + make_state(2))
+
+        self.assertEqual(frames, [make_state(2)])
+        self.assertEqual(framer.frames_malformed, 1)
+
+    def test_orphan_end_tag_counts_malformed(self):
+        framer = RobotStateFramer()
+        frames = framer.feed(make_state(1)[30:] + make_state(2))
+
+        self.assertEqual(frames, [make_state(2)])
+        self.assertEqual(framer.frames_malformed, 1)
+
+    def test_overflow_is_discarded(self):
+        framer = RobotStateFramer(max_buffer=256)
+        framer.feed(b'x' * 256)
+
+        self.assertEqual(framer.pending_bytes, 0)
+        self.assertEqual(framer.frames_malformed, 1)
+        self.assertEqual(framer.feed(make_state(5)), [make_state(5)])
+
+    def test_recv_into_decodes_in_place(self):
+        # Simuliert einen Socket, der die Daten in drei Teilen liefert
+        data = make_state(1) + make_state(2)
+        chunks = [data[:50], data[50:200], data[200:]]
+
+        def read_into(view):
+            chunk = chunks.pop(0)
+            view[:len(chunk)] = chunk
+            return len(chunk)
+
+        framer = RobotStateFramer()
+        states = []
+        while chunks:
+            states += framer.recv_into(read_into, decode_robot_state)
+
+        self.assertEqual([s.finished_id for s in states], [1, 2])
+        self.assertEqual(states[1].joints, (1.0, 2.0, 3.0, 4.0, 5.0, 6.0))
+
+    def test_recv_into_connection_closed(self):
+        framer = RobotStateFramer()
+        self.assertIsNone(framer.recv_into(lambda view: 0, decode_robot_state))
+
+    def test_recv_into_counts_undecodable_frames(self):
+        framer = RobotStateFramer()
+        data = b'<RobotState><Joint A1="x"/></RobotState>'
+
+        def read_into(view):
+            view[:len(data)] = data
+            return len(data)
+
+        self.assertEqual(framer.recv_into(read_into, decode_robot_state), [])
+        self.assertEqual(framer.frames_malformed, 1)
+
+if __name__ == '__main__':
+    unittest.main()
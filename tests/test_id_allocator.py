@@ -0,0 +1,99 @@
+import re
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+# Fügt den `src` Ordner in den Python-Pfad ein
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from id_allocator import IdAllocator
+from motion_controller import MotionController
+from point import Point6D
+
+
+class TestIdAllocator(unittest.TestCase):
+
+    def test_reserve_ranges(self):
+        ids = IdAllocator()
+        self.assertEqual(ids.reserve(), 1)
+        self.assertEqual(ids.reserve(10), 2)
+        self.assertEqual(ids.reserve(), 12)
+        self.assertEqual(ids.next_id, 13)
+
+        with self.assertRaises(ValueError):
+            ids.reserve(0)
+
+    def test_concurrent_ranges_do_not_overlap(self):
+        ids = IdAllocator()
+        ranges = []
+        lock = threading.Lock()
+
+        def producer(size):
+            for _ in range(200):
+                first = ids.reserve(size)
+                with lock:
+                    ranges.append((first, size))
+
+        threads = [threading.Thread(target=producer, args=(size,)) for size in (1, 3, 7, 16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # jede Id genau einmal, ohne Luecken
+        all_ids = sorted(i for first, size in ranges for i in range(first, first + size))
+        self.assertEqual(all_ids, list(range(1, 1 + 200 * (1 + 3 + 7 + 16))))
+
+    def test_release_only_newest_reservation(self):
+        ids = IdAllocator()
+        first = ids.reserve(10)
+        self.assertTrue(ids.release(first + 4, first + 10))
+        self.assertEqual(ids.next_id, 5)
+
+        ids.reserve(3)
+        # 5..7 ist nicht mehr die neueste Reservierung am Ende von 11
+        self.assertFalse(ids.release(5, 11))
+        self.assertEqual(ids.next_id, 8)
+
+
+class TestConcurrentProducers(unittest.TestCase):
+
+    def test_ids_reach_the_wire_in_order(self):
+        transport = MagicMock()
+        transport.connected = True
+        motion = MotionController(transport, visualization="none")
+        # niemand meldet Finished_Id, das Fenster muss alle Befehle fassen
+        motion.stream_window = 1000
+        point = Point6D("P", 0.0, 0.0, 100.0, 0.0, 90.0, 0.0)
+
+        def producer(kind):
+            for _ in range(50):
+                if kind == 0:
+                    motion.lin(point)
+                elif kind == 1:
+                    motion.jaw_open()
+                elif kind == 2:
+                    motion.set_user_out(1, True)
+                else:
+                    motion.move_sequence([point] * 5, mode=3)
+
+        threads = [threading.Thread(target=producer, args=(kind,)) for kind in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertTrue(motion.send_queue.flush(timeout=2))
+        motion.send_queue.stop()
+
+        payload = b"".join(c[0][0] for c in transport.send.call_args_list)
+        wire_ids = [int(i) for i in re.findall(rb'<RobotCommand Id="(\d+)"', payload)]
+        total = 3 * 50 + 50 * 5
+        self.assertEqual(wire_ids, list(range(1, total + 1)))
+        self.assertEqual(motion.cmd_counter, total + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Fügt den `src` Ordner in den Python-Pfad ein
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from kinematics import load_chain, forward_kinematics, abc_to_matrix, matrix_to_abc
+from point import JointState
+from scene_assets import ROBOT_URDF
+
+
+class TestForwardKinematics(unittest.TestCase):
+
+    def setUp(self):
+        self.chain = load_chain()
+
+    def test_chain_from_urdf(self):
+        self.assertEqual(self.chain.joint_names, tuple(f"joint_a{i}" for i in range(1, 7)))
+        np.testing.assert_allclose(self.chain.lower, [-170, -170, -110, -175, -120, -350])
+        np.testing.assert_allclose(self.chain.upper, [170, 50, 155, 175, 120, 350])
+
+    def test_known_poses(self):
+        # Grundstellung: Unterarm waagrecht, Flansch zeigt nach vorne
+        np.testing.assert_allclose(forward_kinematics([0, -90, 90, 0, 0, 0]), [355, 0, 625, 0, 0, 0], atol=1e-9)
+        # A5 = 90°: Flansch zeigt nach unten, KRC meldet B = 90
+        np.testing.assert_allclose(forward_kinematics([0, -90, 90, 0, 90, 0]), [280, 0, 550, 0, 90, 0], atol=1e-9)
+        # A1 dreht um -Z, positive Werte schwenken also nach -Y
+        pose = forward_kinematics([90, -90, 90, 0, 0, 0])
+        np.testing.assert_allclose(pose[:3], [0, -355, 625], atol=1e-9)
+        self.assertAlmostEqual(pose[3], -90)
+
+    def test_batch_matches_single(self):
+        rng = np.random.default_rng(1)
+        joints = rng.uniform(self.chain.lower, self.chain.upper, (50, 6))
+        poses = self.chain.forward(joints)
+        self.assertEqual(poses.shape, (50, 6))
+        for row, pose in zip(joints, poses):
+            np.testing.assert_allclose(self.chain.forward(row), pose, atol=1e-9)
+
+    def test_abc_round_trip(self):
+        rng = np.random.default_rng(2)
+        joints = rng.uniform(self.chain.lower, self.chain.upper, (200, 6))
+        rot, _ = self.chain.forward_frames(joints)
+        abc = matrix_to_abc(rot)
+        np.testing.assert_allclose(abc_to_matrix(abc), rot, atol=1e-9)
+
+    def test_matches_pybullet(self):
+        import pybullet
+        client = pybullet.connect(pybullet.DIRECT)
+        try:
+            pybullet.setAdditionalSearchPath(str(project_root), physicsClientId=client)
+            robot = pybullet.loadURDF(str(ROBOT_URDF), useFixedBase=True, physicsClientId=client)
+            links = [pybullet.getJointInfo(robot, j, physicsClientId=client)[12].decode()
+                     for j in range(pybullet.getNumJoints(robot, physicsClientId=client))]
+            flange = links.index("flange")
+
+            rng = np.random.default_rng(3)
+            for joints in rng.uniform(self.chain.lower, self.chain.upper, (20, 6)):
+                for j, angle in enumerate(joints):
+                    pybullet.resetJointState(robot, j, np.radians(angle), physicsClientId=client)
+                state = pybullet.getLinkState(robot, flange, computeForwardKinematics=True, physicsClientId=client)
+                rot, pos = self.chain.forward_frames(joints)
+                np.testing.assert_allclose(pos, np.array(state[4]) * 1000.0, atol=1e-3)
+                np.testing.assert_allclose(rot, np.reshape(pybullet.getMatrixFromQuaternion(state[5]), (3, 3)),
+                                           atol=1e-6)
+        finally:
+            pybullet.disconnect(client)
+
+    def test_forward_point(self):
+        point = self.chain.forward_point(JointState(0, -90, 90, 0, 90, 0), "home")
+        self.assertEqual(point.name, "home")
+        self.assertAlmostEqual(point.x, 280)
+        self.assertAlmostEqual(point.z, 550)
+        self.assertAlmostEqual(point.b, 90)
+
+    def test_inverse_round_trip(self):
+        rng = np.random.default_rng(4)
+        joints = rng.uniform(self.chain.lower, self.chain.upper, (500, 6))
+        solutions = self.chain.inverse(self.chain.forward(joints))
+        self.assertEqual(solutions.shape, (500, 8, 6))
+        # die Lösung mit dem Status der Gelenkwerte sind die Gelenkwerte selbst (A6 bis auf 360°)
+        own = solutions[np.arange(500), self.chain.status(joints)]
+        np.testing.assert_allclose((own - joints + 180) % 360 - 180, 0, atol=1e-6)
+
+        # jede erreichbare Lösung liefert dieselbe Pose und hat ihren Index als Status
+        rot, pos = self.chain.forward_frames(joints)
+        for status in range(8):
+            found = ~np.isnan(solutions[:, status, 0])
+            rot_s, pos_s = self.chain.forward_frames(solutions[found, status])
+            np.testing.assert_allclose(pos_s, pos[found], atol=1e-6)
+            np.testing.assert_allclose(rot_s, rot[found], atol=1e-9)
+            np.testing.assert_array_equal(self.chain.status(solutions[found, status]), status)
+
+    def test_inverse_out_of_reach(self):
+        solutions = self.chain.inverse([[1000, 0, 300, 0, 90, 0], [280, 0, 550, 0, 90, 0]])
+        self.assertTrue(np.isnan(solutions[0]).all())
+        np.testing.assert_allclose(solutions[1, 2], [0, -90, 90, 0, 90, 0], atol=1e-9)
+        self.assertEqual(self.chain.status([0, -90, 90, 0, 0, 0]), 2)
+        np.testing.assert_array_equal(self.chain.within_limits(solutions[:, 2]), [False, True])
+
+    def test_rejects_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            self.chain.forward(np.zeros((3, 5)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from krc_simulator import KrcSimulator, SimCommand, parse_robot_command, _MessageReader
+from eki_encoder import encode_move, encode_grip, encode_move_joint
+from meta_controller import MetaController
+from point import Point6D, JointState
+from robot import Robot
+from robot_state import parse_robot_state
+
+
+def lin_command(cmd_id: int, x: float, vel: float = 0.1) -> SimCommand:
+    return SimCommand(cmd_id=cmd_id, cmd_type=1, mode=3, velocity=vel, cartesian=(x, 0.0, 0.0, 0.0, 0.0, 0.0))
+
+
+class TestSimulatedInterpreter(unittest.TestCase):
+    """Interpreter ohne Sockets: advance() wird direkt mit simulierter Zeit aufgerufen."""
+
+    def setUp(self):
+        self.krc = KrcSimulator()
+
+    def tearDown(self):
+        self.krc.stop()
+
+    def test_parse_client_messages(self):
+        point = Point6D("P", 100.0, 20.0, 300.0, 0.0, 90.0, 0.0)
+        command = parse_robot_command(encode_move(5, point, 1, 3, 0.2, 0.2, 0, 15, 0.0))
+        self.assertEqual((command.cmd_id, command.cmd_type, command.mode), (5, 1, 3))
+        self.assertEqual(command.cartesian, (100.0, 20.0, 300.0, 0.0, 90.0, 0.0))
+
+        joint = parse_robot_command(encode_move_joint(6, JointState(1, 2, 3, 4, 5, 6), 1, 1, 0.5, 0.2, 0, 15, 0.0))
+        self.assertEqual(joint.joints, (1.0, 2.0, 3.0, 4.0, 5.0, 6.0))
+
+        grip = parse_robot_command(encode_grip(7, 1))
+        self.assertEqual((grip.cmd_id, grip.cmd_type), (7, 3))
+
+    def test_move_finishes_after_distance_over_velocity(self):
+        # 100 mm bei 0.1 m/s -> 1 s
+        self.krc.fifo.append(SimCommand(cmd_id=1, cmd_type=2, mode=3, velocity=0.1,
+                                        cartesian=(100.0, 0.0, 0.0, 0.0, 0.0, 0.0)))
+        self.krc.advance(0.5)
+        self.assertEqual(self.krc.finished_id, 0)
+        self.assertAlmostEqual(self.krc.cartesian[0], 50.0)
+
+        self.krc.advance(0.6)
+        self.assertEqual(self.krc.finished_id, 1)
+        self.assertEqual(self.krc.cartesian[0], 100.0)
+
+    def test_type_1_reports_id_at_motion_start(self):
+        self.krc.fifo.extend([lin_command(1, 100.0), lin_command(2, 200.0)])
+        self.krc.advance(0.01)
+        self.assertEqual(self.krc.finished_id, 1)
+
+        # erst wenn Bewegung 1 fertig ist, startet 2 und meldet sich fertig
+        self.krc.advance(1.0)
+        self.assertEqual(self.krc.finished_id, 2)
+        self.assertEqual(self.krc.current_id, 2)
+
+    def test_override_scales_motion_time(self):
+        self.krc.override = 50
+        self.krc.fifo.append(SimCommand(cmd_id=1, cmd_type=2, mode=3, velocity=0.1,
+                                        cartesian=(100.0, 0.0, 0.0, 0.0, 0.0, 0.0)))
+        self.krc.advance(1.5)
+        self.assertEqual(self.krc.finished_id, 0)
+        self.krc.advance(0.6)
+        self.assertEqual(self.krc.finished_id, 1)
+
+        self.krc.override = 0
+        self.krc.fifo.append(SimCommand(cmd_id=2, cmd_type=2, mode=3, velocity=0.1,
+                                        cartesian=(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)))
+        self.krc.advance(10.0)
+        self.assertEqual(self.krc.finished_id, 1)
+
+    def test_fifo_limit(self):
+        krc = KrcSimulator(fifo_limit=4)
+        try:
+            for cmd_id in range(1, 7):
+                krc._handle_motion_message(encode_grip(cmd_id, 1))
+            self.assertEqual(len(krc.fifo), 4)
+            self.assertEqual(krc.fifo_overflows, 2)
+        finally:
+            krc.stop()
+
+    def test_message_size_limit(self):
+        reader = _MessageReader(limit=200)
+        messages = reader.feed(encode_grip(1, 0) + b"<EthernetKRL>" + b" " * 300)
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(reader.too_long, 1)
+
+    def test_abort_clears_fifo_and_sets_stopped(self):
+        self.krc.fifo.extend([lin_command(1, 100.0), lin_command(2, 200.0)])
+        self.krc.advance(0.2)
+
+        self.krc._handle_meta_message(MetaController._build_xml(None, 0, abort=1))
+        self.assertTrue(self.krc.stopped)
+        self.assertEqual(len(self.krc.fifo), 0)
+
+        self.krc.advance(5.0)
+        self.assertEqual(self.krc.finished_id, 1)
+        state = parse_robot_state(self.krc.state_message())
+        self.assertTrue(state.stopped)
+
+    def test_meta_override(self):
+        self.krc._handle_meta_message(MetaController._build_xml(None, 30, abort=0))
+        self.assertEqual(self.krc.override, 30)
+
+
+class TestRobotAgainstSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.krc = KrcSimulator(state_rate=200.0, motion_time_scale=0.01)
+        self.krc.start()
+        self.robot = Robot("127.0.0.1", self.krc.meta_port, self.krc.motion_port, visualization="none")
+        self.robot.connect()
+        self.robot.start_receive_threads()
+
+    def tearDown(self):
+        self.robot.disconnect()
+        self.krc.stop()
+
+    def test_sequence_runs_to_completion(self):
+        points = [Point6D(f"P{i}", 10.0 * i, 0.0, 200.0, 0.0, 90.0, 0.0) for i in range(100)]
+        handle = self.robot.move_sequence(points, mode=3, vel=0.5, timeout=5)
+
+        self.assertTrue(handle.wait(timeout=5))
+        self.assertEqual(self.krc.commands_received, 100)
+        self.assertEqual(self.krc.fifo_overflows, 0)
+        self.assertLessEqual(self.krc.max_fifo_depth, self.robot.stream_window)
+
+    def test_abort_stops_robot(self):
+        # Typ 1 meldet die Id schon beim Start, daher wartet der Test auf die zweite Bewegung
+        self.robot.lin(Point6D("P1", 5000.0, 0.0, 200.0, 0.0, 90.0, 0.0), vel=0.01)
+        handle = self.robot.lin(Point6D("P2", 0.0, 0.0, 200.0, 0.0, 90.0, 0.0), vel=0.01)
+        # Meta- und Motion-Kanal sind unabhaengig: Abort erst senden, wenn beide Befehle angekommen sind
+        for _ in range(100):
+            if self.krc.commands_received == 2:
+                break
+            time.sleep(0.01)
+        self.robot.abort()
+
+        self.assertFalse(handle.wait(timeout=2))
+        self.assertTrue(self.robot.get_current_state().stopped)
+        self.assertTrue(self.krc.stopped)
+
+if __name__ == '__main__':
+    unittest.main()
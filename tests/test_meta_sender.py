@@ -0,0 +1,128 @@
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+# Fügt den `src` Ordner in den Python-Pfad ein
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from meta_controller import MetaController
+from meta_sender import MetaSender
+
+
+class RecordingTransport:
+    """Merkt sich jede gesendete Nachricht mit Zeitstempel."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+
+    def send(self, data: bytes):
+        if self.delay:
+            time.sleep(self.delay)
+        self.sent.append((time.monotonic(), data.decode()))
+
+
+class TestMetaSender(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = RecordingTransport()
+        self.sender = MetaSender(self.transport, lambda o, abort: MetaController._build_xml(None, o, abort))
+
+    def tearDown(self):
+        self.sender.stop()
+
+    def test_latest_override_wins(self):
+        # Gedrueckt gehaltene "+"-Taste: viele Updates, gesendet wird nur der neueste Wert
+        for value in range(0, 101):
+            self.sender.set_override(value)
+        self.assertTrue(self.sender.flush())
+
+        self.assertLess(len(self.transport.sent), 10)
+        self.assertIn('VelocityOverride="100"', self.transport.sent[-1][1])
+        self.assertEqual(self.sender.overrides_requested, 101)
+        self.assertEqual(self.sender.last_sent_override, 100)
+
+    def test_rate_capped_to_interpreter(self):
+        for value in (10, 20, 30, 40):
+            self.sender.set_override(value)
+            self.assertTrue(self.sender.flush())
+
+        times = [t for t, _ in self.transport.sent]
+        self.assertEqual(len(times), 4)
+        for earlier, later in zip(times, times[1:]):
+            self.assertGreaterEqual(later - earlier, self.sender.min_interval * 0.9)
+
+    def test_unchanged_override_is_not_resent(self):
+        self.sender.set_override(50)
+        self.assertTrue(self.sender.flush())
+        self.sender.set_override(50)
+        self.assertTrue(self.sender.flush())
+        self.assertEqual(len(self.transport.sent), 1)
+
+    def test_abort_bypasses_queue(self):
+        # Langsamer Override-Send blockiert den Writer, der Abort darf nur diesen einen abwarten
+        self.transport.delay = 0.05
+        self.sender.set_override(30)
+        time.sleep(0.01)
+        self.sender.set_override(40)
+
+        latency = self.sender.abort()
+
+        self.assertLess(latency, 0.2)
+        self.assertEqual(list(self.sender.abort_latencies), [latency])
+        self.assertTrue(self.sender.flush())
+        messages = [m for _, m in self.transport.sent]
+        self.assertIn('AbortCommand="1"', messages[-1])
+        # der wartende Override 40 wurde vom Abort verworfen
+        self.assertFalse(any('VelocityOverride="40"' in m for m in messages))
+
+    def test_abort_while_override_in_flight(self):
+        # Der Writer hat 80 schon übernommen, als der Abort kommt: 80 darf danach nicht mehr raus
+        def build_xml(override, abort):
+            if override == 80 and not abort:
+                self.sender.abort()
+            return MetaController._build_xml(None, override, abort)
+
+        self.sender.build_xml = build_xml
+        self.sender.set_override(80)
+        self.assertTrue(self.sender.flush())
+
+        messages = [m for _, m in self.transport.sent]
+        self.assertEqual(len(messages), 1)
+        self.assertIn('AbortCommand="1"', messages[0])
+        self.assertEqual(self.sender.last_sent_override, 0)
+
+        # ein Override nach dem Abort wird wieder gesendet
+        self.sender.set_override(60)
+        self.assertTrue(self.sender.flush())
+        self.assertIn('VelocityOverride="60"', self.transport.sent[-1][1])
+
+    def test_set_override_returns_immediately(self):
+        self.transport.delay = 0.05
+        start = time.perf_counter()
+        for value in range(20):
+            self.sender.set_override(value)
+        self.assertLess(time.perf_counter() - start, 0.02)
+
+
+class TestMetaControllerSender(unittest.TestCase):
+
+    def test_controller_uses_sender(self):
+        transport = MagicMock()
+        meta = MetaController(transport)
+        meta.set_override(70)
+        self.assertTrue(meta.metaSender.flush())
+        meta.abort()
+        meta.metaSender.stop()
+
+        payloads = [c[0][0].decode() for c in transport.send.call_args_list]
+        self.assertEqual(len(payloads), 2)
+        self.assertIn('VelocityOverride="70"', payloads[0])
+        self.assertIn('AbortCommand="1"', payloads[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
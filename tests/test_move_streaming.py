@@ -0,0 +1,119 @@
+import re
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from motion_controller import MotionController
+from point import Point6D
+from robot_state import RobotState
+
+
+class FakeController:
+    """Nimmt gesendete Moves entgegen und meldet sie nach und nach als fertig (Finished_Id)."""
+
+    def __init__(self, motion):
+        self.motion = motion
+        self.sent_ids: list[int] = []
+        self.max_in_flight = 0
+        self.max_bytes_in_flight = 0
+        self.finished = 0
+        self.running = True
+        self._sizes: dict[int, int] = {}
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def send(self, payload: bytes):
+        for message in re.findall(rb'<\?xml.*?</EthernetKRL>\n', payload, re.S):
+            cmd_id = int(re.search(rb'Id="(\d+)"', message).group(1))
+            self.sent_ids.append(cmd_id)
+            self._sizes[cmd_id] = len(message)
+
+        in_flight = [i for i in self.sent_ids if i > self.finished]
+        self.max_in_flight = max(self.max_in_flight, len(in_flight))
+        self.max_bytes_in_flight = max(self.max_bytes_in_flight, sum(self._sizes[i] for i in in_flight))
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        self._thread.join()
+
+    def _run(self):
+        while self.running:
+            if self.sent_ids and self.finished < self.sent_ids[-1]:
+                self.finished += 1
+                self.motion._publish_states([RobotState(finished_id=self.finished)])
+            time.sleep(0.0005)
+
+
+class TestMoveStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MagicMock()
+        self.transport.connected = True
+        self.motion = MotionController(self.transport, visualization="none")
+        self.controller = FakeController(self.motion)
+        self.transport.send.side_effect = self.controller.send
+
+    def tearDown(self):
+        if self.controller._thread.is_alive():
+            self.controller.stop()
+
+    def points(self, count):
+        return [Point6D(f"P{i}", i, 0.0, 100.0, 0.0, 90.0, 0.0) for i in range(count)]
+
+    def test_short_sequence_is_sent_at_once(self):
+        # Passt alles ins Fenster -> ein einziges sendall, kein Warten auf den Roboter
+        self.motion.move_sequence(self.points(10), mode=3)
+        self.assertTrue(self.motion.send_queue.flush(timeout=1))
+
+        self.assertEqual(self.transport.send.call_count, 1)
+        self.assertEqual(self.controller.sent_ids, list(range(1, 11)))
+        self.assertEqual(self.motion.cmd_counter, 11)
+
+    def test_long_sequence_respects_window(self):
+        self.controller.start()
+        self.motion.move_sequence(self.points(300), mode=3, window=20, timeout=5)
+        self.assertTrue(self.motion.send_queue.flush(timeout=1))
+
+        self.assertEqual(self.controller.sent_ids, list(range(1, 301)))
+        self.assertLessEqual(self.controller.max_in_flight, 20)
+        self.assertEqual(self.motion.cmd_counter, 301)
+
+    def test_long_sequence_respects_byte_limit(self):
+        self.motion.stream_max_bytes = 4000
+        self.controller.start()
+        self.motion.move_sequence(self.points(100), mode=3, timeout=5)
+        self.assertTrue(self.motion.send_queue.flush(timeout=1))
+
+        self.assertEqual(len(self.controller.sent_ids), 100)
+        self.assertLessEqual(self.controller.max_bytes_in_flight, 4000)
+
+    def test_timeout_without_progress(self):
+        # Niemand meldet Finished_Id -> nach dem Timeout abbrechen
+        with self.assertRaises(TimeoutError):
+            self.motion.move_sequence(self.points(30), mode=3, window=10, timeout=0.2)
+        self.assertTrue(self.motion.send_queue.flush(timeout=1))
+
+        self.assertEqual(self.controller.sent_ids, list(range(1, 11)))
+        self.assertEqual(self.motion.cmd_counter, 11)
+
+    def test_stop_ends_streaming(self):
+        def stop_robot():
+            time.sleep(0.1)
+            self.motion._publish_states([RobotState(finished_id=0, stopped=True)])
+
+        threading.Thread(target=stop_robot, daemon=True).start()
+        self.motion.move_sequence(self.points(30), mode=3, window=10, timeout=5)
+        self.assertTrue(self.motion.send_queue.flush(timeout=1))
+
+        self.assertEqual(len(self.controller.sent_ids), 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+# Fügt den `src` Ordner in den Python-Pfad ein
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+import reach_map
+from kinematics import load_chain, matrix_to_abc
+from point import Point6D
+from reach_map import load_reach_map, default_grid, build_map, map_key, REACH_DTYPE, _flange_rotations
+from reachability import to_robroot
+from scene_assets import ROBOT_URDF
+
+# grobes Raster, damit der Aufbau im Test schnell bleibt
+COARSE = dict(resolution=150.0, polar_bins=3, azimuth_bins=4)
+
+
+class TestReachMap(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_values_match_inverse_kinematics(self):
+        chain = load_chain()
+        grid = default_grid(**COARSE)
+        reach = load_reach_map(cache_dir=self.tmp, workers=1, **COARSE)
+        self.assertEqual(reach.data.shape, grid.shape + (3, 4))
+        self.assertIsInstance(reach.data, np.memmap)
+
+        # Voxelmitte und Richtung einer Klassenmitte gegen die exakte Inverskinematik
+        rng = np.random.default_rng(6)
+        directions = grid.directions()
+        centres = grid.voxel_centres()
+        for _ in range(40):
+            i, j, k = (rng.integers(n) for n in grid.shape)
+            p, q = rng.integers(3), rng.integers(4)
+            abc = matrix_to_abc(_flange_rotations(directions[p, q]))
+            pose = np.r_[centres[i, j, k], abc]
+            valid = chain.within_limits(chain.inverse(pose)[0])
+            sample = reach.lookup(*pose)
+            self.assertEqual(sample.status_mask, int((valid * (1 << np.arange(8))).sum()))
+            self.assertEqual(sample.reachable, bool(valid.any()))
+            self.assertEqual(reach.data[i, j, k, p, q]["status_mask"], sample.status_mask)
+
+    def test_lookup(self):
+        reach = load_reach_map(cache_dir=self.tmp, workers=1, **COARSE)
+        # Flansch nach unten vor dem Roboter: Status 2 (Ellbogen oben, A5 > 0)
+        sample = reach.lookup_point(Point6D("P", 300, 0, 500, 0, 90, 0))
+        self.assertTrue(sample.reachable)
+        self.assertTrue(reach.reachable(Point6D("P", 300, 0, 500, 0, 90, 0), status=2))
+        self.assertGreater(sample.manipulability, 0.0)
+        self.assertLessEqual(sample.manipulability, 1.0)
+        self.assertFalse(reach.lookup(5000, 0, 0, 0, 0, 0).reachable)
+
+        poses = [[300, 0, 500, 0, 90, 0], [5000, 0, 0, 0, 0, 0], [-200, 300, 200, 45, -30, 10]]
+        values = reach.lookup_many(poses)
+        self.assertEqual(values.dtype, REACH_DTYPE)
+        for pose, value in zip(poses, values):
+            sample = reach.lookup(*pose)
+            self.assertEqual(value["status_mask"], sample.status_mask)
+            self.assertEqual(float(value["manipulability"]), sample.manipulability)
+
+    def test_lookup_point_in_base_with_tool(self):
+        reach = load_reach_map(cache_dir=self.tmp, workers=1, **COARSE)
+        point = Point6D("P", 200, 0, 500, 0, 90, 0)
+        base = Point6D("BASE", 100, 0, 0, 0, 0, 0)
+        tool = Point6D("TOOL", 0, 0, 50, 0, 0, 0)
+
+        # Punkte aus der CSV sind TCP-Posen im Base, die Karte kennt Flanschposen in $ROBROOT
+        flange = to_robroot([[200, 0, 500, 0, 90, 0]], base, tool)[0]
+        self.assertEqual(reach.lookup_point(point, base, tool), reach.lookup(*flange))
+        self.assertEqual(reach.lookup_point(point), reach.lookup(200, 0, 500, 0, 90, 0))
+        self.assertFalse(reach.reachable(point, base=Point6D("FAR", 5000, 0, 0, 0, 0, 0)))
+        self.assertTrue(reach.reachable(point, base=base, tool=tool))
+
+    def test_cached_map_is_reused(self):
+        first = load_reach_map(cache_dir=self.tmp, workers=1, **COARSE)
+        with patch.object(reach_map, "build_map") as build:
+            second = load_reach_map(cache_dir=self.tmp, workers=1, **COARSE)
+        build.assert_not_called()
+        self.assertEqual(first.path, second.path)
+        self.assertEqual(list(self.tmp.iterdir()), [first.path])
+
+    def test_changed_urdf_invalidates(self):
+        urdf = self.tmp / "kr3r540.urdf"
+        shutil.copy(ROBOT_URDF, urdf)
+        grid = default_grid(urdf, **COARSE)
+        before = map_key(grid, urdf)
+        # engere Grenze für A1
+        urdf.write_text(urdf.read_text().replace('lower="-2.9670597283903604" upper="2.9670597283903604" velocity="9.25',
+                                                 'lower="-1.0" upper="1.0" velocity="9.25'))
+        self.assertNotEqual(map_key(grid, urdf), before)
+
+        original = load_reach_map(ROBOT_URDF, self.tmp / "cache", workers=1, **COARSE)
+        changed = load_reach_map(urdf, self.tmp / "cache", workers=1, **COARSE)
+        self.assertNotEqual(original.path, changed.path)
+        # hinter dem Roboter ist mit |A1| <= 57° weniger erreichbar
+        self.assertLess(np.count_nonzero(changed.data["status_mask"]), np.count_nonzero(original.data["status_mask"]))
+
+    def test_process_pool_matches_single_process(self):
+        grid = default_grid(**COARSE)
+        shape = grid.shape + (grid.polar_bins, grid.azimuth_bins)
+        single, pooled = np.zeros(shape, REACH_DTYPE), np.zeros(shape, REACH_DTYPE)
+        build_map(grid, single, workers=1)
+        build_map(grid, pooled, workers=2)
+        np.testing.assert_array_equal(single, pooled)
+
+
+if __name__ == "__main__":
+    unittest.main()
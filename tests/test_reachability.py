@@ -0,0 +1,87 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Fügt den `src` Ordner in den Python-Pfad ein
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from csvHelper import load_all_points_csv
+from kinematics import load_chain
+from point import Point6D
+from reachability import (check_points, solve, to_robroot, interpolate_segments, PTP, LIN,
+                          UNREACHABLE, CONFIG_CHANGE, SINGULARITY)
+
+
+def points_from_joints(*joints) -> list[Point6D]:
+    poses = load_chain().forward(np.array(joints, dtype=float))
+    return [Point6D(f"P{i}", *map(float, pose)) for i, pose in enumerate(poses)]
+
+
+class TestReachability(unittest.TestCase):
+
+    def test_reachable_path(self):
+        points = points_from_joints((0, -90, 90, 30, 20, 0), (10, -80, 80, 30, 40, 10), (20, -70, 90, 20, 50, 0))
+        report = check_points(points, LIN)
+        self.assertTrue(report.ok, report.summary())
+        self.assertEqual(len(report.segments), 2)
+        np.testing.assert_allclose(report.points[1].joints, (10, -80, 80, 30, 40, 10), atol=1e-6)
+        self.assertEqual(report.points[0].status, 2)
+
+    def test_unreachable_point(self):
+        points = points_from_joints((0, -90, 90, 0, 90, 0)) + [Point6D("P5", 0, 0, 0, 0, 0, 0)]
+        report = check_points(points, PTP)
+        self.assertFalse(report.ok)
+        self.assertEqual([p.name for p in report.unreachable], ["P5"])
+        self.assertEqual(report.segments[0].problem, UNREACHABLE)
+        self.assertIn("P5: unreachable", report.summary())
+
+    def test_configuration_change(self):
+        # hinter dem Roboter: A1 müsste auf 180° (Grenze 170°), nur die Überkopf-Lösung bleibt
+        points = points_from_joints((0, -90, 90, 0, 90, 0)) + [Point6D("back", -280, 0, 550, 180, 90, 0)]
+        report = check_points(points, PTP)
+        self.assertEqual(report.segments[0].problem, CONFIG_CHANGE)
+        self.assertEqual(report.points[1].problem, CONFIG_CHANGE)
+        self.assertTrue(report.points[1].status & 1)
+
+    def test_wrist_singularity_on_lin(self):
+        # LIN von A5 = 20° nach A5 = -20° im gleichen Status: A4/A6 springen bei A5 = 0
+        points = points_from_joints((0, -90, 90, 30, 20, 0), (0, -90, 90, 30, -20, 0))
+        report = check_points(points, LIN)
+        self.assertEqual(report.segments[0].problem, SINGULARITY)
+        self.assertIn("A4", report.segments[0].detail)
+        # PTP interpoliert achsweise und ist nicht betroffen
+        self.assertIsNone(check_points(points, PTP).segments[0].problem)
+
+    def test_interpolation_stays_on_line(self):
+        points = points_from_joints((0, -90, 90, 30, 20, 0), (10, -80, 80, 30, 40, 10))
+        poses = np.array([[p.x, p.y, p.z, p.a, p.b, p.c] for p in points])
+        inner = interpolate_segments(poses, 4)
+        self.assertEqual(inner.shape, (1, 4, 6))
+        np.testing.assert_allclose(inner[0, :, :3], poses[0, :3] + np.outer([0.2, 0.4, 0.6, 0.8], poses[1, :3] - poses[0, :3]))
+
+    def test_base_and_tool(self):
+        np.testing.assert_allclose(to_robroot([[10, 0, 0, 0, 0, 0]], base=(100, 200, 0, 90, 0, 0)),
+                                   [[100, 210, 0, 90, 0, 0]], atol=1e-9)
+        flange = load_chain().forward([0, -90, 90, 0, 90, 0])
+        # TCP 100 mm vor dem Flansch, der Flansch zeigt nach unten
+        tcp = flange + [0, 0, -100, 0, 0, 0]
+        np.testing.assert_allclose(to_robroot([tcp], tool=(100, 0, 0, 0, 0, 0))[0], flange, atol=1e-9)
+
+    def test_process_pool_matches_single_process(self):
+        chain = load_chain()
+        joints = np.random.default_rng(5).uniform(chain.lower, chain.upper, (300, 6))
+        poses = chain.forward(joints)
+        np.testing.assert_array_equal(solve(poses, workers=2), solve(poses, workers=1))
+
+    def test_database_file(self):
+        points = load_all_points_csv(str(project_root / "database" / "Haus_von_nikolaus_punkte.csv"))
+        report = check_points(points, LIN)
+        self.assertEqual(len(report.points), len(points))
+        self.assertTrue(report.ok, report.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
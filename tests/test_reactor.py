@@ -0,0 +1,138 @@
+import socket
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from reactor import IoReactor
+from motion_controller import MotionController
+
+
+def robot_state(finished_id: int) -> bytes:
+    return (
+        f'<RobotState><Command Id="0" Finished_Id="{finished_id}" Stopped="0"/>'
+        '<Position><Joint A1="1.0" A2="2.0" A3="3.0" A4="4.0" A5="5.0" A6="6.0"/></Position>'
+        '</RobotState>'
+    ).encode('utf-8')
+
+
+class TestIoReactor(unittest.TestCase):
+
+    def setUp(self):
+        self.reactor = IoReactor()
+        self.pairs = [socket.socketpair() for _ in range(3)]
+
+    def tearDown(self):
+        self.reactor.close()
+        for a, b in self.pairs:
+            a.close()
+            b.close()
+
+    def test_one_thread_services_many_sockets(self):
+        received = {i: [] for i in range(len(self.pairs))}
+        threads = set()
+        all_done = threading.Event()
+
+        def make_callback(i, sock):
+            def on_readable():
+                threads.add(threading.get_ident())
+                received[i].append(sock.recv(4096))
+                if all(received.values()):
+                    all_done.set()
+                return True
+            return on_readable
+
+        for i, (local, _) in enumerate(self.pairs):
+            self.reactor.register(local, make_callback(i, local))
+        self.reactor.start()
+
+        for _, remote in self.pairs:
+            remote.sendall(b"hello")
+
+        self.assertTrue(all_done.wait(2))
+        self.assertEqual(len(threads), 1)
+        self.assertEqual(self.reactor.socket_count, 3)
+
+    def test_wakes_up_without_polling_delay(self):
+        # Daten muessen deutlich schneller als das alte 0.2 s Polling ankommen
+        local, remote = self.pairs[0]
+        got = threading.Event()
+
+        def on_readable():
+            local.recv(4096)
+            got.set()
+            return True
+
+        self.reactor.register(local, on_readable)
+        self.reactor.start()
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        remote.sendall(b"x")
+        self.assertTrue(got.wait(1))
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    def test_closed_connection_is_unregistered(self):
+        local, remote = self.pairs[0]
+        closed = threading.Event()
+
+        self.reactor.register(local, lambda: bool(local.recv(4096)), on_closed=closed.set)
+        self.reactor.start()
+        remote.close()
+
+        self.assertTrue(closed.wait(2))
+        self.assertEqual(self.reactor.socket_count, 0)
+
+    def test_unregister_from_other_thread(self):
+        local, remote = self.pairs[0]
+        calls = []
+
+        def on_readable():
+            calls.append(local.recv(4096))
+            return True
+
+        self.reactor.register(local, on_readable)
+        self.reactor.start()
+        self.reactor.unregister(local)
+        remote.sendall(b"late")
+        time.sleep(0.1)
+
+        self.assertEqual(calls, [])
+        self.assertEqual(self.reactor.socket_count, 0)
+
+
+class TestMotionControllerOnReactor(unittest.TestCase):
+
+    def setUp(self):
+        self.local, self.remote = socket.socketpair()
+
+        transport = MagicMock()
+        transport.connected = True
+        transport.receive_into = self.local.recv_into
+        self.motion = MotionController(transport, visualization="none")
+        self.reactor = IoReactor()
+
+    def tearDown(self):
+        self.reactor.close()
+        self.local.close()
+        self.remote.close()
+
+    def test_states_are_published_from_reactor_thread(self):
+        self.reactor.register(self.local, self.motion._on_motion_readable)
+        self.reactor.start()
+
+        # zwei States, der zweite aufgeteilt auf zwei Sendungen
+        data = robot_state(1) + robot_state(2)
+        self.remote.sendall(data[:150])
+        self.remote.sendall(data[150:])
+
+        self.assertTrue(self.motion.wait_for_finished(2, timeout=2))
+        self.assertEqual(self.motion.get_current_joint_state().a6, 6.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from recorder import TelemetryRecorder, ReplaySource, open_recording, list_recordings, HEADER_SIZE
+from telemetry import TELEMETRY_DTYPE, states_to_rows
+from motion_controller import MotionController
+from robot_state import RobotState
+
+
+def state(cmd_id: int) -> RobotState:
+    return RobotState(
+        cmd_id=cmd_id, finished_id=cmd_id - 1, stopped=False,
+        joints=(float(cmd_id), -90.0, 90.0, 0.0, 0.0, 0.0),
+        cartesian=(400.0, 0.0, 200.0, 0.0, 90.0, 0.0),
+    )
+
+
+class TestTelemetryRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_through_memory_map(self):
+        with TelemetryRecorder(self.dir) as recorder:
+            recorder.write_rows(states_to_rows([state(1), state(2)], timestamp=10.0))
+            recorder.write_rows(states_to_rows([state(3)], timestamp=10.5))
+
+        records = open_recording(list_recordings(self.dir)[0])
+        self.assertIsInstance(records, np.memmap)
+        self.assertEqual(records["cmd_id"].tolist(), [1, 2, 3])
+        self.assertEqual(records["joints"][:, 0].tolist(), [1.0, 2.0, 3.0])
+        self.assertTrue(np.isnan(records["torque"]).all())
+
+    def test_rotation_at_size_limit(self):
+        max_bytes = HEADER_SIZE + 4 * TELEMETRY_DTYPE.itemsize
+        with TelemetryRecorder(self.dir, max_bytes=max_bytes) as recorder:
+            recorder.write_rows(states_to_rows([state(i) for i in range(1, 11)], timestamp=1.0))
+
+        files = list_recordings(self.dir)
+        self.assertEqual(len(files), 3)
+        self.assertTrue(all(f.stat().st_size <= max_bytes for f in files))
+        ids = np.concatenate([open_recording(f)["cmd_id"] for f in files])
+        self.assertEqual(ids.tolist(), list(range(1, 11)))
+
+    def test_same_second_does_not_overwrite(self):
+        # zwei Aufnahmen in derselben Sekunde: die zweite darf die erste nicht überschreiben
+        with patch("recorder.datetime") as clock:
+            clock.now.return_value = datetime(2026, 1, 1, 12, 0, 0)
+            with TelemetryRecorder(self.dir) as first:
+                first.write_rows(states_to_rows([state(i) for i in range(1, 11)], timestamp=1.0))
+            with TelemetryRecorder(self.dir) as second:
+                second.write_rows(states_to_rows([state(11)], timestamp=2.0))
+
+        self.assertNotEqual(first.files, second.files)
+        files = list_recordings(self.dir)
+        self.assertEqual(len(files), 2)
+        ids = sorted(np.concatenate([open_recording(f)["cmd_id"] for f in files]).tolist())
+        self.assertEqual(ids, list(range(1, 12)))
+
+    def test_partial_record_is_ignored(self):
+        with TelemetryRecorder(self.dir) as recorder:
+            recorder.write_rows(states_to_rows([state(1), state(2)], timestamp=1.0))
+        path = list_recordings(self.dir)[0]
+        # abgebrochener Schreibvorgang: halber Datensatz am Ende
+        with open(path, "ab") as f:
+            f.write(b"\0" * (TELEMETRY_DTYPE.itemsize // 2))
+
+        self.assertEqual(len(open_recording(path)), 2)
+
+    def test_rejects_foreign_files(self):
+        path = self.dir / "telemetry_other.bin"
+        path.write_bytes(b"not a recording at all")
+        with self.assertRaises(ValueError):
+            open_recording(path)
+
+    def test_write_after_close_is_ignored(self):
+        recorder = TelemetryRecorder(self.dir)
+        recorder.close()
+        recorder.write_rows(states_to_rows([state(1)]))
+        self.assertEqual(recorder.records_written, 0)
+        self.assertEqual(list_recordings(self.dir), [])
+
+
+class TestReplaySource(unittest.TestCase):
+
+    def setUp(self):
+        rows = [states_to_rows([state(1), state(2)], timestamp=100.0),
+                states_to_rows([state(3)], timestamp=100.1),
+                states_to_rows([state(4)], timestamp=100.2)]
+        self.records = np.concatenate(rows)
+
+    def test_batches_keep_grouping(self):
+        batches = list(ReplaySource(self.records, speed=0))
+        self.assertEqual([[s.cmd_id for s in b] for b in batches], [[1, 2], [3], [4]])
+        self.assertEqual(batches[0][0].joints[0], 1.0)
+        self.assertFalse(batches[0][0].stopped)
+
+    def test_speed_scales_timing(self):
+        start = time.monotonic()
+        list(ReplaySource(self.records, speed=2.0))
+        elapsed = time.monotonic() - start
+        # 0.2 s Aufnahme bei doppelter Geschwindigkeit -> ca. 0.1 s
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 0.19)
+
+    def test_feed_controller_and_record_again(self):
+        transport = MagicMock()
+        transport.connected = True
+        motion = MotionController(transport, visualization="none")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            recorder = motion.start_recording(tmp)
+            ReplaySource(self.records, speed=0).feed(motion)
+            motion.stop_recording()
+
+            self.assertEqual(motion.last_finished_id, 3)
+            self.assertEqual(motion.get_current_state().cmd_id, 4)
+            self.assertEqual(open_recording(recorder.files[0])["cmd_id"].tolist(), [1, 2, 3, 4])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import sys
+import unittest
+import xml.etree.ElementTree as ET
+from unittest.mock import MagicMock
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+import motion_controller
+from motion_controller import MotionController
+from robot_state import RobotState, parse_robot_state, decode_robot_state, AXES, CARTESIAN
+
+FULL_STATE = (
+    '<RobotState>'
+    '<Command Id="12" Finished_Id="11" Stopped="FALSE"/>'
+    '<Position>'
+    '<Joint A1="10.0" A2="-20.5" A3="30.0" A4="40.0" A5="50.0" A6="-60.0"/>'
+    '<Cartesian X="150.5" Y="-20.1" Z="330.0" A="90.0" B="0.0" C="180.0"/>'
+    '</Position>'
+    '<Velocity A1="0.1" A2="0.2" A3="0.3" A4="0.4" A5="0.5" A6="0.6"/>'
+    '<Torque A1="1.5" A2="2.5" A3="3.5" A4="4.5" A5="5.5" A6="6.5"/>'
+    '</RobotState>'
+).encode('utf-8')
+
+
+class TestRobotState(unittest.TestCase):
+
+    def test_parse_full_state(self):
+        state = parse_robot_state(FULL_STATE)
+
+        self.assertEqual(state.cmd_id, 12)
+        self.assertEqual(state.finished_id, 11)
+        self.assertFalse(state.stopped)
+        self.assertEqual(state.joints, (10.0, -20.5, 30.0, 40.0, 50.0, -60.0))
+        self.assertEqual(state.cartesian, (150.5, -20.1, 330.0, 90.0, 0.0, 180.0))
+        self.assertEqual(state.velocity, (0.1, 0.2, 0.3, 0.4, 0.5, 0.6))
+        self.assertEqual(state.torque, (1.5, 2.5, 3.5, 4.5, 5.5, 6.5))
+
+    def test_missing_elements_are_none(self):
+        state = parse_robot_state(b'<RobotState><Command Finished_Id="3"/></RobotState>')
+
+        self.assertEqual(state.finished_id, 3)
+        self.assertIsNone(state.cmd_id)
+        self.assertIsNone(state.joints)
+        self.assertIsNone(state.cartesian)
+
+    def test_decoder_matches_elementtree(self):
+        # Der Byte-Scanner muss dieselben Werte liefern wie ein echter XML-Parser
+        root = ET.fromstring(FULL_STATE)
+        state = decode_robot_state(FULL_STATE)
+
+        joint = root.find('.//Joint')
+        cart = root.find('.//Cartesian')
+        self.assertEqual(state.joints, tuple(float(joint.get(a)) for a in AXES))
+        self.assertEqual(state.cartesian, tuple(float(cart.get(k)) for k in CARTESIAN))
+        self.assertEqual(state.finished_id, int(root.find('.//Command').get('Finished_Id')))
+
+    def test_decode_inside_larger_buffer(self):
+        # Dekodieren direkt aus einem Empfangspuffer mit Start/Ende
+        buf = bytearray(b'garbage' + FULL_STATE + b'<RobotState><Cartesian X="9"')
+        state = decode_robot_state(buf, 7, 7 + len(FULL_STATE))
+
+        self.assertEqual(state.cartesian[0], 150.5)
+
+    def test_cartesian_aux_is_not_cartesian(self):
+        state = decode_robot_state(
+            b'<RobotState><Cartesian_Aux X="1" Y="1" Z="1" A="1" B="1" C="1"/>'
+            b'<Cartesian X="2" Y="2" Z="2" A="2" B="2" C="2"/></RobotState>'
+        )
+        self.assertEqual(state.cartesian, (2.0,) * 6)
+
+    def test_missing_attribute_raises(self):
+        with self.assertRaises(ValueError):
+            decode_robot_state(b'<RobotState><Joint A1="1.0"/></RobotState>')
+
+    def test_snapshot_is_immutable(self):
+        state = RobotState(finished_id=1)
+        with self.assertRaises(Exception):
+            state.finished_id = 2
+
+
+class TestMotionControllerSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.motion = MotionController(MagicMock(), visualization="none")
+
+    def test_packet_is_parsed_once(self):
+        # Ein Paket wird genau einmal geparst, egal wie oft die Getter lesen
+        parser = MagicMock(wraps=parse_robot_state)
+        motion_controller.parse_robot_state = parser
+        self.addCleanup(setattr, motion_controller, "parse_robot_state", parse_robot_state)
+
+        self.motion.lastMotionPacket = FULL_STATE
+        for _ in range(5):
+            self.motion.get_current_Point6D("P")
+            self.motion.get_current_joint_state()
+            self.motion._update_command_state()
+
+        self.assertEqual(parser.call_count, 1)
+        self.assertEqual(self.motion.last_finished_id, 11)
+
+    def test_velocity_and_torque_getters(self):
+        self.motion.lastMotionPacket = FULL_STATE
+
+        self.assertEqual(self.motion.get_current_velocity().a3, 0.3)
+        self.assertEqual(self.motion.get_current_torque().a6, 6.5)
+
+    def test_bad_packet_keeps_previous_state(self):
+        self.motion.lastMotionPacket = FULL_STATE
+        self.motion.lastMotionPacket = b'<RobotState><Command'
+
+        self.assertEqual(self.motion.get_current_joint_state().a1, 10.0)
+        self.assertEqual(self.motion.stateFramer.frames_malformed, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Fügt den `src` Ordner in den Python-Pfad ein
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from scene_assets import (read_stl, write_stl, decimate, convex_hull, collision_hull, prepare_assets,
+                          source_files, CELL_MESH, ROBOT_URDF)
+
+
+def grid_surface(n: int) -> np.ndarray:
+    """Ebenes Quadrat aus 2*n*n Dreiecken."""
+    xs = np.linspace(0.0, 1.0, n + 1)
+    triangles = []
+    for i in range(n):
+        for j in range(n):
+            a, b = (xs[i], xs[j], 0.0), (xs[i + 1], xs[j], 0.0)
+            c, d = (xs[i + 1], xs[j + 1], 0.0), (xs[i], xs[j + 1], 0.0)
+            triangles += [(a, b, c), (a, c, d)]
+    return np.asarray(triangles, dtype=np.float32)
+
+
+class TestGeometry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_stl_round_trip(self):
+        triangles = grid_surface(4)
+        write_stl(self.tmp / "grid.stl", triangles)
+        np.testing.assert_array_equal(read_stl(self.tmp / "grid.stl"), triangles)
+
+    def test_read_source_meshes(self):
+        self.assertEqual(read_stl(CELL_MESH).shape[1:], (3, 3))
+
+    def test_decimate_keeps_extent(self):
+        triangles = grid_surface(60)
+        reduced = decimate(triangles, 10)
+
+        self.assertLess(len(reduced), len(triangles) / 10)
+        # Zellgröße ist Diagonale / 10, ein Cluster-Mittelpunkt liegt höchstens eine halbe Zelle innen
+        vertices = reduced.reshape(-1, 3)
+        np.testing.assert_allclose(vertices.min(axis=0), [0.0, 0.0, 0.0], atol=0.075)
+        np.testing.assert_allclose(vertices.max(axis=0), [1.0, 1.0, 0.0], atol=0.075)
+
+    def test_convex_hull_of_cube(self):
+        corners = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=float)
+        inner = np.random.default_rng(1).uniform(0.1, 0.9, (50, 3))
+        hull = convex_hull(np.vstack((corners, inner)))
+
+        # Würfel: 6 Seiten zu je 2 Dreiecken, nur Eckpunkte
+        self.assertEqual(len(hull), 12)
+        self.assertEqual(len(np.unique(hull.reshape(-1, 3), axis=0)), 8)
+        # alle Normalen zeigen nach außen
+        normals = np.cross(hull[:, 1] - hull[:, 0], hull[:, 2] - hull[:, 0])
+        self.assertTrue(np.all(np.einsum("ij,ij->i", normals, hull[:, 0] - 0.5) > 0))
+
+    def test_flat_points_have_no_hull(self):
+        with self.assertRaises(ValueError):
+            convex_hull(grid_surface(3).reshape(-1, 3))
+
+    def test_collision_hull_contains_mesh(self):
+        triangles = read_stl(project_root / "kuka_kr3_support" / "meshes" / "kr3r540" / "collision" / "link_1.stl")
+        hull = collision_hull(triangles)
+        self.assertLess(len(hull), len(triangles))
+
+        normals = np.cross(hull[:, 1] - hull[:, 0], hull[:, 2] - hull[:, 0]).astype(float)
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+        offsets = np.einsum("ij,ij->i", normals, hull[:, 0])
+        # Stützpunkte aus 128 Richtungen: Abweichung höchstens wenige Prozent der Größe
+        outside = (triangles.reshape(-1, 3) @ normals.T - offsets).max()
+        self.assertLess(outside, 0.05 * np.ptp(triangles.reshape(-1, 3), axis=0).max())
+
+
+class TestAssetCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.cache = self.tmp / "cache"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_repeat_start_uses_cache(self):
+        assets = prepare_assets("preview", self.cache)
+        self.assertTrue(assets.urdf.exists())
+        self.assertTrue(assets.cell_mesh.exists())
+        self.assertLess(assets.cell_mesh.stat().st_size, CELL_MESH.stat().st_size / 4)
+        built = (assets.urdf.parent / "manifest.json").stat().st_mtime_ns
+
+        again = prepare_assets("preview", self.cache)
+        self.assertEqual(again, assets)
+        self.assertEqual((again.urdf.parent / "manifest.json").stat().st_mtime_ns, built)
+        self.assertEqual(len(list(self.cache.iterdir())), 1)
+
+    def test_full_quality_keeps_visual_meshes(self):
+        assets = prepare_assets("full", self.cache)
+        self.assertEqual(assets.cell_mesh, CELL_MESH)
+        self.assertIn(str(project_root / "kuka_kr3_support"), assets.urdf.read_text())
+
+    def test_changed_source_gets_new_entry(self):
+        urdf = self.tmp / "kr3r540.urdf"
+        shutil.copy(ROBOT_URDF, urdf)
+        first = prepare_assets("preview", self.cache, urdf=urdf)
+
+        urdf.write_text(urdf.read_text().replace('lower="-2.9670597283903604"', 'lower="-2.9"', 1))
+        second = prepare_assets("preview", self.cache, urdf=urdf)
+
+        self.assertNotEqual(first.key, second.key)
+        self.assertIn('lower="-2.9"', second.urdf.read_text())
+
+    def test_source_files(self):
+        files = source_files()
+        self.assertEqual(files[:2], [ROBOT_URDF, CELL_MESH])
+        self.assertEqual(len(files), 2 + 14)
+
+    def test_unknown_quality(self):
+        with self.assertRaises(ValueError):
+            prepare_assets("ultra", self.cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
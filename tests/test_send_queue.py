@@ -0,0 +1,160 @@
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+# Fügt den `src` Ordner in den Python-Pfad ein
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from motion_controller import MotionController
+from send_queue import SendQueue
+from point import Point6D
+
+
+class SlowTransport:
+    """Transport, dessen sendall blockiert, bis der Test ihn freigibt."""
+
+    def __init__(self):
+        self.connected = True
+        self.payloads = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def send(self, data: bytes):
+        self.release.wait(2)
+        self.payloads.append(data)
+
+
+class TestSendQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = SlowTransport()
+        self.queue = SendQueue(self.transport)
+
+    def tearDown(self):
+        self.transport.release.set()
+        self.queue.stop()
+
+    def test_messages_keep_order(self):
+        for i in range(100):
+            self.queue.put(b"<%d>" % i)
+        self.assertTrue(self.queue.flush(timeout=1))
+
+        self.assertEqual(b"".join(self.transport.payloads), b"".join(b"<%d>" % i for i in range(100)))
+        self.assertEqual(self.queue.messages_sent, 100)
+        self.assertEqual(self.queue.bytes_in_flight, 0)
+
+    def test_backlog_is_batched(self):
+        # Erster Send blockiert, alles danach landet gesammelt in einem sendall
+        self.transport.release.clear()
+        self.queue.put(b"a")
+        time.sleep(0.05)
+        for _ in range(10):
+            self.queue.put(b"bb")
+
+        self.assertEqual(self.queue.depth, 10)
+        self.assertEqual(self.queue.bytes_in_flight, 21)
+        self.transport.release.set()
+        self.assertTrue(self.queue.flush(timeout=1))
+
+        self.assertEqual(self.transport.payloads, [b"a", b"bb" * 10])
+        self.assertEqual(self.queue.batches_sent, 2)
+        self.assertEqual(self.queue.max_depth, 10)
+
+    def test_batch_size_is_limited(self):
+        self.transport.release.clear()
+        queue = SendQueue(self.transport, max_batch_bytes=10)
+        queue.put(b"x")
+        time.sleep(0.05)
+        for _ in range(5):
+            queue.put(b"12345")
+        self.transport.release.set()
+        self.assertTrue(queue.flush(timeout=1))
+        queue.stop()
+
+        self.assertEqual([len(p) for p in self.transport.payloads], [1, 10, 10, 5])
+
+    def test_put_does_not_block(self):
+        self.transport.release.clear()
+        start = time.perf_counter()
+        for _ in range(1000):
+            self.queue.put(b"<RobotCommand/>")
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+    def test_restart_while_writer_still_sends(self):
+        # stop() läuft in den Timeout, der alte Writer hängt noch im sendall
+        self.transport.release.clear()
+        self.queue.put(b"a")
+        time.sleep(0.05)
+        self.queue.stop(timeout=0.05)
+        writers = threading.active_count()
+
+        # ein zweiter Writer würde "b" vor "a" senden
+        self.queue.put(b"b")
+        time.sleep(0.05)
+        self.assertEqual(threading.active_count(), writers)
+        self.transport.release.set()
+        self.assertTrue(self.queue.flush(timeout=1))
+
+        self.assertEqual(self.transport.payloads, [b"a", b"b"])
+
+    def test_send_error_is_raised_on_next_put(self):
+        transport = MagicMock()
+        transport.connected = True
+        transport.send.side_effect = OSError("broken pipe")
+        queue = SendQueue(transport)
+        queue.put(b"a")
+        self.assertTrue(queue.flush(timeout=1))
+
+        with self.assertRaises(RuntimeError):
+            queue.put(b"b")
+
+    def test_stop_clears_send_error(self):
+        # Nach disconnect/connect muss die Queue wieder senden, der alte Fehler gilt nicht mehr
+        transport = MagicMock()
+        transport.connected = True
+        transport.send.side_effect = [OSError("broken pipe"), None]
+        queue = SendQueue(transport)
+        queue.put(b"a")
+        self.assertTrue(queue.flush(timeout=1))
+        with self.assertRaises(RuntimeError):
+            queue.put(b"b")
+
+        queue.stop()
+        queue.put(b"c")
+        self.assertTrue(queue.flush(timeout=1))
+        queue.stop()
+
+        self.assertIsNone(queue.error)
+        self.assertEqual(transport.send.call_args_list[-1][0][0], b"c")
+        self.assertEqual(queue.messages_sent, 1)
+
+    def test_not_connected(self):
+        self.transport.connected = False
+        with self.assertRaises(RuntimeError):
+            self.queue.put(b"a")
+
+
+class TestMotionControllerQueue(unittest.TestCase):
+
+    def test_commands_go_through_queue(self):
+        transport = MagicMock()
+        transport.connected = True
+        motion = MotionController(transport, visualization="none")
+
+        motion.lin(Point6D("P1", 1.0, 2.0, 3.0, 0.0, 90.0, 0.0))
+        motion.jaw_close()
+        self.assertTrue(motion.send_queue.flush(timeout=1))
+        motion.send_queue.stop()
+
+        payload = b"".join(c[0][0] for c in transport.send.call_args_list)
+        self.assertIn(b'Id="1"', payload)
+        self.assertIn(b'Id="2"', payload)
+        self.assertLess(payload.index(b'Id="1"'), payload.index(b'Id="2"'))
+
+
+if __name__ == '__main__':
+    unittest.main()
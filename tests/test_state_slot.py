@@ -0,0 +1,93 @@
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from state_slot import StateSlot
+from motion_controller import MotionController
+from robot_state import RobotState
+
+
+class TestStateSlot(unittest.TestCase):
+
+    def setUp(self):
+        self.slot = StateSlot()
+
+    def test_latest_before_and_after_publish(self):
+        self.assertEqual(self.slot.latest(), (0, None))
+
+        state = RobotState(cmd_id=1)
+        self.slot.publish(state)
+        self.assertEqual(self.slot.latest(), (1, state))
+        self.assertIs(self.slot.value, state)
+        self.assertEqual(self.slot.seq, 1)
+
+    def test_wait_newer_returns_immediately_if_already_newer(self):
+        self.slot.publish(RobotState(cmd_id=1))
+        self.slot.publish(RobotState(cmd_id=2))
+
+        seq, state = self.slot.wait_newer(0, timeout=0)
+        self.assertEqual((seq, state.cmd_id), (2, 2))
+
+    def test_wait_newer_timeout(self):
+        self.slot.publish(RobotState(cmd_id=1))
+        self.assertIsNone(self.slot.wait_newer(1, timeout=0.05))
+
+    def test_wait_newer_wakes_on_publish(self):
+        def publish():
+            time.sleep(0.05)
+            self.slot.publish(RobotState(cmd_id=7))
+        threading.Thread(target=publish, daemon=True).start()
+
+        seq, state = self.slot.wait_newer(0, timeout=2)
+        self.assertEqual((seq, state.cmd_id), (1, 7))
+
+    def test_readers_see_consistent_pairs(self):
+        # Sequenz und Zustand gehoeren immer zusammen, auch bei parallelem Schreiben
+        stop = threading.Event()
+
+        def writer():
+            n = 0
+            while not stop.is_set():
+                n += 1
+                self.slot.publish(RobotState(cmd_id=n))
+        thread = threading.Thread(target=writer, daemon=True)
+        thread.start()
+
+        seq = 0
+        try:
+            for _ in range(200):
+                result = self.slot.wait_newer(seq, timeout=1)
+                self.assertIsNotNone(result)
+                new_seq, state = result
+                self.assertGreater(new_seq, seq)
+                self.assertEqual(state.cmd_id, new_seq)
+                seq = new_seq
+        finally:
+            stop.set()
+            thread.join(1)
+
+
+class TestControllerUsesSlot(unittest.TestCase):
+
+    def setUp(self):
+        transport = MagicMock()
+        transport.connected = True
+        self.motion = MotionController(transport, visualization="none")
+
+    def test_publish_batch_keeps_newest_and_finished_id(self):
+        self.motion._publish_states([RobotState(cmd_id=1, finished_id=1), RobotState(cmd_id=3, finished_id=2)])
+
+        seq, state = self.motion.state_slot.latest()
+        self.assertEqual(seq, 1)
+        self.assertEqual(state.cmd_id, 3)
+        self.assertEqual(self.motion.last_finished_id, 2)
+        self.assertIs(self.motion.get_current_state(), state)
+
+if __name__ == '__main__':
+    unittest.main()
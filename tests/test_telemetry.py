@@ -0,0 +1,105 @@
+import sys
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from telemetry import TelemetryBuffer, TELEMETRY_DTYPE, axis_stats
+from motion_controller import MotionController
+from robot_state import RobotState
+
+
+def state(cmd_id: int, a1: float = 0.0) -> RobotState:
+    return RobotState(
+        cmd_id=cmd_id,
+        finished_id=cmd_id - 1,
+        stopped=False,
+        joints=(a1, -90.0, 90.0, 0.0, 0.0, 0.0),
+        cartesian=(400.0, 0.0, 200.0, 0.0, 90.0, 0.0),
+        velocity=(0.0,) * 6,
+        torque=(1.0, 2.0, 3.0, 4.0, 5.0, 6.0),
+    )
+
+
+class TestTelemetryBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.buffer = TelemetryBuffer(capacity=10)
+
+    def test_append_and_structured_access(self):
+        self.buffer.append(state(1, a1=5.0), timestamp=100.0)
+
+        samples = self.buffer.samples()
+        self.assertEqual(samples.dtype, TELEMETRY_DTYPE)
+        self.assertEqual(len(samples), 1)
+        self.assertEqual(samples["cmd_id"][0], 1)
+        self.assertEqual(samples["joints"][0, 0], 5.0)
+        self.assertEqual(samples["torque"][0].tolist(), [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+
+    def test_ring_keeps_newest_in_order(self):
+        # 25 Samples in einen Puffer mit 10 Plaetzen, auch ueber mehrere Umlaeufe
+        for i in range(5):
+            self.buffer.extend([state(i * 5 + k) for k in range(5)], timestamp=float(i))
+
+        samples = self.buffer.samples()
+        self.assertEqual(len(self.buffer), 10)
+        self.assertEqual(samples["cmd_id"].tolist(), list(range(15, 25)))
+
+    def test_batch_larger_than_capacity(self):
+        self.buffer.extend([state(i) for i in range(23)], timestamp=1.0)
+        self.assertEqual(self.buffer.samples()["cmd_id"].tolist(), list(range(13, 23)))
+
+    def test_missing_values_are_nan(self):
+        self.buffer.append(RobotState(finished_id=3), timestamp=1.0)
+
+        samples = self.buffer.samples()
+        self.assertEqual(samples["cmd_id"][0], -1)
+        self.assertTrue(np.isnan(samples["joints"][0]).all())
+
+    def test_last_seconds(self):
+        for t in range(10):
+            self.buffer.append(state(t), timestamp=float(t))
+
+        window = self.buffer.last_seconds(3.0, now=9.0)
+        self.assertEqual(window["timestamp"].tolist(), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(len(self.buffer.last(2)), 2)
+
+    def test_by_command_and_stats(self):
+        for i, a1 in enumerate([10.0, 20.0, 30.0, 40.0]):
+            self.buffer.append(state(7 if i < 3 else 8, a1=a1), timestamp=float(i))
+
+        move = self.buffer.by_command(7)
+        self.assertEqual(len(move), 3)
+
+        stats = self.buffer.stats("joints", move)
+        self.assertEqual(stats["min"][0], 10.0)
+        self.assertEqual(stats["max"][0], 30.0)
+        self.assertEqual(stats["mean"][0], 20.0)
+        self.assertEqual(len(self.buffer.by_command(7, 8)), 4)
+
+    def test_stats_of_empty_selection(self):
+        stats = axis_stats(self.buffer.samples(), "velocity")
+        self.assertTrue(np.isnan(stats["mean"]).all())
+
+        with self.assertRaises(ValueError):
+            axis_stats(self.buffer.samples(), "gripper")
+
+
+class TestControllerTelemetry(unittest.TestCase):
+
+    def test_received_states_are_recorded(self):
+        transport = MagicMock()
+        transport.connected = True
+        motion = MotionController(transport, telemetry_capacity=100, visualization="none")
+
+        motion._publish_states([state(1), state(2)])
+        motion._publish_states([state(3)])
+
+        self.assertEqual(motion.telemetry.samples()["cmd_id"].tolist(), [1, 2, 3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import math
+import socket
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+# Fügt den `src` Ordner in den Python-Pfad ein
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+
+from motion_controller import MotionController
+from robot_state import RobotState
+
+
+
+def robot_state(finished_id: int) -> bytes:
+    return (
+        f'<RobotState><Command Id="0" Finished_Id="{finished_id}" Stopped="0"/>'
+        '<Position><Joint A1="1.0" A2="2.0" A3="3.0" A4="4.0" A5="5.0" A6="6.0"/></Position>'
+        '</RobotState>'
+    ).encode('utf-8')
+from visualization import (create_visualizer, NullVisualizer, PyBulletVisualizer, JointBlock, ProcessVisualizer,
+                           JointInterpolator)
+
+
+class TestVisualization(unittest.TestCase):
+
+    def test_modes(self):
+        self.assertIsInstance(create_visualizer("none"), NullVisualizer)
+        self.assertEqual(create_visualizer("direct").mode, "direct")
+        with self.assertRaises(ValueError):
+            create_visualizer("opengl")
+
+    def test_controller_starts_without_pybullet(self):
+        # Ohne Zustand wird nichts geladen, der Konstruktor bleibt schnell
+        start = time.perf_counter()
+        motion = MotionController(MagicMock(), gui=False)
+        elapsed = time.perf_counter() - start
+
+        self.assertIsInstance(motion.visualizer, PyBulletVisualizer)
+        self.assertFalse(motion.visualizer.loaded)
+        self.assertLess(elapsed, 0.5)
+
+    def test_direct_mode_follows_joints(self):
+        motion = MotionController(MagicMock(), visualization="direct")
+        try:
+            motion._publish_states([RobotState(joints=(10.0, -20.0, 30.0, 0.0, 45.0, -90.0))])
+            motion._render_current_state()
+
+            self.assertTrue(motion.visualizer.loaded)
+            expected = [math.radians(a) for a in (10.0, -20.0, 30.0, 0.0, 45.0, -90.0)]
+            for actual, wanted in zip(motion.visualizer.joint_positions(), expected):
+                self.assertAlmostEqual(actual, wanted, places=3)
+        finally:
+            motion.visualizer.close()
+        self.assertFalse(motion.visualizer.loaded)
+
+
+class TestJointBlock(unittest.TestCase):
+
+    def setUp(self):
+        self.block = JointBlock()
+        self.reader = JointBlock(self.block.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.block.close()
+
+    def test_reader_sees_newest_vector(self):
+        self.assertIsNone(self.reader.read())
+        self.block.write((1.0, 2.0, 3.0, 4.0, 5.0, 6.0), timestamp=10.0)
+        self.block.write((7.0, 8.0, 9.0, 10.0, 11.0, 12.0), timestamp=11.0)
+
+        self.assertEqual(self.reader.read(), (2, 11.0, (7.0, 8.0, 9.0, 10.0, 11.0, 12.0)))
+
+    def test_stop_flag(self):
+        self.assertFalse(self.reader.stopped)
+        self.block.stop()
+        self.assertTrue(self.reader.stopped)
+
+
+class TestProcessVisualizer(unittest.TestCase):
+
+    def setUp(self):
+        self.viewer = ProcessVisualizer(render_mode="direct", rate=200.0)
+
+    def tearDown(self):
+        self.viewer.close()
+
+    def test_show_only_writes_shared_memory(self):
+        self.viewer.show((0.0,) * 6)
+        self.assertTrue(self.viewer.alive)
+
+        start = time.perf_counter()
+        for i in range(1000):
+            self.viewer.show((float(i),) * 6)
+        # Schreiben in den Block, kein Rendern im Aufrufer
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(self.viewer.block.read()[2], (999.0,) * 6)
+
+    def test_crash_does_not_affect_caller(self):
+        self.viewer.show((0.0,) * 6)
+        self.viewer.process.kill()
+        self.viewer.process.join(5)
+
+        self.assertFalse(self.viewer.alive)
+        self.viewer.show((1.0,) * 6)
+
+        self.viewer.restart()
+        self.assertTrue(self.viewer.alive)
+
+    def test_close_ends_process(self):
+        self.viewer.show((0.0,) * 6)
+        process = self.viewer.process
+        self.viewer.close()
+        self.assertFalse(process.is_alive())
+        self.assertEqual(process.exitcode, 0)
+
+
+class TestJointInterpolator(unittest.TestCase):
+
+    def test_interpolates_between_samples(self):
+        interpolator = JointInterpolator()
+        self.assertIsNone(interpolator.at(0.0))
+        interpolator.add(1.0, (0.0,) * 6)
+        interpolator.add(1.02, (10.0,) * 6)
+        interpolator.add(1.04, (30.0,) * 6)
+
+        self.assertEqual(interpolator.at(1.01), (5.0,) * 6)
+        self.assertEqual(interpolator.at(1.03), (20.0,) * 6)
+        # keine Extrapolation vor dem ersten und nach dem letzten Sample
+        self.assertEqual(interpolator.at(0.5), (0.0,) * 6)
+        self.assertEqual(interpolator.at(2.0), (30.0,) * 6)
+
+    def test_same_timestamp_keeps_newest(self):
+        interpolator = JointInterpolator()
+        interpolator.add(1.0, (1.0,) * 6)
+        interpolator.add(1.0, (2.0,) * 6)
+        self.assertEqual(len(interpolator.samples), 1)
+        self.assertEqual(interpolator.at(1.0), (2.0,) * 6)
+
+
+class TestReceiveLoop(unittest.TestCase):
+
+    def test_loop_does_not_wait_between_packets(self):
+        # 50 einzelne States in 0,5 s: der Empfang muss jedem sofort folgen
+        local, remote = socket.socketpair()
+        transport = MagicMock()
+        transport.connected = True
+        transport.receive_into = local.recv_into
+        motion = MotionController(transport, visualization="none")
+        thread = threading.Thread(target=motion.motion_visualization_loop, daemon=True)
+        thread.start()
+        try:
+            for i in range(1, 51):
+                remote.sendall(robot_state(i))
+                time.sleep(0.01)
+            self.assertTrue(motion.wait_for_finished(50, timeout=0.5))
+            self.assertEqual(len(motion.telemetry), 50)
+            # fast jeder State kam einzeln an, statt sich im Socket-Puffer zu stauen
+            batches = len(set(motion.telemetry.samples()["timestamp"].tolist()))
+            self.assertGreater(batches, 30)
+        finally:
+            transport.connected = False
+            remote.close()
+            thread.join(2)
+            local.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import sys
 import unittest
 import xml.etree.ElementTree as ET
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 from pathlib import Path
 
 # Fügt den `src` Ordner in den Python-Pfad ein,
@@ -13,17 +13,16 @@ from motion_controller import MotionController
 from meta_controller import MetaController
 from point import Point6D
 
-# Wir "patchen" (überschreiben) PyBullet, damit beim Starten der
-# Tests KEIN echtes grafisches Simulationsfenster im Hintergrund aufspringt.
+# visualization="none", damit beim Starten der Tests KEIN
+# PyBullet-Fenster im Hintergrund aufspringt.
 class TestXMLGeneration(unittest.TestCase):
 
-    @patch('motion_controller.p')
-    def setUp(self, mock_pybullet):
+    def setUp(self):
         # Wir geben einen komplett falschen, stummen Transport-Layer mit.
         # So versuchen die Controller gar nicht erst, eine Netzwerkverbindung aufzubauen.
         mock_transport = MagicMock()
 
-        self.motion = MotionController(mock_transport)
+        self.motion = MotionController(mock_transport, visualization="none")
         self.meta = MetaController(mock_transport)
 
     def test_build_move_xml(self):
@@ -1,6 +1,6 @@
 import sys
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 from pathlib import Path
 
 project_root = Path(__file__).resolve().parents[1]
@@ -11,11 +11,10 @@ from point import Point6D, JointState
 
 class TestXMLParsing(unittest.TestCase):
 
-    @patch('motion_controller.p')
-    def setUp(self, mock_pybullet):
+    def setUp(self):
         # Transport-Attrappe erstellen
         mock_transport = MagicMock()
-        self.motion = MotionController(mock_transport)
+        self.motion = MotionController(mock_transport, visualization="none")
 
     def test_get_current_Point6D_success(self):
         # 1. Simuliere ein perfektes XML vom KUKA Roboter